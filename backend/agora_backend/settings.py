@@ -57,6 +57,7 @@ MIDDLEWARE = [
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'api.middleware.rendimiento_middleware.RendimientoMiddleware',  # Server-Timing y tiempos por URL
     'api.middleware.auth_middleware.JWTAuthenticationMiddleware',  # middleware personalizado
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
@@ -132,6 +133,90 @@ USE_TZ = True
 
 STATIC_URL = 'static/'
 
+# Carga masiva de historias: los trabajos asíncronos no tienen límite de archivos por petición
+DATA_UPLOAD_MAX_NUMBER_FILES = int(os.getenv('DATA_UPLOAD_MAX_NUMBER_FILES', '5000'))
+
+# Trabajos de verificación de elegibilidad (los procesa manage.py procesar_trabajos_verificacion).
+# Un trabajo en proceso sin progreso durante HISTORIAS_TRABAJOS_TIMEOUT segundos vuelve a pendiente;
+# los terminados se eliminan tras HISTORIAS_TRABAJOS_RETENCION_DIAS días
+HISTORIAS_TAMANO_LOTE_TRABAJO = int(os.getenv('HISTORIAS_TAMANO_LOTE_TRABAJO', '50'))
+HISTORIAS_TRABAJOS_TIMEOUT = int(os.getenv('HISTORIAS_TRABAJOS_TIMEOUT', '600'))
+HISTORIAS_TRABAJOS_RETENCION_DIAS = int(os.getenv('HISTORIAS_TRABAJOS_RETENCION_DIAS', '7'))
+
+# Filas por INSERT al guardar historias académicas en BD (Estudiante / RegistroHistoria)
+HISTORIAS_TAMANO_LOTE_INGESTA = int(os.getenv('HISTORIAS_TAMANO_LOTE_INGESTA', '2000'))
+
+# Estudiantes por lote al reevaluar los guardados de un programa tras cambiar su configuración o
+# pensum (lo hace el worker de trabajos, manage.py procesar_trabajos_verificacion)
+HISTORIAS_TAMANO_LOTE_REEVALUACION = int(os.getenv('HISTORIAS_TAMANO_LOTE_REEVALUACION', '500'))
+
+# Ejecución de la verificación masiva: 'serie' o 'procesos' (pool de HISTORIAS_PROCESOS procesos,
+# uno por worker y reutilizado entre peticiones; 0 = un proceso por CPU)
+HISTORIAS_MODO_EJECUCION = os.getenv('HISTORIAS_MODO_EJECUCION', 'serie')
+HISTORIAS_PROCESOS = int(os.getenv('HISTORIAS_PROCESOS', '0')) or None
+
+# Caché: Redis (django-redis) si se define REDIS_URL; si no, memoria local del proceso.
+# LocMemCache descarta primero las claves menos usadas al llegar a MAX_ENTRIES; en Redis
+# configure maxmemory-policy allkeys-lru para el mismo comportamiento.
+REDIS_URL = os.getenv('REDIS_URL')
+if REDIS_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django_redis.cache.RedisCache',
+            'LOCATION': REDIS_URL,
+            'TIMEOUT': 60 * 60 * 24,
+            'OPTIONS': {
+                'CLIENT_CLASS': 'django_redis.client.DefaultClient',
+                'IGNORE_EXCEPTIONS': True,  # Si Redis cae, la caché se comporta como vacía
+            },
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'agora',
+            'TIMEOUT': 60 * 60 * 24,
+            'OPTIONS': {
+                'MAX_ENTRIES': int(os.getenv('CACHE_MAX_ENTRIES', '10000')),
+            },
+        }
+    }
+
+# Cachés en proceso (pensums compilados, configuraciones, usuarios): se invalidan en todos los
+# workers con una versión guardada en la caché anterior y además expiran a los CACHE_PROCESO_TTL
+# segundos. Sin REDIS_URL la caché no es compartida: los demás workers solo ven un cambio cuando
+# expira su entrada, a los CACHE_PROCESO_TTL_LOCAL segundos
+CACHE_PROCESO_TTL = int(os.getenv('CACHE_PROCESO_TTL', '300'))
+CACHE_PROCESO_TTL_LOCAL = int(os.getenv('CACHE_PROCESO_TTL_LOCAL', '10'))
+
+# Caché de resultados de verificación por contenido de archivo (TTL en segundos)
+HISTORIAS_CACHE_RESULTADOS = os.getenv('HISTORIAS_CACHE_RESULTADOS', 'True') == 'True'
+HISTORIAS_CACHE_RESULTADOS_TTL = int(os.getenv('HISTORIAS_CACHE_RESULTADOS_TTL', str(60 * 60 * 24)))
+
+# Caché en disco de historias ya leídas (Parquet, requiere pyarrow); vacío = deshabilitada.
+# Se eliminan las historias sin usar hace más de MAX_DIAS días y, sobre MAX_MB, las menos usadas
+HISTORIAS_CACHE_PARQUET_DIR = os.getenv('HISTORIAS_CACHE_PARQUET_DIR', str(BASE_DIR / 'cache' / 'historias'))
+HISTORIAS_CACHE_PARQUET_MAX_MB = int(os.getenv('HISTORIAS_CACHE_PARQUET_MAX_MB', '500'))
+HISTORIAS_CACHE_PARQUET_MAX_DIAS = int(os.getenv('HISTORIAS_CACHE_PARQUET_MAX_DIAS', '30'))
+
+# Fracción de comparaciones cuyo diagnóstico se registra en el logger
+# api.historias.services.diagnostico (solo si ese logger tiene nivel DEBUG)
+HISTORIAS_DIAGNOSTICO_MUESTREO = float(os.getenv('HISTORIAS_DIAGNOSTICO_MUESTREO', '0.01'))
+
+# Medición por request (tiempo total, SQL y etapas del comparador) en el header Server-Timing
+# y en un histograma en memoria con los últimos RENDIMIENTO_VENTANA requests por URL
+RENDIMIENTO_MEDICION = os.getenv('RENDIMIENTO_MEDICION', 'True') == 'True'
+RENDIMIENTO_VENTANA = int(os.getenv('RENDIMIENTO_VENTANA', '1000'))
+
+# Métricas de Prometheus en /api/metrics/ (requiere prometheus-client). El scraper debe enviar
+# 'Authorization: Bearer <METRICAS_TOKEN>'; sin METRICAS_TOKEN el endpoint solo responde si
+# METRICAS_PERMITIR_SIN_TOKEN (por defecto, solo con DEBUG). Con varios workers de gunicorn, definir
+# la variable de entorno PROMETHEUS_MULTIPROC_DIR (directorio vacío al arrancar) y usar
+# gunicorn.conf.py para que las métricas de todos los procesos se sumen en cada scrape.
+METRICAS_TOKEN = os.getenv('METRICAS_TOKEN', '')
+METRICAS_PERMITIR_SIN_TOKEN = os.getenv('METRICAS_PERMITIR_SIN_TOKEN', str(DEBUG)) == 'True'
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 
@@ -186,6 +271,11 @@ SIMPLE_JWT = {
     'SLIDING_TOKEN_REFRESH_LIFETIME': timedelta(days=1),
 }
 
+# Segundos que JWTAuthenticationMiddleware reutiliza un token decodificado y el usuario que
+# lo respalda sin volver a la BD (0 = sin caché). Cualquier cambio de un usuario lo invalida en
+# todos los workers al confirmar (sin caché compartida, a más tardar a los CACHE_PROCESO_TTL_LOCAL).
+AUTH_CACHE_TTL = int(os.getenv('AUTH_CACHE_TTL', '60'))
+
 # CORS settings for frontend communication
 CORS_ALLOWED_ORIGINS = [
     "http://localhost:3000",
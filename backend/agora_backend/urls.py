@@ -40,8 +40,9 @@ from api.materia.controllers.controller_materia import (
     listar_materias, obtener_materia, crear_materia, actualizar_materia,
     eliminar_materia, listar_materias_activas, obtener_materias_por_pensum,
     obtener_materias_por_semestre, buscar_materias, listar_materias_obligatorias, patch_materia,
-    test_materia_connection
+    test_materia_connection, listar_alias_por_pensum, importar_alias_materias
 )
+from api.metricas.controllers.controller_metricas import obtener_metricas, obtener_resumen_rendimiento
 from api.electiva.controllers.controller_electiva import (
     listar_electivas, obtener_electiva, crear_electiva, actualizar_electiva,
     eliminar_electiva, listar_electivas_activas, obtener_electivas_por_programa,
@@ -126,6 +127,8 @@ urlpatterns = [
     path('api/materia/buscar/', buscar_materias, name='materia_search'),
     path('api/materia/obligatorias/', listar_materias_obligatorias, name='materia_obligatorias'),
     path('api/materia/test/', test_materia_connection, name='materia_test'),
+    path('api/materia/alias/pensum/<int:pensum_id>/', listar_alias_por_pensum, name='materia_alias_by_pensum'),
+    path('api/materia/alias/importar/', importar_alias_materias, name='materia_alias_import'),
     
     # electiva
     path('api/electiva/', listar_electivas, name='electiva_list'),
@@ -137,4 +140,8 @@ urlpatterns = [
     path('api/electiva/programa/<int:programa_id>/', obtener_electivas_por_programa, name='electiva_by_programa'),
     path('api/electiva/buscar/', buscar_electivas, name='electiva_search'),
     path('api/electiva/test/', test_electiva_connection, name='electiva_test'),
+
+    # métricas (Prometheus)
+    path('api/metrics/', obtener_metricas, name='metricas'),
+    path('api/metrics/rendimiento/', obtener_resumen_rendimiento, name='metricas_rendimiento'),
 ]
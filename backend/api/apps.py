@@ -4,3 +4,11 @@ from django.apps import AppConfig
 class ApiConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'api'
+
+    def ready(self):
+        # Registrar receptores de señales que invalidan cachés del comparador, de
+        # configuraciones y de usuarios
+        from api.historias.services import pensum_compilado  # noqa: F401
+        from api.configuracion.services import cache_configuracion  # noqa: F401
+
+        from api.usuario.services import cache_usuarios  # noqa: F401
\ No newline at end of file
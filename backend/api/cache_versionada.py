@@ -0,0 +1,132 @@
+import logging
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+# Configurar logger
+logger = logging.getLogger(__name__)
+
+# Backends de caché que no se comparten entre procesos: con ellos la versión solo invalida
+# el worker que escribió y los demás dependen del TTL
+BACKENDS_POR_PROCESO = (
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+)
+
+_advertencia_emitida = False
+
+
+def cache_compartida():
+    """True si la caché de Django es visible para todos los workers (Redis, archivos, BD...)."""
+    return settings.CACHES.get('default', {}).get('BACKEND') not in BACKENDS_POR_PROCESO
+
+
+def ttl_cache_proceso():
+    """
+    Segundos que una entrada de una caché en proceso es válida sin importar la versión:
+    CACHE_PROCESO_TTL con caché compartida y CACHE_PROCESO_TTL_LOCAL (corto) si no lo es.
+    """
+    global _advertencia_emitida
+    if cache_compartida():
+        return getattr(settings, 'CACHE_PROCESO_TTL', 300)
+    if not _advertencia_emitida:
+        _advertencia_emitida = True
+        logger.warning(
+            "La caché de Django no es compartida entre procesos (defina REDIS_URL): las cachés "
+            "en proceso tardan hasta CACHE_PROCESO_TTL_LOCAL segundos en ver los cambios hechos "
+            "en otros workers"
+        )
+    return getattr(settings, 'CACHE_PROCESO_TTL_LOCAL', 10)
+
+
+class CacheVersionada:
+    """
+    Caché en proceso cuyas entradas se invalidan en todos los workers.
+
+    Cada entrada guarda la versión vigente al cargarla; la versión vive en la caché de Django
+    ('<nombre>:version') y cada consulta la compara, de modo que un incremento hecho por
+    cualquier proceso descarta las entradas de todos. invalidar() la incrementa al confirmar
+    la transacción: antes, otro worker podría recargar las filas anteriores y guardarlas con
+    la versión nueva. Además, las entradas expiran a los ttl_cache_proceso() segundos.
+
+    Uso:
+        _cache = CacheVersionada('configuracion')
+        config, acierto = _cache.obtener(programa_id, lambda: cargar_de_bd(programa_id))
+    """
+
+    def __init__(self, nombre, ttl=ttl_cache_proceso, max_entradas=10000):
+        """
+        Args:
+            nombre: Prefijo de la clave de versión en la caché de Django
+            ttl: Función sin argumentos con los segundos de vida de una entrada (0 = sin caché)
+            max_entradas: Entradas máximas en proceso; al llenarse la caché se vacía
+        """
+        self.clave_version = f'{nombre}:version'
+        self.ttl = ttl
+        self.max_entradas = max_entradas
+        # clave -> (versión, expira en segundos monotónicos, valor)
+        self._entradas = {}
+        self._lock = threading.Lock()
+
+    def version(self):
+        """
+        Versión actual. Si la clave no existe (caché reiniciada o descartada) se crea con la
+        hora en nanosegundos, de modo que nunca repite un valor anterior. Retorna None si la
+        caché compartida no responde.
+        """
+        version = cache.get(self.clave_version)
+        if version is None:
+            cache.add(self.clave_version, time.time_ns(), timeout=None)
+            version = cache.get(self.clave_version)
+        return version
+
+    def obtener(self, clave, cargar):
+        """
+        Valor de la clave desde la caché, o el que retorna cargar() si no hay una entrada de
+        la versión actual sin expirar. Las excepciones de cargar() se propagan y no se cachea nada.
+
+        Returns:
+            Tupla (valor, acierto)
+        """
+        # La versión se lee antes de cargar: si cambia mientras tanto, la entrada queda vieja y se recarga
+        version = self.version()
+        ahora = time.monotonic()
+        entrada = self._entradas.get(clave)
+        if version is not None and entrada is not None and entrada[0] == version and ahora < entrada[1]:
+            return entrada[2], True
+
+        valor = cargar()
+        ttl = self.ttl()
+        if version is not None and ttl > 0:
+            with self._lock:
+                if len(self._entradas) >= self.max_entradas:
+                    self._entradas.clear()
+                self._entradas[clave] = (version, ahora + ttl, valor)
+        return valor, False
+
+    def invalidar(self, clave=None):
+        """
+        Descarta la clave (o todas) en este proceso de inmediato y, al confirmar la transacción
+        actual, en todos los workers incrementando la versión.
+        """
+        self.vaciar(clave)
+        transaction.on_commit(self._incrementar_version)
+
+    def vaciar(self, clave=None):
+        """Descarta la clave (o todas) solo en este proceso."""
+        with self._lock:
+            if clave is None:
+                self._entradas.clear()
+            else:
+                self._entradas.pop(clave, None)
+
+    def _incrementar_version(self):
+        try:
+            cache.incr(self.clave_version)
+        except ValueError:
+            # La clave no existe: se crea con un valor mayor que cualquiera anterior
+            cache.add(self.clave_version, time.time_ns(), timeout=None)
+        self.vaciar()
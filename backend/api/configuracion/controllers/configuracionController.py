@@ -6,6 +6,7 @@ from rest_framework import serializers
 import logging
 
 from api.configuracion.models.configuracion_elegibilidad import ConfiguracionElegibilidad
+from api.configuracion.services.cache_configuracion import obtener_config_activa, invalidar_configuraciones
 from api.historias.config.config import CONFIG
 
 # Configurar logger
@@ -46,6 +47,8 @@ def guardar_configuracion_en_bd(config_dict, programa_id):
         )
         if configs_anteriores.exists():
             configs_anteriores.update(es_activo=False)
+            # update() no dispara señales: invalidar la caché de configuraciones explícitamente
+            invalidar_configuraciones()
         
         # Completar configuración con valores por defecto si faltan
         config_completa = {
@@ -71,7 +74,8 @@ def guardar_configuracion_en_bd(config_dict, programa_id):
 
 def obtener_configuracion(programa_id):
     """
-    Obtiene la configuración de elegibilidad desde la base de datos.
+    Obtiene la configuración de elegibilidad activa del programa. Se lee de la caché en
+    proceso de configuraciones; la BD solo se consulta si la versión cambió.
     
     Orden de prioridad:
     1. Configuración activa para el programa específico
@@ -86,21 +90,15 @@ def obtener_configuracion(programa_id):
     Raises:
         ValueError: Si no existe configuración en BD para el programa
     """
-    try:
-        config_db = ConfiguracionElegibilidad.get_config_activa(programa_id=programa_id)
-        if config_db:
-            return config_db.to_dict()
-        
-        # Si no se encuentra configuración, lanzar error
-        raise ValueError(
-            f'No existe configuración de elegibilidad para el programa {programa_id}. '
-            f'Debe crear una usando POST /api/configuracion/crear/'
-        )
-    except ConfiguracionElegibilidad.DoesNotExist:
-        raise ValueError(
-            f'No existe configuración de elegibilidad para el programa {programa_id}. '
-            f'Debe crear una usando POST /api/configuracion/crear/'
-        )
+    config = obtener_config_activa(programa_id) if programa_id else None
+    if config:
+        return config
+    
+    # Si no se encuentra configuración, lanzar error
+    raise ValueError(
+        f'No existe configuración de elegibilidad para el programa {programa_id}. '
+        f'Debe crear una usando POST /api/configuracion/crear/'
+    )
 
 
 # ==================== ENDPOINTS ====================
@@ -807,6 +805,8 @@ def toggle_configuracion(request, id):
 				programa_id=config.programa_id,
 				es_activo=True
 			).exclude(configuracion_id=id).update(es_activo=False)
+			# update() no dispara señales: invalidar la caché de configuraciones explícitamente
+			invalidar_configuraciones()
 		
 		# Actualizar estado
 		config.es_activo = es_activo
@@ -0,0 +1,41 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from api.cache_versionada import CacheVersionada
+from api.configuracion.models.configuracion_elegibilidad import ConfiguracionElegibilidad
+from api.instrumentacion import registrar_consulta_cache
+
+# Caché en proceso: programa_id -> configuración activa como diccionario (o None), invalidada en
+# todos los workers por la versión 'configuracion:version' y con TTL (ver CacheVersionada)
+_configuraciones = CacheVersionada('configuracion')
+
+
+def invalidar_configuraciones():
+    """
+    Descarta las configuraciones cacheadas en este proceso y, al confirmar la transacción
+    actual, en todos los workers.
+    """
+    _configuraciones.invalidar()
+
+
+def obtener_config_activa(programa_id):
+    """
+    Configuración activa de un programa desde la caché en proceso. Solo consulta la BD si el
+    programa no está en caché, la versión cambió desde que se guardó o la entrada expiró.
+
+    Returns:
+        Diccionario con nota_aprobatoria y semestre_limite_electivas, o None si el programa
+        no tiene configuración activa
+    """
+    def _cargar():
+        config_db = ConfiguracionElegibilidad.get_config_activa(programa_id=programa_id)
+        return config_db.to_dict() if config_db else None
+
+    config, acierto = _configuraciones.obtener(programa_id, _cargar)
+    registrar_consulta_cache('configuracion', aciertos=int(acierto), fallos=int(not acierto))
+    return dict(config) if config is not None else None
+
+
+@receiver([post_save, post_delete], sender=ConfiguracionElegibilidad)
+def _invalidar_por_cambio(sender, **kwargs):
+    invalidar_configuraciones()
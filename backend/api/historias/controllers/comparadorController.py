@@ -1,23 +1,36 @@
 from rest_framework import status
-from rest_framework.decorators import api_view, parser_classes
+from rest_framework.decorators import api_view, parser_classes, renderer_classes
 from rest_framework.parsers import MultiPartParser, FormParser
+from rest_framework.renderers import JSONRenderer
 from rest_framework.response import Response
 from drf_spectacular.utils import extend_schema, OpenApiResponse, OpenApiExample, inline_serializer
 from rest_framework import serializers
-import pandas as pd
+from django.conf import settings
+from django.http import StreamingHttpResponse
 import os
-import re
 import logging
 
-from api.historias.services.comparadorService import comparar_estudiante, obtener_pensum_desde_bd
-from api.configuracion.models.configuracion_elegibilidad import ConfiguracionElegibilidad
-from api.configuracion.controllers.configuracionController import obtener_configuracion
+from api.historias.services.comparadorService import comparar_estudiante
+from api.historias.tools.lector_historias import extraer_codigo_estudiante
+from api.historias.tools.cache_historias import leer_historia_cacheada
+from api.historias.tools.lector_comprimidos import (
+	iterar_historias_comprimidas, es_archivo_comprimido, ComprimidoInvalido, EXTENSIONES_COMPRIMIDO
+)
+from api.historias.services.contexto_evaluacion import EvaluationContext, ConfiguracionNoEncontrada, PensumNoDisponible
+from api.historias.services.ejecucion_paralela import ComparadorParalelo
+from api.historias.services.diagnostico import Traza, explicar_historia, evaluar_con_diagnostico, registrar_diagnostico
+from api.historias.services.cache_resultados import (
+	clave_resultado, obtener_resultados, guardar_resultados, registrar_consultas, estadisticas_cache
+)
+from api.historias.tools.ndjson import NDJSONRenderer, MEDIA_TYPE_NDJSON, linea_ndjson
 
 # Configurar logger
 logger = logging.getLogger(__name__)
 
 # Constantes
 MAX_FILES_MASIVA = 50  # Límite de archivos en carga masiva
+MAX_FILES_MASIVA_STREAM = 500  # Límite en modo streaming (la memoria no crece con el lote)
+MODOS_EJECUCION = ('serie', 'procesos')  # Modos de ejecución de la verificación masiva
 
 
 @extend_schema(
@@ -26,6 +39,7 @@ MAX_FILES_MASIVA = 50  # Límite de archivos en carga masiva
 		fields={
 			'historia': serializers.FileField(help_text='Archivo CSV o Excel (.csv, .xls, .xlsx) con la historia académica. El código del estudiante se extrae automáticamente del nombre del archivo (formato: Historia-Academica-CODIGO.csv)'),
 			'programa_id': serializers.IntegerField(required=True, help_text='ID del programa académico (requerido). Se obtiene el pensum activo y la configuración de elegibilidad desde la BD'),
+			'explain': serializers.BooleanField(required=False, help_text='Incluir el diagnóstico de la comparación en el campo "diagnostico" (equivale a ?explain=1)'),
 		}
 	),
 	responses={
@@ -105,6 +119,12 @@ MAX_FILES_MASIVA = 50  # Límite de archivos en carga masiva
 	- estado: 1 = Elegible, 0 = No elegible
 	- materias_faltantes_hasta_semestre_limite: Lista de materias pendientes
 	- materias_aprobadas_despues_semestre_limite: Materias obligatorias aprobadas en semestres superiores al límite
+	
+	**Diagnóstico (`?explain=1`):**
+	Agrega el campo `diagnostico` con los nombres de materia normalizados, la asignación de
+	Electivas FISH a las FISH del pensum, las materias de la historia con nombre parecido a cada
+	materia faltante y los tiempos por etapa en milisegundos (`etapas_ms`). En este modo no se
+	usa la caché de resultados.
 	"""
 )
 @api_view(['POST'])
@@ -116,6 +136,8 @@ def verificar_elegibilidad_estudiante(request):
 	El pensum se obtiene automáticamente desde la base de datos.
 	El código del estudiante se extrae automáticamente del nombre del archivo.
 	"""
+	explicar = _solicita_explain(request)
+	traza = Traza()
 	try:
 		# Validar que se proporcione el programa_id (requerido)
 		programa_id = None
@@ -141,10 +163,16 @@ def verificar_elegibilidad_estudiante(request):
 				'details': 'Debe proporcionar el ID del programa académico para obtener el pensum desde la base de datos'
 			}, status=status.HTTP_400_BAD_REQUEST)
 		
-		# Obtener pensum desde la base de datos
+		# Resolver una sola vez configuración, pensum y pensum compilado (desde caché o desde la BD)
 		try:
-			pensum = obtener_pensum_desde_bd(programa_id)
-		except ValueError as e:
+			with traza.etapa('contexto'):
+				contexto = EvaluationContext.resolver(programa_id)
+		except ConfiguracionNoEncontrada as e:
+			return Response({
+				'error': 'Configuración no encontrada',
+				'details': str(e)
+			}, status=status.HTTP_400_BAD_REQUEST)
+		except PensumNoDisponible as e:
 			return Response({
 				'error': 'Error al obtener pensum desde la base de datos',
 				'details': str(e)
@@ -154,6 +182,7 @@ def verificar_elegibilidad_estudiante(request):
 				'error': 'Error inesperado al obtener pensum',
 				'details': str(e)
 			}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+		pensum = contexto.compilado
 		
 		# Validar que se proporcione el archivo de historia
 		if 'historia' not in request.FILES and 'historia' not in request.POST:
@@ -190,22 +219,9 @@ def verificar_elegibilidad_estudiante(request):
 					]
 				}, status=status.HTTP_400_BAD_REQUEST)
 		
-		# Leer el archivo de historia
+		# Leer el contenido una sola vez: se usa como clave de la caché de resultados
 		try:
-			if historia_filename and historia_filename.endswith('.csv'):
-				historia = pd.read_csv(historia_file, delimiter=';', encoding='latin-1')
-			elif historia_filename and historia_filename.endswith('.xlsx'):
-				historia = pd.read_excel(historia_file, engine='openpyxl')
-			elif historia_filename and historia_filename.endswith('.xls'):
-				historia = pd.read_excel(historia_file, engine='xlrd')
-			else:
-				# Por defecto intentar CSV
-				historia = pd.read_csv(historia_file, delimiter=';', encoding='latin-1')
-		except Exception as e:
-			return Response({
-				'error': 'Error al leer archivo de historia',
-				'details': str(e)
-			}, status=status.HTTP_400_BAD_REQUEST)
+			contenido = historia_file.read()
 		finally:
 			# Cerrar el archivo si fue abierto manualmente
 			if archivo_abierto_manual and historia_file:
@@ -213,39 +229,64 @@ def verificar_elegibilidad_estudiante(request):
 					historia_file.close()
 				except:
 					pass
-
-		# Normalizar columnas
-		historia.columns = historia.columns.str.strip().str.lower()
-
-		# Extraer código del estudiante desde el nombre del archivo
-		codigo_estudiante = None
-		if historia_filename:
-			# Patrón para Historia-Academica-CODIGO.csv o Historia-Academica_CODIGO.csv
-			match = re.search(r'Historia-Academica[_-]?(\d+)', historia_filename, re.IGNORECASE)
-			if match:
-				codigo_estudiante = match.group(1)
-			else:
-				# Si no coincide con el patrón, usar el nombre del archivo sin extensión
-				codigo_estudiante = os.path.splitext(historia_filename)[0]
-
-		# Obtener configuración desde BD
+		
+		# Codigo del estudiante desde el nombre del archivo
+		codigo_estudiante = extraer_codigo_estudiante(historia_filename) if historia_filename else None
+		
+		# Si el mismo contenido ya se verificó con este pensum y configuración, no se vuelve a leer
+		# (en modo explain siempre se lee y compara para medir cada etapa)
+		clave = clave_resultado(contenido, pensum)
+		en_cache = {} if explicar else obtener_resultados([clave])
+		if clave in en_cache:
+			registrar_consultas(1, 0)
+			resultado_ordenado = {}
+			if codigo_estudiante:
+				resultado_ordenado['estudiante'] = codigo_estudiante
+			resultado_ordenado.update(en_cache[clave])
+			response = Response(resultado_ordenado, status=status.HTTP_200_OK)
+			response['X-Cache-Resultados'] = 'aciertos=1; fallos=0'
+			return response
+		
+		# Leer el archivo de historia (desde la caché en disco si ya fue leído antes)
 		try:
-			config = obtener_configuracion(programa_id=programa_id)
-		except ValueError as e:
+			with traza.etapa('lectura'):
+				historia = leer_historia_cacheada(contenido, historia_filename or '')
+		except KeyError:
+			raise
+		except Exception as e:
 			return Response({
-				'error': 'Configuración no encontrada',
+				'error': 'Error al leer archivo de historia',
 				'details': str(e)
 			}, status=status.HTTP_400_BAD_REQUEST)
-		
-		# Ejecutar comparación con la configuración obtenida
-		resultado = comparar_estudiante(historia, pensum, config=config, programa_id=programa_id)
+
+		# Normalizar columnas
+		historia.columns = historia.columns.str.strip().str.lower()
+
+		if explicar:
+			# El diagnóstico se calcula antes de comparar: comparar_estudiante normaliza la historia
+			with traza.etapa('diagnostico'):
+				diagnostico = explicar_historia(historia, contexto)
+			resultado = comparar_estudiante(historia, contexto, traza=traza)
+		else:
+			# Ejecutar comparación con la configuración obtenida
+			resultado = comparar_estudiante(historia, contexto)
+			guardar_resultados({clave: resultado})
+			registrar_consultas(0, 1)
 		
 		resultado_ordenado = {}
 		if codigo_estudiante:
 			resultado_ordenado['estudiante'] = codigo_estudiante
 		resultado_ordenado.update(resultado)
 
-		return Response(resultado_ordenado, status=status.HTTP_200_OK)
+		if explicar:
+			diagnostico['etapas_ms'] = traza.como_dict()
+			resultado_ordenado['diagnostico'] = diagnostico
+			registrar_diagnostico(codigo_estudiante, diagnostico)
+			return Response(resultado_ordenado, status=status.HTTP_200_OK)
+
+		response = Response(resultado_ordenado, status=status.HTTP_200_OK)
+		response['X-Cache-Resultados'] = 'aciertos=0; fallos=1'
+		return response
 
 	except KeyError as e:
 		return Response({
@@ -266,9 +307,14 @@ def verificar_elegibilidad_estudiante(request):
 		fields={
 			'historias': serializers.ListField(
 				child=serializers.FileField(),
-				help_text='Múltiples archivos CSV o Excel con historias académicas. Cada archivo debe tener formato: Historia-Academica-CODIGO.csv'
+				help_text='Múltiples archivos CSV o Excel con historias académicas. Cada archivo debe tener formato: Historia-Academica-CODIGO.csv',
+				required=False
 			),
+			'comprimido': serializers.FileField(required=False, help_text='Alternativa a historias: un único .zip o .tar.gz con las historias académicas'),
 			'programa_id': serializers.IntegerField(required=True, help_text='ID del programa académico (requerido). Se obtiene el pensum activo y la configuración de elegibilidad desde la BD'),
+			'modo': serializers.ChoiceField(choices=MODOS_EJECUCION, required=False, help_text='serie: en el proceso de la petición; procesos: reparte lectura y comparación en un pool de procesos'),
+			'stream': serializers.BooleanField(required=False, help_text='Responder en streaming NDJSON (equivale a Accept: application/x-ndjson)'),
+			'explain': serializers.BooleanField(required=False, help_text='Incluir el diagnóstico de cada comparación en el campo "diagnostico" (equivale a ?explain=1)'),
 		}
 	),
 	responses={
@@ -330,26 +376,51 @@ def verificar_elegibilidad_estudiante(request):
 	- Cada archivo debe ser CSV con delimitador `;` o Excel (.xlsx, .xls)
 	- Nombre sugerido: Historia-Academica-CODIGO.csv
 	- El código del estudiante se extrae del nombre del archivo
-	- Límite máximo: 50 archivos por petición
+	- Límite máximo: 50 archivos por petición (para cargas mayores use POST /api/historias/jobs/)
+	
+	**Archivo comprimido (campo `comprimido`):**
+	En lugar de `historias` se puede enviar un único .zip o .tar.gz. Las entradas .csv/.xls/.xlsx
+	se extraen y evalúan una a una; el código se toma del nombre de cada entrada. Se ignoran
+	carpetas, archivos ocultos y __MACOSX. Límites: las mismas historias que en `historias`
+	(50, o 500 en streaming) y 10 MB por historia.
 	
 	**Configuración:**
 	La configuración de elegibilidad se obtiene desde la BD. Debe existir una configuración 
 	activa para el programa. Para crearla/modificarla: POST /api/configuracion/crear/
 	
+	**Modo de ejecución (campo `modo`):**
+	- `serie`: lectura y comparación en el proceso de la petición
+	- `procesos`: reparte lectura y comparación entre el pool de procesos del worker (HISTORIAS_PROCESOS),
+	  en fragmentos de al menos 50 historias; con menos archivos se evalúa en serie
+	
 	**Respuesta:**
 	- total_estudiantes: Cantidad total procesada
 	- elegibles: Cantidad de estudiantes elegibles
 	- no_elegibles: Cantidad de estudiantes no elegibles
 	- resultados: Array con el detalle de cada estudiante
+	
+	**Streaming (`Accept: application/x-ndjson` o `?stream=1`):**
+	La respuesta es NDJSON: una línea por estudiante apenas se evalúa (mismo formato que
+	cada elemento de `resultados`) y una línea final `{"resumen": {...}}` con total_estudiantes,
+	elegibles, no_elegibles y archivos_con_error. En este modo el límite es de 500 archivos.
+	
+	**Diagnóstico (`?explain=1`):**
+	Cada resultado incluye el campo `diagnostico` (nombres normalizados, asignación de FISH,
+	materias con nombre parecido a cada faltante y tiempos por etapa en `etapas_ms`) y la
+	respuesta incluye `diagnostico.etapas_ms` de la petición. Las historias se evalúan una a una
+	en el proceso de la petición, sin caché de resultados ni streaming.
 	"""
 )
 @api_view(['POST'])
 @parser_classes([MultiPartParser, FormParser])
+@renderer_classes([JSONRenderer, NDJSONRenderer])
 def verificar_elegibilidad_masiva(request):
 	"""
 	Verifica la elegibilidad de múltiples estudiantes subidos desde la web.
-	Procesa todos los archivos en memoria y retorna los resultados.
+	Lee todos los archivos en memoria y los compara contra el pensum en un solo lote.
 	"""
+	explicar = _solicita_explain(request)
+	traza = Traza()
 	try:
 		# Validar programa_id
 		programa_id = None
@@ -367,10 +438,16 @@ def verificar_elegibilidad_masiva(request):
 				'details': 'Debe proporcionar el ID del programa académico'
 			}, status=status.HTTP_400_BAD_REQUEST)
 		
-		# Obtener pensum desde la base de datos
+		# Resolver una sola vez configuración, pensum y pensum compilado (desde caché o desde la BD)
 		try:
-			pensum = obtener_pensum_desde_bd(programa_id)
-		except ValueError as e:
+			with traza.etapa('contexto'):
+				contexto = EvaluationContext.resolver(programa_id)
+		except ConfiguracionNoEncontrada as e:
+			return Response({
+				'error': 'Configuración no encontrada',
+				'details': str(e)
+			}, status=status.HTTP_400_BAD_REQUEST)
+		except PensumNoDisponible as e:
 			return Response({
 				'error': 'Error al obtener pensum desde la base de datos',
 				'details': str(e)
@@ -380,82 +457,107 @@ def verificar_elegibilidad_masiva(request):
 				'error': 'Error inesperado al obtener pensum',
 				'details': str(e)
 			}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+		pensum = contexto.compilado
+		config = contexto.config
 		
-		# Obtener todos los archivos de historias
+		# Obtener todos los archivos de historias o un único archivo comprimido (.zip / .tar.gz)
 		historias_files = request.FILES.getlist('historias')
+		comprimido = request.FILES.get('comprimido')
 		
-		if not historias_files:
+		if not historias_files and not comprimido:
 			return Response({
 				'error': 'No se recibieron archivos de historias',
-				'details': 'Debe enviar al menos un archivo en el campo "historias"',
+				'details': 'Debe enviar al menos un archivo en el campo "historias" o un .zip/.tar.gz en el campo "comprimido"',
 				'ejemplo': 'Usar <input type="file" name="historias" multiple> en el formulario'
 			}, status=status.HTTP_400_BAD_REQUEST)
 		
-		# Validar límite de archivos
-		if len(historias_files) > MAX_FILES_MASIVA:
+		if comprimido and historias_files:
+			return Response({
+				'error': 'Envíe historias o un archivo comprimido, no ambos',
+				'details': 'Los campos "historias" y "comprimido" son excluyentes'
+			}, status=status.HTTP_400_BAD_REQUEST)
+		
+		if comprimido and not es_archivo_comprimido(comprimido.name):
+			return Response({
+				'error': 'Formato de archivo comprimido no soportado',
+				'details': f'Formatos permitidos: {", ".join(EXTENSIONES_COMPRIMIDO)}'
+			}, status=status.HTTP_400_BAD_REQUEST)
+		
+		# Respuesta en streaming NDJSON si se pide por Accept o por el parámetro stream
+		# (el modo explain siempre responde JSON)
+		stream = _solicita_stream(request) and not explicar
+		
+		# Validar límite de archivos (las entradas del comprimido se limitan al extraerlas: la
+		# extracción se detiene con error al pasar de max_archivos)
+		max_archivos = MAX_FILES_MASIVA_STREAM if stream else MAX_FILES_MASIVA
+		if len(historias_files) > max_archivos:
 			return Response({
 				'error': 'Demasiados archivos',
-				'details': f'Máximo permitido: {MAX_FILES_MASIVA} archivos. Recibidos: {len(historias_files)}',
-				'sugerencia': 'Divida la carga en múltiples peticiones'
+				'details': f'Máximo permitido: {max_archivos} archivos. Recibidos: {len(historias_files)}',
+				'sugerencia': 'Use el endpoint asíncrono POST /api/historias/jobs/ o divida la carga en múltiples peticiones'
 			}, status=status.HTTP_400_BAD_REQUEST)
 		
-		# Obtener configuración desde BD
-		try:
-			config = obtener_configuracion(programa_id=programa_id)
-		except ValueError as e:
+		# Modo de ejecución: 'serie' (en el proceso de la petición) o 'procesos' (pool de procesos)
+		modo = request.POST.get('modo') or request.GET.get('modo') or settings.HISTORIAS_MODO_EJECUCION
+		if modo not in MODOS_EJECUCION:
 			return Response({
-				'error': 'Configuración no encontrada',
-				'details': str(e)
+				'error': 'modo inválido',
+				'details': f'Valores permitidos: {", ".join(MODOS_EJECUCION)}'
 			}, status=status.HTTP_400_BAD_REQUEST)
 		
-		# Procesar cada archivo
+		if comprimido:
+			# Las entradas se extraen y evalúan una a una, sin cargar el comprimido completo
+			archivos = iterar_historias_comprimidas(comprimido, comprimido.name, max_entradas=max_archivos)
+		else:
+			# Cada archivo se lee recién cuando se va a evaluar
+			archivos = ((archivo.name, _leer_contenido(archivo)) for archivo in historias_files)
+		
+		if stream:
+			respuesta = StreamingHttpResponse(
+				_flujo_resultados(archivos, pensum, config, modo),
+				content_type=MEDIA_TYPE_NDJSON
+			)
+			# Evitar que un proxy (nginx) acumule la respuesta antes de enviarla
+			respuesta['X-Accel-Buffering'] = 'no'
+			return respuesta
+		
 		resultados = []
 		archivos_con_error = []
 		
-		for archivo in historias_files:
-			try:
-				nombre_archivo = archivo.name
-				
-				# Leer el archivo según su extensión
-				if nombre_archivo.endswith('.csv'):
-					historia = pd.read_csv(archivo, delimiter=';', encoding='latin-1')
-				elif nombre_archivo.endswith('.xlsx'):
-					historia = pd.read_excel(archivo, engine='openpyxl')
-				elif nombre_archivo.endswith('.xls'):
-					historia = pd.read_excel(archivo, engine='xlrd')
-				else:
-					# Intentar como CSV por defecto
-					historia = pd.read_csv(archivo, delimiter=';', encoding='latin-1')
-				
-				# Normalizar columnas
-				historia.columns = historia.columns.str.strip().str.lower()
-				
-				# Extraer código del estudiante del nombre del archivo
-				codigo_estudiante = None
-				match = re.search(r'Historia-Academica[_-]?(\d+)', nombre_archivo, re.IGNORECASE)
-				if match:
-					codigo_estudiante = match.group(1)
-				else:
-					# Usar el nombre del archivo sin extensión
-					codigo_estudiante = os.path.splitext(nombre_archivo)[0]
-				
-				# Ejecutar comparación
-				resultado = comparar_estudiante(historia, pensum, config=config, programa_id=programa_id)
-				
-				# Reorganizar resultado para que 'estudiante' aparezca primero
-				resultado_ordenado = {}
-				if codigo_estudiante:
-					resultado_ordenado['estudiante'] = codigo_estudiante
-				resultado_ordenado.update(resultado)
-				
-				resultados.append(resultado_ordenado)
-				
-			except Exception as e:
-				logger.error(f"Error procesando archivo {archivo.name}: {str(e)}", exc_info=True)
-				archivos_con_error.append({
-					'archivo': archivo.name,
-					'error': str(e)
-				})
+		# 'serie': en el proceso de la petición; 'procesos': repartido en el pool de procesos.
+		# En ambos casos se consulta antes la caché de resultados por contenido de archivo.
+		num_procesos = None if modo == 'procesos' else 1
+		try:
+			if explicar:
+				with traza.etapa('evaluacion'):
+					for nombre_archivo, resultado, error in evaluar_con_diagnostico(archivos, contexto):
+						if error is not None:
+							archivos_con_error.append({'archivo': nombre_archivo, 'error': error})
+						else:
+							resultados.append(resultado)
+			else:
+				with ComparadorParalelo(pensum, config, num_procesos=num_procesos) as comparador:
+					if comprimido:
+						# En serie se compara en bloques de MAX_FILES_MASIVA historias con comparar_lote
+						tamano_bloque = MAX_FILES_MASIVA if num_procesos == 1 else None
+						salida = comparador.iterar(archivos, tamano_bloque=tamano_bloque)
+					else:
+						archivos = list(archivos)
+						salida = (
+							(nombre_archivo, resultado, error)
+							for (nombre_archivo, _), (resultado, error) in zip(archivos, comparador.comparar(archivos))
+						)
+					for nombre_archivo, resultado, error in salida:
+						if error is not None:
+							archivos_con_error.append({'archivo': nombre_archivo, 'error': error})
+						else:
+							resultados.append(resultado)
+		except ComprimidoInvalido as e:
+			# Solo los errores de extracción del comprimido; los de la comparación siguen como error interno
+			return Response({
+				'error': 'Archivo comprimido inválido',
+				'details': str(e)
+			}, status=status.HTTP_400_BAD_REQUEST)
 		
 		# Calcular estadísticas
 		total_estudiantes = len(resultados)
@@ -474,7 +576,13 @@ def verificar_elegibilidad_masiva(request):
 			respuesta['archivos_con_error'] = archivos_con_error
 			respuesta['warning'] = f'{len(archivos_con_error)} archivo(s) no pudieron ser procesados'
 		
-		return Response(respuesta, status=status.HTTP_200_OK)
+		if explicar:
+			respuesta['diagnostico'] = {'etapas_ms': traza.como_dict()}
+			return Response(respuesta, status=status.HTTP_200_OK)
+		
+		response = Response(respuesta, status=status.HTTP_200_OK)
+		response['X-Cache-Resultados'] = f'aciertos={comparador.aciertos}; fallos={comparador.fallos}'
+		return response
 		
 	except Exception as e:
 		logger.error(f"Exception en verificación masiva: {type(e).__name__}: {str(e)}", exc_info=True)
@@ -482,3 +590,97 @@ def verificar_elegibilidad_masiva(request):
 			'error': 'Error al procesar la solicitud masiva',
 			'details': str(e)
 		}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+
+@extend_schema(
+	responses={
+		200: OpenApiResponse(
+			description="Contadores de la caché de resultados",
+			examples=[
+				OpenApiExample(
+					'Estadísticas',
+					value={"habilitada": True, "aciertos": 340, "fallos": 120, "tasa_aciertos": 73.91}
+				)
+			]
+		)
+	},
+	tags=['comparador-estudiantes'],
+	summary="Estadísticas de la caché de resultados",
+	description="""
+	Aciertos y fallos acumulados de la caché de resultados de verificación. Los resultados se
+	guardan por hash del contenido del archivo, versión del pensum y configuración de elegibilidad.
+	Cada respuesta de verificación incluye además el encabezado X-Cache-Resultados con los
+	aciertos y fallos de esa petición.
+	"""
+)
+@api_view(['GET'])
+def obtener_estadisticas_cache(request):
+	"""
+	Retorna los contadores de aciertos y fallos de la caché de resultados.
+	"""
+	return Response(estadisticas_cache(), status=status.HTTP_200_OK)
+
+def _solicita_explain(request):
+	"""Indica si el cliente pidió el diagnóstico de la comparación (?explain=1)."""
+	valor = request.GET.get('explain') or request.POST.get('explain') or ''
+	return valor.lower() in ('1', 'true', 'si', 'sí')
+
+
+def _solicita_stream(request):
+	"""Indica si el cliente pidió la respuesta en streaming NDJSON."""
+	valor = request.GET.get('stream') or request.POST.get('stream') or ''
+	if valor.lower() in ('1', 'true', 'si', 'sí'):
+		return True
+	return MEDIA_TYPE_NDJSON in request.META.get('HTTP_ACCEPT', '')
+
+
+def _flujo_resultados(archivos, pensum, config, modo):
+	"""
+	Genera la respuesta NDJSON de la verificación masiva: una línea por estudiante a medida
+	que se evalúa y una línea final con el resumen. Solo se mantienen los contadores y los
+	errores de archivo, no la lista de resultados.
+	"""
+	elegibles = 0
+	no_elegibles = 0
+	archivos_con_error = []
+	
+	num_procesos = None if modo == 'procesos' else 1
+	try:
+		with ComparadorParalelo(pensum, config, num_procesos=num_procesos) as comparador:
+			for nombre_archivo, resultado, error in comparador.iterar(archivos):
+				if error is not None:
+					archivos_con_error.append({'archivo': nombre_archivo, 'error': error})
+					continue
+				if resultado['estado'] == 1:
+					elegibles += 1
+				else:
+					no_elegibles += 1
+				yield linea_ndjson(resultado)
+	except Exception as e:
+		# Los encabezados ya se enviaron: el error se reporta como última línea
+		logger.error(f"Exception en verificación masiva (streaming): {type(e).__name__}: {str(e)}", exc_info=True)
+		yield linea_ndjson({
+			'error': 'Error al procesar la solicitud masiva',
+			'details': str(e)
+		})
+		return
+	
+	resumen = {
+		'total_estudiantes': elegibles + no_elegibles,
+		'elegibles': elegibles,
+		'no_elegibles': no_elegibles,
+		'archivos_con_error': archivos_con_error,
+		'cache': {'aciertos': comparador.aciertos, 'fallos': comparador.fallos}
+	}
+	if archivos_con_error:
+		resumen['warning'] = f'{len(archivos_con_error)} archivo(s) no pudieron ser procesados'
+	yield linea_ndjson({'resumen': resumen})
+
+
+def _leer_contenido(archivo):
+	"""Lee el contenido del archivo subido y libera su buffer."""
+	try:
+		return archivo.read()
+	finally:
+		archivo.close()
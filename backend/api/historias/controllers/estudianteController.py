@@ -0,0 +1,214 @@
+from rest_framework import status
+from rest_framework.decorators import api_view, parser_classes
+from rest_framework.parsers import MultiPartParser, FormParser
+from rest_framework.response import Response
+from drf_spectacular.utils import extend_schema, OpenApiResponse, OpenApiExample, OpenApiParameter, inline_serializer
+from rest_framework import serializers
+import logging
+
+from api.historias.models.estudiante import Estudiante
+from api.historias.services.ingesta_historias import ingerir_historias
+from api.historias.tools.lector_comprimidos import (
+	iterar_historias_comprimidas, es_archivo_comprimido, ComprimidoInvalido, EXTENSIONES_COMPRIMIDO
+)
+from api.programa.models.programa import Programa
+
+# Configurar logger
+logger = logging.getLogger(__name__)
+
+
+@extend_schema(
+	request=inline_serializer(
+		name='IngerirHistoriasRequest',
+		fields={
+			'historias': serializers.ListField(
+				child=serializers.FileField(),
+				required=False,
+				help_text='Archivos CSV o Excel con historias académicas. Formato sugerido: Historia-Academica-CODIGO.xls'
+			),
+			'comprimido': serializers.FileField(required=False, help_text='Alternativa a historias: un único .zip o .tar.gz con las historias académicas'),
+			'programa_id': serializers.IntegerField(required=True, help_text='ID del programa académico de los estudiantes'),
+		}
+	),
+	responses={
+		200: OpenApiResponse(
+			description="Historias guardadas",
+			examples=[
+				OpenApiExample(
+					'Ingesta exitosa',
+					value={
+						"estudiantes_creados": 950,
+						"estudiantes_actualizados": 40,
+						"estudiantes_sin_cambios": 10,
+						"registros_creados": 59400,
+						"archivos_con_error": []
+					}
+				)
+			]
+		),
+		400: OpenApiResponse(description="Datos inválidos o incompletos"),
+		500: OpenApiResponse(description="Error interno del servidor")
+	},
+	tags=['comparador-estudiantes'],
+	summary="Guardar historias académicas de estudiantes",
+	description="""
+	Lee las historias académicas y las guarda en la base de datos (estudiante y sus registros de
+	historia), para volver a evaluarlas sin subir de nuevo los archivos.
+
+	- El código del estudiante se toma del nombre del archivo (Historia-Academica-CODIGO.csv).
+	- Si el estudiante ya existe en el programa y el archivo no cambió, no se vuelve a escribir;
+	  si cambió, su historia se reemplaza.
+	- Todo se guarda en una sola transacción con inserciones por lotes.
+	- La elegibilidad de los estudiantes nuevos o modificados la evalúa en segundo plano el
+	  worker de trabajos (manage.py procesar_trabajos_verificacion; ver GET /api/historias/estudiantes/).
+	- Acepta los archivos en `historias` o un único .zip/.tar.gz en `comprimido`.
+	"""
+)
+@api_view(['POST'])
+@parser_classes([MultiPartParser, FormParser])
+def ingerir_historias_estudiantes(request):
+	"""
+	Guarda en la base de datos las historias académicas de los estudiantes de un programa.
+	"""
+	try:
+		# Validar programa_id
+		try:
+			programa_id = int(request.POST.get('programa_id'))
+		except (ValueError, TypeError):
+			return Response({
+				'error': 'programa_id inválido o faltante',
+				'details': 'El campo programa_id es requerido y debe ser un número entero'
+			}, status=status.HTTP_400_BAD_REQUEST)
+
+		if not Programa.objects.filter(pk=programa_id).exists():
+			return Response({
+				'error': 'Programa no encontrado',
+				'details': f'Programa con ID {programa_id} no encontrado'
+			}, status=status.HTTP_400_BAD_REQUEST)
+
+		historias_files = request.FILES.getlist('historias')
+		comprimido = request.FILES.get('comprimido')
+		if not historias_files and not comprimido:
+			return Response({
+				'error': 'No se recibieron archivos de historias',
+				'details': 'Debe enviar al menos un archivo en el campo "historias" o un .zip/.tar.gz en el campo "comprimido"'
+			}, status=status.HTTP_400_BAD_REQUEST)
+
+		if comprimido and historias_files:
+			return Response({
+				'error': 'Envíe historias o un archivo comprimido, no ambos',
+				'details': 'Los campos "historias" y "comprimido" son excluyentes'
+			}, status=status.HTTP_400_BAD_REQUEST)
+
+		if comprimido:
+			if not es_archivo_comprimido(comprimido.name):
+				return Response({
+					'error': 'Formato de archivo comprimido no soportado',
+					'details': f'Formatos permitidos: {", ".join(EXTENSIONES_COMPRIMIDO)}'
+				}, status=status.HTTP_400_BAD_REQUEST)
+			archivos = iterar_historias_comprimidas(comprimido, comprimido.name)
+		else:
+			archivos = ((archivo.name, archivo.read()) for archivo in historias_files)
+
+		try:
+			resumen = ingerir_historias(programa_id, archivos)
+		except ComprimidoInvalido as e:
+			# Solo los errores de extracción del comprimido; los de la ingesta siguen como error interno
+			return Response({
+				'error': 'Archivo comprimido inválido',
+				'details': str(e)
+			}, status=status.HTTP_400_BAD_REQUEST)
+
+		return Response(resumen, status=status.HTTP_200_OK)
+
+	except Exception as e:
+		logger.error(f"Exception en ingesta de historias: {type(e).__name__}: {str(e)}", exc_info=True)
+		return Response({
+			'error': 'Error al guardar las historias',
+			'details': str(e)
+		}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+@extend_schema(
+	parameters=[
+		OpenApiParameter(name='programa_id', type=int, required=True, description='ID del programa académico'),
+		OpenApiParameter(name='estado', type=int, required=False, description='1 elegibles, 0 no elegibles'),
+	],
+	responses={
+		200: OpenApiResponse(
+			description="Estudiantes guardados con su último resultado",
+			examples=[
+				OpenApiExample(
+					'Listado',
+					value={
+						"programa_id": 1,
+						"total": 1,
+						"estudiantes": [
+							{
+								"codigo": "104618021314",
+								"estado": 1,
+								"fecha_evaluacion": "2025-05-10T14:32:11Z",
+								"resultado": {
+									"estudiante": "104618021314",
+									"porcentaje_avance": 62.5,
+									"nivelado": True,
+									"estado": 1,
+									"materias_faltantes_hasta_semestre_limite": []
+								}
+							}
+						]
+					}
+				)
+			]
+		),
+		400: OpenApiResponse(description="Parámetros inválidos")
+	},
+	tags=['comparador-estudiantes'],
+	summary="Listar estudiantes guardados con su elegibilidad",
+	description="""
+	Lista los estudiantes guardados de un programa con su último resultado de elegibilidad.
+
+	- El worker de trabajos recalcula en segundo plano los resultados cuando cambia la
+	  configuración de elegibilidad, el pensum, sus materias o sus alias, y después de cada
+	  ingesta; solo se reescriben los estudiantes cuyo resultado cambió.
+	- `estado` y `resultado` son null mientras el estudiante no se ha evaluado.
+	"""
+)
+@api_view(['GET'])
+def listar_estudiantes(request):
+	"""
+	Lista los estudiantes guardados de un programa con su último resultado de elegibilidad.
+	"""
+	try:
+		try:
+			programa_id = int(request.query_params.get('programa_id'))
+		except (ValueError, TypeError):
+			return Response({
+				'error': 'programa_id inválido o faltante',
+				'details': 'El parámetro programa_id es requerido y debe ser un número entero'
+			}, status=status.HTTP_400_BAD_REQUEST)
+
+		estudiantes = Estudiante.objects.filter(programa_id=programa_id).order_by('codigo')
+
+		estado = request.query_params.get('estado')
+		if estado is not None:
+			if estado not in ('0', '1'):
+				return Response({
+					'error': 'estado inválido',
+					'details': 'El parámetro estado debe ser 0 o 1'
+				}, status=status.HTTP_400_BAD_REQUEST)
+			estudiantes = estudiantes.filter(estado=int(estado))
+
+		filas = list(estudiantes.values('codigo', 'estado', 'fecha_evaluacion', 'resultado'))
+		return Response({
+			'programa_id': programa_id,
+			'total': len(filas),
+			'estudiantes': filas
+		}, status=status.HTTP_200_OK)
+
+	except Exception as e:
+		logger.error(f"Exception listando estudiantes: {type(e).__name__}: {str(e)}", exc_info=True)
+		return Response({
+			'error': 'Error al listar los estudiantes',
+			'details': str(e)
+		}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
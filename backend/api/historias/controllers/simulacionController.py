@@ -0,0 +1,231 @@
+from rest_framework import status
+from rest_framework.decorators import api_view, parser_classes
+from rest_framework.parsers import MultiPartParser, FormParser, JSONParser
+from rest_framework.response import Response
+from drf_spectacular.utils import extend_schema, OpenApiResponse, OpenApiExample, inline_serializer
+from rest_framework import serializers
+import logging
+
+from api.historias.services.contexto_evaluacion import EvaluationContext, ConfiguracionNoEncontrada, PensumNoDisponible
+from api.historias.services.reevaluacion_service import historias_guardadas
+from api.historias.services.simulacion_service import (
+	simular_configuraciones, SEMESTRES_LIMITE_SIMULACION, MAX_PUNTOS_SIMULACION
+)
+from api.historias.tools.cache_historias import leer_historia_cacheada
+from api.historias.tools.lector_historias import extraer_codigo_estudiante
+from api.historias.tools.lector_comprimidos import (
+	iterar_historias_comprimidas, es_archivo_comprimido, ComprimidoInvalido, EXTENSIONES_COMPRIMIDO
+)
+
+# Configurar logger
+logger = logging.getLogger(__name__)
+
+MAX_FILES_SIMULACION = 500  # Límite de archivos por simulación
+
+
+def _leer_lista(datos, campo, tipo):
+	"""
+	Lee un parámetro de lista del cuerpo: lista JSON, campo repetido en el formulario o
+	valores separados por comas. Retorna None si no viene.
+
+	Raises:
+		ValueError: Si algún valor no es del tipo indicado
+	"""
+	if hasattr(datos, 'getlist'):
+		valores = datos.getlist(campo)
+	else:
+		valores = datos.get(campo)
+		if valores is not None and not isinstance(valores, list):
+			valores = [valores]
+	if not valores:
+		return None
+	partes = []
+	for valor in valores:
+		partes.extend(p for p in str(valor).split(',') if p.strip())
+	return [tipo(p) for p in partes]
+
+
+@extend_schema(
+	request=inline_serializer(
+		name='SimularConfiguracionRequest',
+		fields={
+			'programa_id': serializers.IntegerField(required=True, help_text='ID del programa académico'),
+			'historias': serializers.ListField(
+				child=serializers.FileField(),
+				required=False,
+				help_text='Archivos CSV o Excel con historias académicas'
+			),
+			'comprimido': serializers.FileField(required=False, help_text='Alternativa a historias: un único .zip o .tar.gz'),
+			'usar_guardados': serializers.BooleanField(required=False, help_text='Simular con los estudiantes guardados del programa en lugar de archivos'),
+			'semestres_limite': serializers.ListField(
+				child=serializers.IntegerField(), required=False,
+				help_text='Semestres límite a simular (por defecto 5,6,7,8,9)'
+			),
+			'notas_aprobatorias': serializers.ListField(
+				child=serializers.FloatField(), required=False,
+				help_text='Notas aprobatorias a simular (por defecto la de la configuración activa)'
+			),
+		}
+	),
+	responses={
+		200: OpenApiResponse(
+			description="Elegibles por combinación y estado de cada estudiante",
+			examples=[
+				OpenApiExample(
+					'Simulación',
+					value={
+						"programa_id": 1,
+						"total_estudiantes": 2,
+						"semestres_limite": [5, 6],
+						"notas_aprobatorias": [3.0],
+						"puntos": [
+							{"semestre_limite_electivas": 5, "nota_aprobatoria": 3.0, "elegibles": 2, "no_elegibles": 0},
+							{"semestre_limite_electivas": 6, "nota_aprobatoria": 3.0, "elegibles": 1, "no_elegibles": 1}
+						],
+						"estudiantes": [
+							{"estudiante": "104618021314", "estados": [1, 1]},
+							{"estudiante": "104618021315", "estados": [1, 0]}
+						],
+						"archivos_con_error": []
+					}
+				)
+			]
+		),
+		400: OpenApiResponse(description="Datos inválidos o incompletos"),
+		500: OpenApiResponse(description="Error interno del servidor")
+	},
+	tags=['comparador-estudiantes'],
+	summary="Simular configuraciones de elegibilidad",
+	description="""
+	Calcula cuántos estudiantes serían elegibles con cada combinación de semestre límite de
+	electivas y nota aprobatoria, antes de crear la configuración.
+
+	- Las historias se envían como archivos (`historias` o `comprimido`) o se toman de los
+	  estudiantes guardados del programa con `usar_guardados=true`.
+	- `semestres_limite` y `notas_aprobatorias` aceptan listas JSON, campos repetidos o
+	  valores separados por comas. Máximo 100 combinaciones.
+	- Se usan el pensum activo del programa y sus alias; el resultado de cada combinación
+	  es el mismo `estado` que daría la verificación con esa configuración.
+	- `puntos` recorre las notas aprobatorias y, dentro de cada una, los semestres límite;
+	  `estados` de cada estudiante sigue el mismo orden.
+	"""
+)
+@api_view(['POST'])
+@parser_classes([MultiPartParser, FormParser, JSONParser])
+def simular_configuracion(request):
+	"""
+	Simula la elegibilidad de un grupo de estudiantes con varias configuraciones.
+	"""
+	try:
+		# Validar programa_id
+		try:
+			programa_id = int(request.data.get('programa_id'))
+		except (ValueError, TypeError):
+			return Response({
+				'error': 'programa_id inválido o faltante',
+				'details': 'El campo programa_id es requerido y debe ser un número entero'
+			}, status=status.HTTP_400_BAD_REQUEST)
+
+		try:
+			contexto = EvaluationContext.resolver(programa_id)
+		except ConfiguracionNoEncontrada as e:
+			return Response({
+				'error': 'Configuración no encontrada',
+				'details': str(e)
+			}, status=status.HTTP_400_BAD_REQUEST)
+		except PensumNoDisponible as e:
+			return Response({
+				'error': 'Error al obtener pensum desde la base de datos',
+				'details': str(e)
+			}, status=status.HTTP_400_BAD_REQUEST)
+
+		# Malla de parámetros
+		try:
+			semestres_limite = _leer_lista(request.data, 'semestres_limite', int) or list(SEMESTRES_LIMITE_SIMULACION)
+			notas_aprobatorias = (
+				_leer_lista(request.data, 'notas_aprobatorias', float)
+				or [float(contexto.config['nota_aprobatoria'])]
+			)
+		except ValueError:
+			return Response({
+				'error': 'Parámetros de simulación inválidos',
+				'details': 'semestres_limite deben ser enteros y notas_aprobatorias números'
+			}, status=status.HTTP_400_BAD_REQUEST)
+		semestres_limite = list(dict.fromkeys(semestres_limite))
+		notas_aprobatorias = list(dict.fromkeys(notas_aprobatorias))
+		if len(semestres_limite) * len(notas_aprobatorias) > MAX_PUNTOS_SIMULACION:
+			return Response({
+				'error': 'Demasiadas combinaciones',
+				'details': f'Máximo permitido: {MAX_PUNTOS_SIMULACION} combinaciones de semestre límite y nota aprobatoria'
+			}, status=status.HTTP_400_BAD_REQUEST)
+
+		# Historias: estudiantes guardados o archivos
+		historias = []
+		archivos_con_error = []
+		usar_guardados = str(request.data.get('usar_guardados', '')).lower() in ('1', 'true')
+		historias_files = request.FILES.getlist('historias')
+		comprimido = request.FILES.get('comprimido')
+
+		if usar_guardados:
+			if historias_files or comprimido:
+				return Response({
+					'error': 'Envíe archivos o use los estudiantes guardados, no ambos',
+					'details': 'usar_guardados excluye los campos "historias" y "comprimido"'
+				}, status=status.HTTP_400_BAD_REQUEST)
+			historias = historias_guardadas(programa_id)
+		else:
+			if not historias_files and not comprimido:
+				return Response({
+					'error': 'No se recibieron historias',
+					'details': 'Envíe archivos en "historias", un .zip/.tar.gz en "comprimido" o usar_guardados=true'
+				}, status=status.HTTP_400_BAD_REQUEST)
+			if comprimido and historias_files:
+				return Response({
+					'error': 'Envíe historias o un archivo comprimido, no ambos',
+					'details': 'Los campos "historias" y "comprimido" son excluyentes'
+				}, status=status.HTTP_400_BAD_REQUEST)
+			if comprimido and not es_archivo_comprimido(comprimido.name):
+				return Response({
+					'error': 'Formato de archivo comprimido no soportado',
+					'details': f'Formatos permitidos: {", ".join(EXTENSIONES_COMPRIMIDO)}'
+				}, status=status.HTTP_400_BAD_REQUEST)
+			if len(historias_files) > MAX_FILES_SIMULACION:
+				return Response({
+					'error': 'Demasiados archivos',
+					'details': f'Máximo permitido: {MAX_FILES_SIMULACION} archivos. Recibidos: {len(historias_files)}'
+				}, status=status.HTTP_400_BAD_REQUEST)
+
+			if comprimido:
+				archivos = iterar_historias_comprimidas(comprimido, comprimido.name, max_entradas=MAX_FILES_SIMULACION)
+			else:
+				archivos = ((archivo.name, archivo.read()) for archivo in historias_files)
+			try:
+				for nombre, contenido in archivos:
+					try:
+						historias.append((extraer_codigo_estudiante(nombre), leer_historia_cacheada(contenido, nombre)))
+					except Exception as e:
+						logger.error(f"Error leyendo archivo {nombre} para simulación: {str(e)}")
+						archivos_con_error.append({'archivo': nombre, 'error': str(e)})
+			except ComprimidoInvalido as e:
+				return Response({
+					'error': 'Archivo comprimido inválido',
+					'details': str(e)
+				}, status=status.HTTP_400_BAD_REQUEST)
+
+		simulacion = simular_configuraciones(historias, contexto.compilado, semestres_limite, notas_aprobatorias)
+
+		return Response({
+			'programa_id': programa_id,
+			'total_estudiantes': len(historias),
+			'semestres_limite': semestres_limite,
+			'notas_aprobatorias': notas_aprobatorias,
+			**simulacion,
+			'archivos_con_error': archivos_con_error
+		}, status=status.HTTP_200_OK)
+
+	except Exception as e:
+		logger.error(f"Exception en simulación de configuraciones: {type(e).__name__}: {str(e)}", exc_info=True)
+		return Response({
+			'error': 'Error al simular configuraciones',
+			'details': str(e)
+		}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
@@ -0,0 +1,175 @@
+from rest_framework import status
+from rest_framework.decorators import api_view, parser_classes
+from rest_framework.parsers import MultiPartParser, FormParser
+from rest_framework.response import Response
+from drf_spectacular.utils import extend_schema, OpenApiResponse, OpenApiExample, OpenApiParameter, inline_serializer
+from rest_framework import serializers
+import logging
+
+from api.historias.models.trabajo_verificacion import TrabajoVerificacion
+from api.historias.services.contexto_evaluacion import EvaluationContext, ConfiguracionNoEncontrada, PensumNoDisponible
+from api.historias.services.trabajos_service import crear_trabajo, obtener_estado_trabajo
+
+# Configurar logger
+logger = logging.getLogger(__name__)
+
+
+@extend_schema(
+	request=inline_serializer(
+		name='CrearTrabajoVerificacionRequest',
+		fields={
+			'historias': serializers.ListField(
+				child=serializers.FileField(),
+				help_text='Archivos CSV o Excel con historias académicas. Formato sugerido: Historia-Academica-CODIGO.xls'
+			),
+			'programa_id': serializers.IntegerField(required=True, help_text='ID del programa académico (requerido)'),
+		}
+	),
+	responses={
+		202: OpenApiResponse(
+			description="Trabajo creado y encolado",
+			examples=[
+				OpenApiExample(
+					'Trabajo encolado',
+					value={
+						"trabajo_id": 15,
+						"estado": "pendiente",
+						"total_archivos": 1200,
+						"url_estado": "/api/historias/jobs/15/"
+					}
+				)
+			]
+		),
+		400: OpenApiResponse(description="Datos inválidos o incompletos"),
+		500: OpenApiResponse(description="Error interno del servidor")
+	},
+	tags=['comparador-estudiantes'],
+	summary="Crear trabajo asíncrono de verificación masiva",
+	description="""
+	Recibe las historias académicas y retorna de inmediato el ID de un trabajo de verificación.
+	Los archivos se guardan en la base de datos y el worker de trabajos
+	(python manage.py procesar_trabajos_verificacion --continuo) los procesa por lotes, fuera
+	del servidor web. Los trabajos terminados se eliminan tras HISTORIAS_TRABAJOS_RETENCION_DIAS días.
+
+	No tiene el límite de archivos de /api/historias/verificar/masiva/. El progreso y los resultados
+	parciales se consultan con GET /api/historias/jobs/<trabajo_id>/.
+	"""
+)
+@api_view(['POST'])
+@parser_classes([MultiPartParser, FormParser])
+def crear_trabajo_verificacion(request):
+	"""
+	Crea un trabajo asíncrono de verificación masiva en estado pendiente.
+	"""
+	try:
+		# Validar programa_id
+		try:
+			programa_id = int(request.POST.get('programa_id'))
+		except (ValueError, TypeError):
+			return Response({
+				'error': 'programa_id inválido o faltante',
+				'details': 'El campo programa_id es requerido y debe ser un número entero'
+			}, status=status.HTTP_400_BAD_REQUEST)
+
+		# Validar que existan configuración y pensum antes de aceptar el trabajo
+		try:
+			EvaluationContext.resolver(programa_id)
+		except ConfiguracionNoEncontrada as e:
+			return Response({
+				'error': 'Configuración no encontrada',
+				'details': str(e)
+			}, status=status.HTTP_400_BAD_REQUEST)
+		except PensumNoDisponible as e:
+			return Response({
+				'error': 'Error al obtener pensum desde la base de datos',
+				'details': str(e)
+			}, status=status.HTTP_400_BAD_REQUEST)
+
+		historias_files = request.FILES.getlist('historias')
+		if not historias_files:
+			return Response({
+				'error': 'No se recibieron archivos de historias',
+				'details': 'Debe enviar al menos un archivo en el campo "historias"'
+			}, status=status.HTTP_400_BAD_REQUEST)
+
+		trabajo = crear_trabajo(programa_id, historias_files)
+
+		return Response({
+			'trabajo_id': trabajo.trabajo_id,
+			'estado': trabajo.estado,
+			'total_archivos': trabajo.total_archivos,
+			'url_estado': f'/api/historias/jobs/{trabajo.trabajo_id}/'
+		}, status=status.HTTP_202_ACCEPTED)
+
+	except Exception as e:
+		logger.error(f"Exception al crear trabajo de verificación: {type(e).__name__}: {str(e)}", exc_info=True)
+		return Response({
+			'error': 'Error al crear el trabajo de verificación',
+			'details': str(e)
+		}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+@extend_schema(
+	parameters=[
+		OpenApiParameter(name='trabajo_id', type=int, location=OpenApiParameter.PATH, description='ID del trabajo', required=True),
+		OpenApiParameter(name='desde', type=int, location=OpenApiParameter.QUERY, required=False,
+						 description='Cantidad de archivos procesados ya recibidos; solo se retornan los siguientes'),
+	],
+	responses={
+		200: OpenApiResponse(
+			description="Progreso y resultados parciales del trabajo",
+			examples=[
+				OpenApiExample(
+					'Trabajo en proceso',
+					value={
+						"trabajo_id": 15,
+						"programa_id": 1,
+						"estado": "en_proceso",
+						"total_archivos": 1200,
+						"archivos_procesados": 300,
+						"porcentaje_progreso": 25.0,
+						"elegibles": 120,
+						"no_elegibles": 178,
+						"desde": 0,
+						"resultados": [],
+						"archivos_con_error": [{"archivo": "otro.txt", "error": "'definitiva'"}]
+					}
+				)
+			]
+		),
+		404: OpenApiResponse(description="Trabajo no encontrado")
+	},
+	tags=['comparador-estudiantes'],
+	summary="Consultar trabajo de verificación",
+	description="Retorna el estado, el progreso y los resultados parciales de un trabajo de verificación masiva."
+)
+@api_view(['GET'])
+def obtener_trabajo_verificacion(request, trabajo_id):
+	"""
+	Consulta el progreso y los resultados parciales de un trabajo de verificación.
+	"""
+	try:
+		try:
+			desde = max(int(request.GET.get('desde', 0)), 0)
+		except (ValueError, TypeError):
+			return Response({
+				'error': 'Parámetro desde inválido',
+				'details': 'El parámetro desde debe ser un número entero'
+			}, status=status.HTTP_400_BAD_REQUEST)
+
+		try:
+			trabajo = TrabajoVerificacion.objects.get(trabajo_id=trabajo_id)
+		except TrabajoVerificacion.DoesNotExist:
+			return Response({
+				'error': 'Trabajo no encontrado',
+				'details': f'No existe trabajo de verificación con ID {trabajo_id}'
+			}, status=status.HTTP_404_NOT_FOUND)
+
+		return Response(obtener_estado_trabajo(trabajo, desde=desde), status=status.HTTP_200_OK)
+
+	except Exception as e:
+		logger.error(f"Exception al consultar trabajo {trabajo_id}: {type(e).__name__}: {str(e)}", exc_info=True)
+		return Response({
+			'error': 'Error al consultar el trabajo de verificación',
+			'details': str(e)
+		}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
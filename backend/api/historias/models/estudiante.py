@@ -0,0 +1,71 @@
+from django.db import models
+
+
+class Estudiante(models.Model):
+    """
+    Estudiante de un programa cuya historia académica quedó guardada en la BD
+    (RegistroHistoria), para volver a evaluarla sin subir de nuevo el archivo.
+    """
+    estudiante_id = models.AutoField(primary_key=True)
+    programa_id = models.ForeignKey(
+        'Programa',
+        on_delete=models.CASCADE,
+        db_column='programa_id',
+        help_text="Programa académico del estudiante"
+    )
+    codigo = models.CharField(max_length=50, help_text="Código del estudiante (tomado del nombre del archivo)")
+    huella_historia = models.CharField(
+        max_length=64,
+        help_text="SHA-256 del archivo de historia ingerido; si no cambia, no se vuelve a ingerir"
+    )
+    total_registros = models.IntegerField(default=0)
+
+    # Último resultado de elegibilidad (lo escribe la reevaluación; null si aún no se evalúa)
+    estado = models.IntegerField(null=True, blank=True, help_text="1 elegible, 0 no elegible")
+    resultado = models.JSONField(null=True, blank=True, help_text="Resultado completo del comparador")
+    fecha_evaluacion = models.DateTimeField(null=True, blank=True)
+    version_evaluacion = models.CharField(
+        max_length=40, blank=True, default='',
+        help_text="Versión del pensum compilado (materias, alias y configuración) del último resultado; "
+                  "vacía si la historia cambió y falta evaluarla"
+    )
+
+    # Auditoría
+    fecha_creacion = models.DateTimeField(auto_now_add=True)
+    fecha_actualizacion = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'estudiante'
+        app_label = 'api'
+        constraints = [
+            models.UniqueConstraint(fields=['programa_id', 'codigo'], name='estudiante_programa_codigo_unico'),
+        ]
+        indexes = [
+            models.Index(fields=['programa_id', 'estado']),
+        ]
+
+    def __str__(self):
+        return f"Estudiante {self.codigo} - Programa {self.programa_id_id}"
+
+
+class RegistroHistoria(models.Model):
+    """Fila de la historia académica de un estudiante (una materia cursada en un periodo)."""
+    registro_id = models.BigAutoField(primary_key=True)
+    estudiante = models.ForeignKey(Estudiante, on_delete=models.CASCADE, related_name='registros')
+    materia = models.CharField(max_length=200, help_text="Nombre de la materia tal como viene en la historia")
+    materia_normalizada = models.CharField(max_length=200, help_text="Nombre normalizado (mayúsculas, sin tildes)")
+    semestre = models.IntegerField(null=True, blank=True)
+    creditos = models.IntegerField(null=True, blank=True)
+    definitiva = models.FloatField(null=True, blank=True)
+    periodo = models.CharField(max_length=20, null=True, blank=True)
+
+    class Meta:
+        db_table = 'registro_historia'
+        app_label = 'api'
+        indexes = [
+            models.Index(fields=['estudiante', 'materia_normalizada']),
+            models.Index(fields=['estudiante', 'periodo']),
+        ]
+
+    def __str__(self):
+        return f"{self.materia} ({self.periodo}): {self.definitiva}"
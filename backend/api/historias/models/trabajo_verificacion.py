@@ -0,0 +1,92 @@
+from django.db import models
+
+
+class TrabajoVerificacion(models.Model):
+    """
+    Trabajo asíncrono de verificación masiva de elegibilidad.
+    Los archivos se guardan en BD (ArchivoTrabajo) y el worker de trabajos
+    (manage.py procesar_trabajos_verificacion) los procesa, actualizando el progreso a medida
+    que avanza.
+    """
+    ESTADO_PENDIENTE = 'pendiente'
+    ESTADO_EN_PROCESO = 'en_proceso'
+    ESTADO_COMPLETADO = 'completado'
+    ESTADO_FALLIDO = 'fallido'
+    ESTADOS = [
+        (ESTADO_PENDIENTE, 'Pendiente'),
+        (ESTADO_EN_PROCESO, 'En proceso'),
+        (ESTADO_COMPLETADO, 'Completado'),
+        (ESTADO_FALLIDO, 'Fallido'),
+    ]
+
+    trabajo_id = models.AutoField(primary_key=True)
+    programa_id = models.ForeignKey(
+        'Programa',
+        on_delete=models.CASCADE,
+        db_column='programa_id',
+        help_text="Programa académico contra cuyo pensum se verifican las historias"
+    )
+    estado = models.CharField(max_length=20, choices=ESTADOS, default=ESTADO_PENDIENTE)
+
+    # Progreso
+    total_archivos = models.IntegerField(default=0)
+    archivos_procesados = models.IntegerField(default=0)
+    archivos_con_error = models.IntegerField(default=0)
+    elegibles = models.IntegerField(default=0)
+    no_elegibles = models.IntegerField(default=0)
+    error = models.TextField(null=True, blank=True, help_text="Error que hizo fallar el trabajo completo")
+
+    # Auditoría
+    fecha_creacion = models.DateTimeField(auto_now_add=True)
+    fecha_inicio = models.DateTimeField(null=True, blank=True)
+    fecha_fin = models.DateTimeField(null=True, blank=True)
+    fecha_actualizacion = models.DateTimeField(
+        null=True, blank=True,
+        help_text="Último progreso del worker; si se detiene, el trabajo se reclama como abandonado"
+    )
+
+    class Meta:
+        db_table = 'trabajo_verificacion'
+        app_label = 'api'
+        indexes = [
+            models.Index(fields=['estado']),
+        ]
+
+    @property
+    def porcentaje_progreso(self):
+        if not self.total_archivos:
+            return 100.0
+        return round(self.archivos_procesados * 100 / self.total_archivos, 2)
+
+    def __str__(self):
+        return f"Trabajo {self.trabajo_id} - Programa {self.programa_id_id} ({self.estado})"
+
+
+class ArchivoTrabajo(models.Model):
+    """Archivo de historia académica perteneciente a un trabajo de verificación."""
+    ESTADO_PENDIENTE = 'pendiente'
+    ESTADO_PROCESADO = 'procesado'
+    ESTADO_ERROR = 'error'
+    ESTADOS = [
+        (ESTADO_PENDIENTE, 'Pendiente'),
+        (ESTADO_PROCESADO, 'Procesado'),
+        (ESTADO_ERROR, 'Error'),
+    ]
+
+    archivo_id = models.AutoField(primary_key=True)
+    trabajo = models.ForeignKey(TrabajoVerificacion, on_delete=models.CASCADE, related_name='archivos')
+    nombre = models.CharField(max_length=255)
+    contenido = models.BinaryField(help_text="Contenido del archivo; se vacía al procesarlo o si el trabajo falla")
+    estado = models.CharField(max_length=20, choices=ESTADOS, default=ESTADO_PENDIENTE)
+    resultado = models.JSONField(null=True, blank=True)
+    error = models.TextField(null=True, blank=True)
+
+    class Meta:
+        db_table = 'archivo_trabajo'
+        app_label = 'api'
+        indexes = [
+            models.Index(fields=['trabajo', 'estado']),
+        ]
+
+    def __str__(self):
+        return f"{self.nombre} ({self.estado})"
@@ -0,0 +1,78 @@
+import hashlib
+import logging
+
+from django.conf import settings
+from django.core.cache import cache
+
+from api.instrumentacion import registrar_consulta_cache
+
+# Configurar logger
+logger = logging.getLogger(__name__)
+
+PREFIJO_RESULTADO = 'historias:resultado'
+CLAVE_ACIERTOS = 'historias:cache:aciertos'
+CLAVE_FALLOS = 'historias:cache:fallos'
+
+
+def cache_habilitada():
+    return getattr(settings, 'HISTORIAS_CACHE_RESULTADOS', True)
+
+
+def clave_resultado(contenido, pensum):
+    """
+    Clave del resultado de una historia: hash del contenido del archivo, versión del
+    pensum compilado y versión de la configuración (nota aprobatoria y semestre límite).
+    El nombre del archivo no forma parte de la clave.
+    """
+    huella = hashlib.sha256(contenido).hexdigest()
+    config = f"{float(pensum.nota_aprobatoria)}:{int(pensum.semestre_limite)}"
+    return f"{PREFIJO_RESULTADO}:{huella}:{pensum.version}:{config}"
+
+
+def obtener_resultados(claves):
+    """Retorna un diccionario clave -> resultado solo con las claves presentes en caché."""
+    if not claves or not cache_habilitada():
+        return {}
+    return cache.get_many(claves)
+
+
+def guardar_resultados(resultados):
+    """
+    Guarda resultados en caché.
+
+    Args:
+        resultados: Diccionario clave -> resultado (sin el campo 'estudiante')
+    """
+    if not resultados or not cache_habilitada():
+        return
+    cache.set_many(resultados, timeout=getattr(settings, 'HISTORIAS_CACHE_RESULTADOS_TTL', None))
+
+
+def registrar_consultas(aciertos, fallos):
+    """Acumula los contadores globales de aciertos y fallos (compartidos si la caché es Redis)."""
+    if not cache_habilitada():
+        return
+    registrar_consulta_cache('resultados', aciertos=aciertos, fallos=fallos)
+    for clave, cantidad in ((CLAVE_ACIERTOS, aciertos), (CLAVE_FALLOS, fallos)):
+        if not cantidad:
+            continue
+        try:
+            cache.add(clave, 0, timeout=None)
+            cache.incr(clave, cantidad)
+        except ValueError:
+            # La clave fue descartada entre add e incr
+            cache.set(clave, cantidad, timeout=None)
+
+
+def estadisticas_cache():
+    """Aciertos, fallos y tasa de aciertos acumulados de la caché de resultados."""
+    valores = cache.get_many([CLAVE_ACIERTOS, CLAVE_FALLOS])
+    aciertos = valores.get(CLAVE_ACIERTOS, 0)
+    fallos = valores.get(CLAVE_FALLOS, 0)
+    total = aciertos + fallos
+    return {
+        'habilitada': cache_habilitada(),
+        'aciertos': aciertos,
+        'fallos': fallos,
+        'tasa_aciertos': round(aciertos * 100 / total, 2) if total else 0.0,
+    }
@@ -1,8 +1,11 @@
+import numpy as np
 import pandas as pd
 import unicodedata
 import re
 import logging
+from api.instrumentacion import etapa_request, registrar_estudiantes_evaluados
 from ..config.config import CONFIG
+from ..tools.lector_historias import COLUMNAS_REQUERIDAS_HISTORIA, COLUMNAS_HISTORIA
 
 # Configurar logger
 logger = logging.getLogger(__name__)
@@ -36,17 +39,36 @@ def obtener_pensum_desde_bd(programa_id):
     if not pensum_obj:
         raise ValueError(f'No hay pensum activo para el programa "{programa.nombre_programa}" (ID: {programa_id})')
     
+    return pensum_a_dataframe(pensum_obj, programa)
+
+
+def pensum_a_dataframe(pensum_obj, programa):
+    """
+    Convierte las materias obligatorias activas de un pensum en DataFrame.
+    
+    Args:
+        pensum_obj: Pensum ya consultado
+        programa: Programa del pensum (solo para el mensaje de error)
+    
+    Returns:
+        DataFrame con columnas: materia, semestre, créditos
+    
+    Raises:
+        ValueError: Si el pensum no tiene materias activas
+    """
     # Obtener todas las materias activas del pensum
     materias = pensum_obj.materia_set.filter(
         es_activa=True,
         es_obligatoria=True  # solo materias obligatorias cuentan para elegibilidad
     ).values('nombre_materia', 'semestre', 'creditos')
     
-    if not materias.exists():
+    # Una sola consulta: la lista vacía indica que no hay materias
+    materias = list(materias)
+    if not materias:
         raise ValueError(f'El pensum del programa "{programa.nombre_programa}" no tiene materias activas')
     
     # Convertir a DataFrame
-    df = pd.DataFrame(list(materias))
+    df = pd.DataFrame(materias)
     
     # Renombrar columnas para que coincidan con el formato esperado
     df.rename(columns={
@@ -152,23 +174,52 @@ def _es_electiva_fish(materia_nombre):
     return materia_nombre.strip().startswith('ELECTIVA FISH')
 
 
-def comparar_estudiante(historia, pensum, config=None, programa_id=None):
+def _desde_contexto(pensum, config):
+    """
+    Si recibe un EvaluationContext retorna su pensum compilado y su configuración
+    (la configuración explícita tiene prioridad); si no, retorna los argumentos sin cambios.
+    """
+    from .contexto_evaluacion import EvaluationContext
+    if isinstance(pensum, EvaluationContext):
+        return pensum.compilado, config if config is not None else pensum.config
+    return pensum, config
+
+
+def _sin_traza(nombre):
+    """Etapa cuando no se pide traza: solo se mide si hay un request medido en curso (Server-Timing)."""
+    return etapa_request(nombre)
+
+
+def _notas_y_nota_minima(definitiva, nota_aprobatoria):
+    """
+    Convierte las notas a float32 y retorna la nota aprobatoria en la misma precisión.
+    Comparar en float32 contra un umbral float64 haría que, p. ej., 3.1 no alcance 3.1.
+
+    Returns:
+        Tupla (notas float32, nota aprobatoria float32)
+    """
+    notas = pd.to_numeric(definitiva, errors='coerce').astype(np.float32)
+    return notas, np.float32(nota_aprobatoria)
+
+
+def comparar_estudiante(historia, pensum, config=None, programa_id=None, traza=None):
     """
     Compara la historia académica de un estudiante con el pensum para determinar elegibilidad.
     
     Args:
         historia: DataFrame con la historia académica del estudiante
-        pensum: DataFrame con el pensum académico
+        pensum: EvaluationContext o CompiledPensum (recomendado), o DataFrame con el pensum académico
         config: Diccionario opcional con configuración personalizada. Si es None, usa CONFIG por defecto.
                 Debe contener: nota_aprobatoria y semestre_limite_electivas
-        programa_id: ID del programa para obtener el total de créditos del pensum
+        programa_id: ID del programa para obtener el total de créditos del pensum.
+                     Solo se usa cuando pensum es un DataFrame.
+        traza: Traza opcional donde se acumulan los tiempos de cada etapa (modo explain)
     
     Returns:
         Diccionario con los resultados de la comparación
     """
-    print("="*80)
-    print("INICIO DE COMPARACIÓN DE ESTUDIANTE")
-    print("="*80)
+    pensum, config = _desde_contexto(pensum, config)
+    etapa = traza.etapa if traza is not None else _sin_traza
     
     # Validar que se proporcione configuración
     if config is None:
@@ -177,176 +228,116 @@ def comparar_estudiante(historia, pensum, config=None, programa_id=None):
     semestre_limite = config.get("semestre_limite_electivas")
     nota_aprobatoria = config.get("nota_aprobatoria")
     
-    print(f"Configuración recibida:")
-    print(f"  - Semestre límite: {semestre_limite}")
-    print(f"  - Nota aprobatoria: {nota_aprobatoria}")
-    
     if semestre_limite is None or nota_aprobatoria is None:
         raise ValueError("La configuración está incompleta. Faltan campos requeridos.")
 
-    # Normalizar columnas y valores de materia en pensum
-    pensum.columns = pensum.columns.str.strip().str.lower()
-    if 'materia' in pensum.columns:
-        print(f"\n PENSUM - Materias ANTES de normalizar (primeras 5):")
-        print(pensum['materia'].head().tolist())
-        pensum['materia'] = pensum['materia'].apply(_normalize_text)
-        print(f" PENSUM - Materias DESPUÉS de normalizar (primeras 5):")
-        print(pensum['materia'].head().tolist())
+    # El pensum llega precompilado (nombres normalizados, segmentos y FISH ya calculados).
+    # Si llega como DataFrame se compila aquí y el total de créditos se consulta en BD.
+    from .pensum_compilado import CompiledPensum
+    if isinstance(pensum, CompiledPensum):
+        compilado = pensum
+    else:
+        if not programa_id:
+            raise ValueError("programa_id es requerido para calcular créditos obligatorios")
+        try:
+            from api.pensum.repositories.repository_pensum import PensumRepository
+            repo = PensumRepository()
+            pensum_obj = repo.get_current_by_programa(programa_id)
+            if pensum_obj:
+                total_creditos_bd = pensum_obj.creditos_obligatorios_totales
+            else:
+                raise ValueError(f"No se pudo obtener el pensum para programa_id={programa_id}")
+        except Exception as e:
+            raise ValueError(f"Error al calcular créditos del pensum: {e}")
+        compilado = CompiledPensum(pensum, config, creditos_obligatorios_totales=total_creditos_bd)
+
+    # Diagnóstico muestreado para el logger de DEBUG (antes de normalizar la historia).
+    # Con traza (modo explain) quien llama ya registra el diagnóstico completo.
+    diagnostico = None
+    historia.columns = historia.columns.str.strip().str.lower()
+    from .diagnostico import debe_muestrear, explicar_historia
+    if traza is None and debe_muestrear():
+        diagnostico = explicar_historia(historia, compilado, config)
 
     # Pensum segmentado por semestre límite
-    pensum_limite = pensum[pensum["semestre"] <= semestre_limite]
-    pensum_fuera_limite = pensum[pensum["semestre"] > semestre_limite]
-    materias_requeridas = pensum_limite["materia"].tolist()
-    print(f"\n Materias requeridas hasta semestre {semestre_limite}: {len(materias_requeridas)} materias")
-    print(f"   {materias_requeridas[:10]}")  # Mostrar primeras 10
+    pensum_limite = compilado.pensum_limite
+    pensum_fuera_limite = compilado.pensum_fuera_limite
+    materias_requeridas = compilado.materias_requeridas
 
     # Normalizar valores de materia en historia
-    historia.columns = historia.columns.str.strip().str.lower()
-    if 'materia' in historia.columns:
-        print(f"\n HISTORIA - Materias ANTES de normalizar (primeras 5):")
-        print(historia['materia'].head().tolist())
-        historia['materia'] = historia['materia'].apply(_normalize_text)
-        print(f" HISTORIA - Materias DESPUÉS de normalizar (primeras 5):")
-        print(historia['materia'].head().tolist())
+    with etapa('normalizacion'):
+        if 'materia' in historia.columns:
+            historia['materia'] = compilado.aplicar_alias(historia['materia'].apply(_normalize_text))
 
     # Materias aprobadas: si en cualquier semestre la materia tiene definitiva >= nota_aprobatoria
-    aprobadas = historia.loc[historia["definitiva"] >= nota_aprobatoria, "materia"].unique().tolist()
-    print(f"\n Materias APROBADAS (nota >= {nota_aprobatoria}): {len(aprobadas)} materias")
-    print(f"   {aprobadas[:10]}")  # Mostrar primeras 10
+    with etapa('aprobadas'):
+        historia["definitiva"], nota_minima = _notas_y_nota_minima(historia["definitiva"], nota_aprobatoria)
+        aprobadas = historia.loc[historia["definitiva"] >= nota_minima, "materia"].unique().tolist()
 
-    # MANEJO ESPECIAL DE FISH: Contar cuántas Electivas Fish ha aprobado el estudiante
-    electivas_fish_aprobadas = [m for m in aprobadas if _es_electiva_fish(m)]
-    num_electivas_fish = len(electivas_fish_aprobadas)
-    print(f"\n Electivas FISH aprobadas: {num_electivas_fish}")
-    print(f"   {electivas_fish_aprobadas}")
-    
-    # Identificar las FISH en el pensum y marcarlas como aprobadas según las electivas fish del estudiante
-    fish_en_pensum = []
-    for materia in materias_requeridas:
-        if _es_fish(materia):
-            fish_en_pensum.append(materia)
-    
-    print(f"\nprint FISH en pensum (hasta semestre {semestre_limite}): {len(fish_en_pensum)}")
-    print(f"   {fish_en_pensum}")
-    
-    # Ordenar las FISH por número (soporta arábigos y romanos)
-    fish_en_pensum_ordenadas = sorted(fish_en_pensum, key=_extraer_numero_fish)
-    
-    print(f"print FISH ordenadas: {fish_en_pensum_ordenadas}")
-    
-    # Marcar como aprobadas las primeras N FISH según las electivas fish que tenga el estudiante
-    fish_aprobadas = fish_en_pensum_ordenadas[:num_electivas_fish]
-    print(f"\nprint FISH marcadas como aprobadas (basado en {num_electivas_fish} Electivas FISH): {len(fish_aprobadas)}")
-    print(f"   {fish_aprobadas}")
-    
-    # Agregar las FISH aprobadas a la lista de materias aprobadas
-    aprobadas_con_fish = aprobadas + fish_aprobadas
-    print(f"\nprint TOTAL aprobadas (con FISH): {len(aprobadas_con_fish)} materias")
+        # MANEJO ESPECIAL DE FISH: Contar cuántas Electivas Fish ha aprobado el estudiante
+        num_electivas_fish = sum(1 for m in aprobadas if _es_electiva_fish(m))
+        
+        # Marcar como aprobadas las primeras N FISH del pensum (ya ordenadas por número en el pensum compilado)
+        fish_aprobadas = compilado.fish_ordenadas[:num_electivas_fish]
+        aprobadas_con_fish = aprobadas + fish_aprobadas
 
     # Materias aprobadas después del semestre límite
-    materias_aprobadas_fuera_limite_df = pensum_fuera_limite[
-        pensum_fuera_limite['materia'].isin(aprobadas_con_fish)
-    ]
-    materias_aprobadas_fuera_limite = [
-        {
-            "materia": fila['materia'],
-            "semestre": int(fila['semestre']) if pd.notna(fila['semestre']) else None,
-            "creditos": int(fila['créditos']) if pd.notna(fila['créditos']) else None
-        }
-        for _, fila in materias_aprobadas_fuera_limite_df.iterrows()
-    ]
-    print(f"\n Materias aprobadas DESPUÉS del semestre límite: {len(materias_aprobadas_fuera_limite)}")
-
-    # Semestre máximo cursado (asegurar entero)
-    try:
-        semestre_max = int(pd.to_numeric(historia["semestre"], errors='coerce').max())
-    except Exception:
-        semestre_max = 0
-    print(f"\n Semestre máximo cursado: {semestre_max}")
-
-    # Créditos aprobados: sumar solo créditos obligatorios hasta el semestre límite
-    if 'créditos' in pensum_limite.columns:
-        creditos_aprobados = pensum_limite[pensum_limite['materia'].isin(aprobadas_con_fish)]['créditos'].sum()
-    else:
-        # Fallback: sumar créditos desde la historia (si existen) respetando semestre límite
-        historia_semestres = pd.to_numeric(historia["semestre"], errors='coerce')
-        creditos_aprobados = historia.loc[
-            (historia["definitiva"] >= nota_aprobatoria) &
-            (historia_semestres <= semestre_limite),
-            "créditos"
-        ].sum()
-    print(f" Créditos aprobados: {creditos_aprobados}")
-
-    # Periodos matriculados
-    periodos_matriculados = historia["periodo"].nunique() if 'periodo' in historia.columns else 0
-    print(f" Periodos matriculados: {periodos_matriculados}")
-
-    # Créditos requeridos hasta el semestre límite
-    creditos_requeridos_hasta_limite = None
-    if 'créditos' in pensum_limite.columns:
-        creditos_requeridos_hasta_limite = pensum_limite['créditos'].sum()
-        print(f"\n Créditos requeridos hasta semestre {semestre_limite}: {creditos_requeridos_hasta_limite}")
-    else:
-        print("\n No fue posible determinar los créditos requeridos (columna 'créditos' no disponible en pensum)")
-    
-    # Verificación de "nivelado": debe haber aprobado el 100% de los créditos obligatorios hasta el semestre límite
-    nivelado = False
-    if creditos_requeridos_hasta_limite is not None:
-        print(f" Verificación de nivelado (créditos aprobados vs requeridos): {creditos_aprobados} >= {creditos_requeridos_hasta_limite}")
-        nivelado = creditos_requeridos_hasta_limite > 0 and creditos_aprobados >= creditos_requeridos_hasta_limite
-        print(f" Resultado nivelado: {nivelado}")
-    else:
-        print(" Resultado nivelado: No evaluado por falta de información de créditos")
+    with etapa('creditos'):
+        materias_aprobadas_fuera_limite_df = pensum_fuera_limite[
+            pensum_fuera_limite['materia'].isin(aprobadas_con_fish)
+        ]
+        materias_aprobadas_fuera_limite = [
+            {
+                "materia": fila['materia'],
+                "semestre": int(fila['semestre']) if pd.notna(fila['semestre']) else None,
+                "creditos": int(fila['créditos']) if pd.notna(fila['créditos']) else None
+            }
+            for _, fila in materias_aprobadas_fuera_limite_df.iterrows()
+        ]
 
-    # Porcentaje de avance - Calcular total de créditos desde el pensum
-    total_creditos = 0
-    if programa_id:
+        # Semestre máximo cursado (asegurar entero)
         try:
-            from api.pensum.repositories.repository_pensum import PensumRepository
-            repo = PensumRepository()
-            pensum_obj = repo.get_current_by_programa(programa_id)
-            if pensum_obj:
-                total_creditos = pensum_obj.creditos_obligatorios_totales
-            else:
-                raise ValueError(f"No se pudo obtener el pensum para programa_id={programa_id}")
-        except Exception as e:
-            raise ValueError(f"Error al calcular créditos del pensum: {e}")
-    else:
-        raise ValueError("programa_id es requerido para calcular créditos obligatorios")
-    
-    porcentaje_avance = creditos_aprobados / total_creditos if total_creditos else 0
-    print(f"\n Porcentaje de avance: {round(porcentaje_avance * 100, 2)}%")
-    print(f"   ({creditos_aprobados}/{total_creditos})")
-
-    # Materias que faltan hasta el semestre límite (comparando nombres normalizados, incluyendo FISH)
-    faltantes = [m for m in materias_requeridas if m not in aprobadas_con_fish]
-    print(f"\n Materias FALTANTES hasta semestre {semestre_limite}: {len(faltantes)}")
-    if faltantes:
-        print(f"   {faltantes[:10]}")  # Mostrar primeras 10
-        # Mostrar comparaciones detalladas para las primeras 3 faltantes
-        for i, faltante in enumerate(faltantes[:3]):
-            print(f"\n   Faltante #{i+1}: '{faltante}'")
-            # Buscar coincidencias parciales
-            similares = [a for a in aprobadas_con_fish if faltante[:5] in a or a[:5] in faltante]
-            if similares:
-                print(f"      Posibles similares aprobadas: {similares[:3]}")
-
-    # Elegibilidad basada únicamente en el cumplimiento del 100% de créditos obligatorios hasta el semestre límite
-    print(f"\n CRITERIOS DE ELEGIBILIDAD:")
-    print(f"   Nivelado (100% créditos hasta semestre {semestre_limite}): {nivelado}")
-    print(f"   Sin materias faltantes: {not faltantes}")
-    
-    if nivelado and not faltantes:
-        estado = 1
-        print("    ELEGIBLE (cumple créditos y no tiene faltantes)")
-    else:
-        estado = 0
-        print("    NO ELEGIBLE")
+            semestre_max = int(pd.to_numeric(historia["semestre"], errors='coerce').max())
+        except Exception:
+            semestre_max = 0
+
+        # Créditos aprobados: sumar solo créditos obligatorios hasta el semestre límite
+        if 'créditos' in pensum_limite.columns:
+            creditos_aprobados = pensum_limite[pensum_limite['materia'].isin(aprobadas_con_fish)]['créditos'].sum()
+        else:
+            # Fallback: sumar créditos desde la historia (si existen) respetando semestre límite
+            historia_semestres = pd.to_numeric(historia["semestre"], errors='coerce')
+            creditos_aprobados = historia.loc[
+                (historia["definitiva"] >= nota_minima) &
+                (historia_semestres <= semestre_limite),
+                "créditos"
+            ].sum()
+
+        # Periodos matriculados
+        periodos_matriculados = historia["periodo"].nunique() if 'periodo' in historia.columns else 0
+
+    # Verificación de "nivelado": debe haber aprobado el 100% de los créditos obligatorios hasta el semestre límite
+    with etapa('resultados'):
+        creditos_requeridos_hasta_limite = compilado.creditos_requeridos_hasta_limite
+        nivelado = False
+        if creditos_requeridos_hasta_limite is not None:
+            nivelado = creditos_requeridos_hasta_limite > 0 and creditos_aprobados >= creditos_requeridos_hasta_limite
+
+        # Porcentaje de avance - Total de créditos obligatorios del pensum compilado
+        total_creditos = compilado.creditos_obligatorios_totales
+        porcentaje_avance = creditos_aprobados / total_creditos if total_creditos else 0
 
-    print("="*80)
-    print("FIN DE COMPARACIÓN")
-    print("="*80)
+        # Materias que faltan hasta el semestre límite (comparando nombres normalizados, incluyendo FISH)
+        faltantes = [m for m in materias_requeridas if m not in aprobadas_con_fish]
 
+        # Elegibilidad basada únicamente en el cumplimiento del 100% de créditos obligatorios hasta el semestre límite
+        estado = 1 if nivelado and not faltantes else 0
+
+    if diagnostico is not None:
+        from .diagnostico import registrar_diagnostico
+        registrar_diagnostico(None, diagnostico)
+
+    registrar_estudiantes_evaluados(1)
     return {
         "semestre_maximo": semestre_max,
         "creditos_aprobados": int(creditos_aprobados),
@@ -358,3 +349,188 @@ def comparar_estudiante(historia, pensum, config=None, programa_id=None):
         "materias_faltantes_hasta_semestre_limite": faltantes,
         "materias_aprobadas_despues_semestre_limite": materias_aprobadas_fuera_limite
     }
+
+
+def _unir_historias(historias):
+    """
+    Une las historias de varios estudiantes en un solo DataFrame con la columna '_idx'
+    (posición del estudiante en la lista) y las columnas de COLUMNAS_HISTORIA que traigan.
+    
+    Raises:
+        KeyError: Si a una historia le falta una columna requerida
+    """
+    frames = []
+    for idx, (_, historia) in enumerate(historias):
+        historia = historia.copy(deep=False)
+        historia.columns = historia.columns.str.strip().str.lower()
+        for columna in COLUMNAS_REQUERIDAS_HISTORIA:
+            if columna not in historia.columns:
+                raise KeyError(columna)
+        columnas = [c for c in COLUMNAS_HISTORIA if c in historia.columns]
+        frame = historia[columnas]
+        frame.insert(0, '_idx', idx)
+        if len(frame):
+            frames.append(frame)
+    if frames:
+        return pd.concat(frames, ignore_index=True)
+    return pd.DataFrame(columns=['_idx', 'materia', 'semestre', 'definitiva'])
+
+
+def _normalizar_materias(lote, pensum):
+    """Normaliza cada nombre de materia distinto del lote una sola vez y resuelve sus alias (en el lugar)."""
+    codigos, unicos = pd.factorize(lote['materia'], use_na_sentinel=True)
+    unicos_normalizados = pensum.aplicar_alias(
+        pd.Series([_normalize_text(m) for m in unicos] + [""], dtype=object)
+    ).to_numpy(dtype=object)
+    lote['materia'] = unicos_normalizados[codigos]
+
+
+def comparar_lote(historias, pensum, config=None, traza=None):
+    """
+    Compara en un solo paso vectorizado las historias de varios estudiantes contra el pensum.
+    Produce los mismos resultados que llamar a comparar_estudiante por cada estudiante.
+    
+    Args:
+        historias: Lista de tuplas (codigo_estudiante, DataFrame con la historia académica)
+        pensum: EvaluationContext o CompiledPensum del programa
+        config: Diccionario con nota_aprobatoria y semestre_limite_electivas
+                (opcional si pensum es un EvaluationContext)
+        traza: Traza opcional donde se acumulan los tiempos de cada etapa (modo explain)
+    
+    Returns:
+        Lista de diccionarios (uno por historia, en el mismo orden) con 'estudiante'
+        como primer campo seguido de los campos de comparar_estudiante
+    """
+    
+    pensum, config = _desde_contexto(pensum, config)
+    etapa = traza.etapa if traza is not None else _sin_traza
+    
+    if config is None:
+        raise ValueError("La configuración es requerida. Debe existir en la base de datos.")
+    
+    semestre_limite = config.get("semestre_limite_electivas")
+    nota_aprobatoria = config.get("nota_aprobatoria")
+    if semestre_limite is None or nota_aprobatoria is None:
+        raise ValueError("La configuración está incompleta. Faltan campos requeridos.")
+    
+    if not historias:
+        return []
+    
+    # 1. Unir todas las historias en un solo DataFrame identificado por la posición del estudiante
+    with etapa('union'):
+        lote = _unir_historias(historias)
+        n_estudiantes = len(historias)
+    
+    # Normalizar cada nombre de materia distinto una sola vez y resolver sus alias
+    with etapa('normalizacion'):
+        _normalizar_materias(lote, pensum)
+        lote['definitiva'], nota_minima = _notas_y_nota_minima(lote['definitiva'], nota_aprobatoria)
+    
+    # 2. Materias aprobadas (únicas por estudiante) y conteo de Electivas FISH
+    with etapa('aprobadas'):
+        aprobadas = lote.loc[lote['definitiva'] >= nota_minima, ['_idx', 'materia']].drop_duplicates()
+        num_electivas_fish = (
+            aprobadas['materia'].str.startswith('ELECTIVA FISH')
+            .groupby(aprobadas['_idx']).sum()
+            .reindex(range(n_estudiantes), fill_value=0)
+            .to_numpy()
+        )
+    
+        # Rango de cada FISH del pensum: la FISH de rango k se aprueba si el estudiante tiene más de k Electivas FISH
+        rango_fish = {}
+        for rango, nombre in enumerate(pensum.fish_ordenadas):
+            rango_fish.setdefault(nombre, rango)
+    
+        def _matriz_aprobacion(segmento):
+            """Matriz booleana (estudiantes x filas del segmento) de materias aprobadas, incluyendo FISH."""
+            matriz = np.zeros((n_estudiantes, len(segmento)), dtype=bool)
+            if len(segmento) == 0:
+                return matriz
+            posiciones = pd.DataFrame({'materia': segmento['materia'].to_numpy(), '_pos': np.arange(len(segmento))})
+            coincidencias = aprobadas.merge(posiciones, on='materia', how='inner')
+            matriz[coincidencias['_idx'].to_numpy(dtype=int), coincidencias['_pos'].to_numpy(dtype=int)] = True
+            rangos = np.array([rango_fish.get(m, -1) for m in segmento['materia']])
+            columnas_fish = np.flatnonzero(rangos >= 0)
+            if len(columnas_fish):
+                matriz[:, columnas_fish] |= rangos[columnas_fish][None, :] < num_electivas_fish[:, None]
+            return matriz
+    
+        aprobadas_limite = _matriz_aprobacion(pensum.pensum_limite)
+        aprobadas_fuera = _matriz_aprobacion(pensum.pensum_fuera_limite)
+    
+    # 3. Créditos aprobados hasta el semestre límite
+    with etapa('creditos'):
+        if pensum.tiene_creditos:
+            creditos_limite = np.nan_to_num(pensum.creditos_limite.astype(float))
+            creditos_aprobados = aprobadas_limite @ creditos_limite
+        else:
+            # Fallback: sumar créditos desde la historia respetando semestre límite
+            semestres = pd.to_numeric(lote['semestre'], errors='coerce')
+            filtro = (lote['definitiva'] >= nota_minima) & (semestres <= semestre_limite)
+            creditos_historia = lote['créditos'] if 'créditos' in lote.columns else pd.Series(0, index=lote.index)
+            creditos_aprobados = (
+                creditos_historia[filtro].groupby(lote.loc[filtro, '_idx']).sum()
+                .reindex(range(n_estudiantes), fill_value=0)
+                .to_numpy()
+            )
+    
+        # 4. Semestre máximo cursado y periodos matriculados
+        semestre_max = (
+            pd.to_numeric(lote['semestre'], errors='coerce')
+            .groupby(lote['_idx']).max()
+            .reindex(range(n_estudiantes))
+            .fillna(0)
+            .to_numpy()
+        )
+        if 'periodo' in lote.columns:
+            periodos = lote.groupby('_idx')['periodo'].nunique().reindex(range(n_estudiantes), fill_value=0).to_numpy()
+        else:
+            periodos = np.zeros(n_estudiantes, dtype=int)
+    
+    # 5. Estado por estudiante
+    with etapa('resultados'):
+        creditos_requeridos = pensum.creditos_requeridos_hasta_limite
+        total_creditos = pensum.creditos_obligatorios_totales
+        materias_requeridas = pensum.materias_requeridas
+        fuera_limite = [
+            {
+                "materia": fila['materia'],
+                "semestre": int(fila['semestre']) if pd.notna(fila['semestre']) else None,
+                "creditos": int(fila['créditos']) if 'créditos' in fila and pd.notna(fila['créditos']) else None
+            }
+            for _, fila in pensum.pensum_fuera_limite.iterrows()
+        ]
+    
+        resultados = []
+        for idx, (codigo, _) in enumerate(historias):
+            creditos = creditos_aprobados[idx]
+            nivelado = bool(
+                creditos_requeridos is not None
+                and creditos_requeridos > 0
+                and creditos >= creditos_requeridos
+            )
+            faltantes = [materias_requeridas[r] for r in np.flatnonzero(~aprobadas_limite[idx])]
+            porcentaje_avance = creditos / total_creditos if total_creditos else 0
+            resultados.append({
+                "estudiante": codigo,
+                "semestre_maximo": int(semestre_max[idx]),
+                "creditos_aprobados": int(creditos),
+                "creditos_obligatorios_totales": int(total_creditos),
+                "periodos_matriculados": int(periodos[idx]),
+                "porcentaje_avance": round(float(porcentaje_avance) * 100, 2),
+                "nivelado": nivelado,
+                "estado": 1 if nivelado and not faltantes else 0,
+                "materias_faltantes_hasta_semestre_limite": faltantes,
+                "materias_aprobadas_despues_semestre_limite": [
+                    fuera_limite[r] for r in np.flatnonzero(aprobadas_fuera[idx])
+                ]
+            })
+    
+    # Diagnóstico muestreado para el logger de DEBUG (con traza lo registra quien llama)
+    from .diagnostico import debe_muestrear, explicar_historia, registrar_diagnostico
+    for codigo, historia in historias:
+        if traza is None and debe_muestrear():
+            registrar_diagnostico(codigo, explicar_historia(historia, pensum, config))
+    
+    registrar_estudiantes_evaluados(len(resultados))
+    return resultados
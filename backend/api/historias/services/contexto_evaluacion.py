@@ -0,0 +1,97 @@
+import logging
+
+from .pensum_compilado import compilar_pensum
+
+# Configurar logger
+logger = logging.getLogger(__name__)
+
+
+class ConfiguracionNoEncontrada(ValueError):
+    """El programa no tiene configuración de elegibilidad activa."""
+
+
+class PensumNoDisponible(ValueError):
+    """El programa no existe o no tiene pensum activo con materias."""
+
+
+class EvaluationContext:
+    """
+    Todo lo que la verificación de elegibilidad necesita de la base de datos para un programa:
+    programa, pensum activo, configuración y pensum compilado con sus totales.
+
+    Se resuelve una sola vez por petición o por trabajo y se pasa al comparador, de modo que
+    evaluar cada estudiante no ejecuta consultas SQL.
+
+    Uso:
+        contexto = EvaluationContext.resolver(programa_id)
+        resultados = comparar_lote(historias, contexto)
+    """
+
+    def __init__(self, programa, pensum, config, compilado):
+        self.programa = programa
+        self.pensum = pensum
+        self.config = config
+        self.compilado = compilado
+        self.creditos_obligatorios_totales = compilado.creditos_obligatorios_totales
+
+    @property
+    def programa_id(self):
+        return self.programa.programa_id
+
+    @classmethod
+    def resolver(cls, programa_id, usar_cache=True):
+        """
+        Consulta configuración, programa y pensum activo (programa y pensum en una sola consulta)
+        y compila el pensum, o lo toma de la caché de pensums compilados.
+
+        Args:
+            programa_id: ID del programa académico
+            usar_cache: Si es False, configuración y pensum compilado se leen de la BD sin pasar
+                por las cachés en proceso (p. ej. para la reevaluación, que no debe usar una
+                entrada que otro worker todavía no invalidó)
+
+        Raises:
+            ConfiguracionNoEncontrada: Si no hay configuración activa para el programa
+            PensumNoDisponible: Si el programa no existe o no tiene pensum activo con materias
+        """
+        from api.configuracion.controllers.configuracionController import obtener_configuracion
+        from api.configuracion.models.configuracion_elegibilidad import ConfiguracionElegibilidad
+        from api.pensum.models.pensum import Pensum
+        from api.programa.models.programa import Programa
+
+        if usar_cache:
+            try:
+                config = obtener_configuracion(programa_id=programa_id)
+            except ValueError as e:
+                raise ConfiguracionNoEncontrada(str(e))
+        else:
+            config_db = ConfiguracionElegibilidad.get_config_activa(programa_id=programa_id)
+            if config_db is None:
+                raise ConfiguracionNoEncontrada(f'No existe configuración de elegibilidad para el programa {programa_id}')
+            config = config_db.to_dict()
+
+        pensum = (
+            Pensum.objects
+            .select_related('programa_id')
+            .filter(programa_id__pk=programa_id, es_activo=True)
+            .first()
+        )
+        if pensum is None:
+            try:
+                programa = Programa.objects.get(pk=programa_id)
+            except Programa.DoesNotExist:
+                raise PensumNoDisponible(f'Programa con ID {programa_id} no encontrado')
+            raise PensumNoDisponible(
+                f'No hay pensum activo para el programa "{programa.nombre_programa}" (ID: {programa_id})'
+            )
+
+        programa = pensum.programa_id
+        try:
+            compilado = compilar_pensum(pensum, programa, config, usar_cache=usar_cache)
+        except ValueError as e:
+            raise PensumNoDisponible(str(e))
+
+        return cls(programa, pensum, config, compilado)
+
+    def __repr__(self):
+        return f"EvaluationContext(programa_id={self.programa_id}, pensum={self.compilado!r})"
@@ -0,0 +1,185 @@
+import json
+import logging
+import random
+import time
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+
+from .comparadorService import comparar_lote, _normalize_text, _es_electiva_fish, _notas_y_nota_minima, _desde_contexto
+from ..tools.cache_historias import leer_historia_cacheada
+from ..tools.lector_historias import extraer_codigo_estudiante
+
+# Logger propio: se puede habilitar en DEBUG sin habilitar el resto del módulo de historias
+logger = logging.getLogger(__name__)
+
+# Coincidencias cercanas por materia faltante y similitud mínima (trigramas, 0 a 1)
+MAX_COINCIDENCIAS = 3
+SIMILITUD_MINIMA = 0.3
+
+
+class Traza:
+    """
+    Tiempos por etapa de una verificación, en milisegundos.
+
+    Uso:
+        traza = Traza()
+        with traza.etapa('lectura'):
+            historia = ...
+        traza.como_dict()  # {'lectura': 1.234}
+    """
+
+    def __init__(self):
+        self.etapas = {}
+
+    @contextmanager
+    def etapa(self, nombre):
+        inicio = time.perf_counter()
+        try:
+            yield
+        finally:
+            transcurrido = (time.perf_counter() - inicio) * 1000
+            self.etapas[nombre] = self.etapas.get(nombre, 0.0) + transcurrido
+
+    def como_dict(self):
+        return {nombre: round(ms, 3) for nombre, ms in self.etapas.items()}
+
+
+def explicar_historia(historia, pensum, config=None):
+    """
+    Diagnóstico de la comparación de una historia contra el pensum: cómo se normalizó cada
+    nombre de materia (y a qué materia equivale si es un alias), qué FISH del pensum cubren las Electivas FISH aprobadas y, para cada
+    materia faltante, las materias aprobadas de la historia con nombre parecido que no
+    coinciden con ninguna materia del pensum (posibles diferencias de nombre).
+
+    No modifica la historia.
+
+    Args:
+        historia: DataFrame con la historia académica (nombres de materia sin normalizar)
+        pensum: EvaluationContext o CompiledPensum del programa
+        config: Diccionario con nota_aprobatoria (opcional si pensum es un EvaluationContext)
+
+    Returns:
+        Diccionario con materias_normalizadas, fish y coincidencias_cercanas
+    """
+    pensum, config = _desde_contexto(pensum, config)
+    columnas = {str(c).strip().lower(): c for c in historia.columns}
+    materias = historia[columnas['materia']]
+    notas, nota_minima = _notas_y_nota_minima(historia[columnas['definitiva']], config['nota_aprobatoria'])
+
+    normalizadas = {}
+    for original in materias.dropna().unique():
+        normalizadas[original] = _normalize_text(original)
+    # Alias de materias del pensum: nombre normalizado -> nombre en el pensum
+    equivalentes = {
+        original: pensum.alias[normalizada]
+        for original, normalizada in normalizadas.items() if normalizada in pensum.alias
+    }
+
+    aprobadas = list(dict.fromkeys(
+        equivalentes.get(original, normalizadas[original])
+        for original, nota in zip(materias, notas)
+        if nota >= nota_minima and original in normalizadas
+    ))
+
+    # Las FISH del pensum se asignan en orden a las Electivas FISH aprobadas
+    electivas_fish = [m for m in aprobadas if _es_electiva_fish(m)]
+    fish_asignadas = pensum.fish_ordenadas[:len(electivas_fish)]
+    aprobadas_con_fish = set(aprobadas) | set(fish_asignadas)
+    faltantes = [m for m in pensum.materias_requeridas if m not in aprobadas_con_fish]
+
+    # Candidatas: aprobadas cuyo nombre no está en el pensum ni es Electiva FISH
+    materias_pensum = set(pensum.pensum['materia'])
+    candidatas = [m for m in aprobadas if m not in materias_pensum and not _es_electiva_fish(m)]
+    cercanas = pensum.indice_trigramas.coincidencias(
+        candidatas, faltantes, k=MAX_COINCIDENCIAS, similitud_minima=SIMILITUD_MINIMA
+    )
+    coincidencias = [
+        {
+            'materia': faltante,
+            'candidatas': [
+                {'materia': candidata, 'similitud': similitud}
+                for candidata, similitud in cercanas[faltante]
+            ]
+        }
+        for faltante in faltantes
+    ]
+
+    return {
+        'materias_normalizadas': [
+            {'original': original, 'normalizada': normalizada,
+             **({'alias_de': equivalentes[original]} if original in equivalentes else {})}
+            for original, normalizada in normalizadas.items()
+        ],
+        'fish': {
+            'electivas_fish_aprobadas': electivas_fish,
+            'fish_pensum': list(pensum.fish_ordenadas),
+            'asignacion': [
+                {'electiva': electiva, 'fish_pensum': fish}
+                for electiva, fish in zip(electivas_fish, fish_asignadas)
+            ],
+        },
+        'coincidencias_cercanas': coincidencias,
+    }
+
+
+def debe_muestrear():
+    """
+    Indica si se registra el diagnóstico de esta comparación en el logger de DEBUG.
+    Se muestrea una fracción HISTORIAS_DIAGNOSTICO_MUESTREO de las comparaciones y solo si
+    el logger tiene DEBUG habilitado.
+    """
+    if not logger.isEnabledFor(logging.DEBUG):
+        return False
+    return random.random() < getattr(settings, 'HISTORIAS_DIAGNOSTICO_MUESTREO', 0.0)
+
+
+def registrar_diagnostico(codigo, diagnostico):
+    """
+    Escribe el diagnóstico de un estudiante en el logger de DEBUG como JSON.
+
+    Args:
+        codigo: Código del estudiante, o None si no se conoce
+        diagnostico: Diccionario retornado por explicar_historia
+    """
+    if not logger.isEnabledFor(logging.DEBUG):
+        return
+    estudiante = f" estudiante={codigo}" if codigo else ""
+    logger.debug(
+        f"Diagnóstico de comparación{estudiante}: "
+        f"{json.dumps(diagnostico, cls=DjangoJSONEncoder, ensure_ascii=False)}"
+    )
+
+
+def evaluar_con_diagnostico(archivos, contexto):
+    """
+    Lee y compara los archivos uno a uno, agregando a cada resultado el campo 'diagnostico'
+    con la explicación de la comparación y los tiempos por etapa de ese estudiante.
+    No usa la caché de resultados ni el pool de procesos: los tiempos corresponden a la
+    lectura y comparación reales.
+
+    Args:
+        archivos: Iterable de tuplas (nombre_archivo, contenido en bytes)
+        contexto: EvaluationContext del programa
+
+    Yields:
+        Tuplas (nombre_archivo, resultado, error); uno de resultado o error es None
+    """
+    for nombre, contenido in archivos:
+        traza = Traza()
+        try:
+            with traza.etapa('lectura'):
+                historia = leer_historia_cacheada(contenido, nombre)
+            codigo = extraer_codigo_estudiante(nombre)
+            resultado = comparar_lote([(codigo, historia)], contexto, traza=traza)[0]
+        except Exception as e:
+            logger.error(f"Error procesando archivo {nombre}: {str(e)}")
+            yield nombre, None, str(e)
+            continue
+        with traza.etapa('diagnostico'):
+            diagnostico = explicar_historia(historia, contexto)
+        diagnostico['etapas_ms'] = traza.como_dict()
+        resultado['diagnostico'] = diagnostico
+        registrar_diagnostico(codigo, diagnostico)
+        yield nombre, resultado, None
@@ -0,0 +1,217 @@
+import logging
+import math
+import os
+import pickle
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from itertools import islice
+
+from .cache_resultados import (
+    cache_habilitada, clave_resultado, obtener_resultados, guardar_resultados, registrar_consultas
+)
+from .comparadorService import comparar_lote
+from ..tools.cache_historias import leer_historia_cacheada
+from ..tools.lector_historias import extraer_codigo_estudiante
+
+# Configurar logger
+logger = logging.getLogger(__name__)
+
+# Fragmentos por proceso: más de uno para balancear archivos de distinto tamaño
+FRAGMENTOS_POR_PROCESO = 4
+
+# Historias mínimas por fragmento: comparar_lote vectoriza entre estudiantes, así que un
+# fragmento más chico pierde esa ventaja frente a lo que cuesta enviarlo a otro proceso. Con
+# menos archivos que esto se evalúa en el proceso actual
+TAMANO_MINIMO_FRAGMENTO = 50
+
+# Pool de procesos del worker (uno por proceso, creado de forma perezosa y reutilizado entre
+# peticiones y trabajos)
+_pool = None
+_pool_procesos = 0
+_pool_lock = threading.Lock()
+
+# En cada proceso del pool: (versión del pensum, configuración) -> (pensum, config). El
+# contexto viaja serializado con cada fragmento, pero solo se deserializa la primera vez
+_contextos_worker = {}
+MAX_CONTEXTOS_WORKER = 8
+
+
+def num_procesos_configurado():
+    """Tamaño del pool según settings.HISTORIAS_PROCESOS (por defecto, un proceso por CPU)."""
+    from django.conf import settings
+    return getattr(settings, 'HISTORIAS_PROCESOS', None) or os.cpu_count() or 1
+
+
+def evaluar_archivos(archivos, pensum, config):
+    """
+    Lee y compara una lista de archivos en el proceso actual.
+
+    Args:
+        archivos: Lista de tuplas (nombre_archivo, contenido en bytes)
+        pensum: CompiledPensum del programa
+        config: Diccionario con nota_aprobatoria y semestre_limite_electivas
+
+    Returns:
+        Lista alineada con archivos de tuplas (resultado, error); una de las dos es None
+    """
+    historias = []
+    posiciones = []
+    salida = [(None, None)] * len(archivos)
+    for i, (nombre, contenido) in enumerate(archivos):
+        try:
+            historia = leer_historia_cacheada(contenido, nombre)
+            historias.append((extraer_codigo_estudiante(nombre), historia))
+            posiciones.append(i)
+        except Exception as e:
+            logger.error(f"Error procesando archivo {nombre}: {str(e)}")
+            salida[i] = (None, str(e))
+
+    for i, resultado in zip(posiciones, comparar_lote(historias, pensum, config=config)):
+        salida[i] = (resultado, None)
+    return salida
+
+
+def _obtener_pool(num_procesos):
+    """Pool de procesos de este worker; se crea la primera vez o si cambia su tamaño."""
+    global _pool, _pool_procesos
+    with _pool_lock:
+        if _pool is None or _pool_procesos != num_procesos:
+            if _pool is not None:
+                _pool.shutdown(wait=False)
+            _pool = ProcessPoolExecutor(max_workers=num_procesos)
+            _pool_procesos = num_procesos
+        return _pool
+
+
+def _descartar_pool(pool):
+    """Descarta un pool roto (un proceso murió) para que la próxima petición cree otro."""
+    global _pool
+    with _pool_lock:
+        if _pool is pool:
+            _pool = None
+    pool.shutdown(wait=False)
+
+
+def _evaluar_fragmento(clave, contexto_serializado, archivos):
+    contexto = _contextos_worker.get(clave)
+    if contexto is None:
+        if len(_contextos_worker) >= MAX_CONTEXTOS_WORKER:
+            _contextos_worker.clear()
+        contexto = _contextos_worker[clave] = pickle.loads(contexto_serializado)
+    pensum, config = contexto
+    return evaluar_archivos(archivos, pensum, config)
+
+
+class ComparadorParalelo:
+    """
+    Reparte la lectura y comparación de historias entre el pool de procesos del worker, en
+    fragmentos de al menos TAMANO_MINIMO_FRAGMENTO archivos. El pool se crea una vez por
+    proceso y se reutiliza; el pensum compilado y la configuración se serializan una vez por
+    comparador y cada proceso del pool los deserializa una sola vez por versión del pensum.
+
+    Uso:
+        with ComparadorParalelo(pensum, config) as comparador:
+            salida = comparador.comparar(archivos)
+    """
+
+    def __init__(self, pensum, config, num_procesos=None):
+        self.pensum = pensum
+        self.config = config
+        self.num_procesos = max(1, num_procesos or num_procesos_configurado())
+        self._pool = None
+        self._contexto_serializado = None
+        # Consultas a la caché de resultados hechas por este comparador
+        self.aciertos = 0
+        self.fallos = 0
+
+    def __enter__(self):
+        if self.num_procesos > 1:
+            self._pool = _obtener_pool(self.num_procesos)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        # El pool es del worker y sigue vivo para las próximas peticiones
+        self._pool = None
+        return False
+
+    def comparar(self, archivos):
+        """
+        Consulta primero la caché de resultados por contenido; solo se leen y comparan
+        los archivos que no estén en caché.
+
+        Args:
+            archivos: Lista de tuplas (nombre_archivo, contenido en bytes)
+
+        Returns:
+            Lista alineada con archivos de tuplas (resultado, error)
+        """
+        if not cache_habilitada():
+            return self._evaluar(archivos)
+
+        claves = [clave_resultado(contenido, self.pensum) for _, contenido in archivos]
+        en_cache = obtener_resultados(claves)
+        pendientes = [i for i, clave in enumerate(claves) if clave not in en_cache]
+        evaluados = self._evaluar([archivos[i] for i in pendientes]) if pendientes else []
+
+        salida = [None] * len(archivos)
+        nuevos = {}
+        for i, (resultado, error) in zip(pendientes, evaluados):
+            salida[i] = (resultado, error)
+            if resultado is not None:
+                nuevos[claves[i]] = {k: v for k, v in resultado.items() if k != 'estudiante'}
+        for i, (nombre, _) in enumerate(archivos):
+            if salida[i] is None:
+                salida[i] = ({'estudiante': extraer_codigo_estudiante(nombre), **en_cache[claves[i]]}, None)
+
+        guardar_resultados(nuevos)
+        aciertos = len(archivos) - len(pendientes)
+        self.aciertos += aciertos
+        self.fallos += len(pendientes)
+        registrar_consultas(aciertos, len(pendientes))
+        return salida
+
+    def _evaluar(self, archivos):
+        if self._pool is None or len(archivos) <= TAMANO_MINIMO_FRAGMENTO:
+            return evaluar_archivos(archivos, self.pensum, self.config)
+
+        tamano = max(TAMANO_MINIMO_FRAGMENTO, math.ceil(len(archivos) / (self.num_procesos * FRAGMENTOS_POR_PROCESO)))
+        fragmentos = [archivos[i:i + tamano] for i in range(0, len(archivos), tamano)]
+        if self._contexto_serializado is None:
+            self._contexto_serializado = pickle.dumps((self.pensum, self.config), protocol=pickle.HIGHEST_PROTOCOL)
+        clave = (self.pensum.version, tuple(sorted(self.config.items())))
+        salida = []
+        try:
+            for parcial in self._pool.map(
+                _evaluar_fragmento,
+                [clave] * len(fragmentos), [self._contexto_serializado] * len(fragmentos), fragmentos
+            ):
+                salida.extend(parcial)
+        except BrokenProcessPool:
+            _descartar_pool(self._pool)
+            self._pool = None
+            raise
+        return salida
+
+    def iterar(self, archivos, tamano_bloque=None):
+        """
+        Igual que comparar, pero consume los archivos por bloques y entrega cada resultado
+        apenas su bloque termina, en el orden de entrada. Solo un bloque está en memoria a la vez.
+
+        Args:
+            archivos: Iterable de tuplas (nombre_archivo, contenido en bytes); puede ser un generador
+            tamano_bloque: Archivos por bloque. Por defecto, 1 en serie (menor latencia) y
+                num_procesos * TAMANO_MINIMO_FRAGMENTO con pool
+
+        Yields:
+            Tuplas (nombre_archivo, resultado, error); uno de resultado o error es None
+        """
+        if tamano_bloque is None:
+            tamano_bloque = 1 if self._pool is None else self.num_procesos * TAMANO_MINIMO_FRAGMENTO
+        archivos = iter(archivos)
+        while True:
+            bloque = list(islice(archivos, tamano_bloque))
+            if not bloque:
+                break
+            for (nombre, _), (resultado, error) in zip(bloque, self.comparar(bloque)):
+                yield nombre, resultado, error
@@ -0,0 +1,177 @@
+import hashlib
+import logging
+from itertools import islice
+
+import numpy as np
+import pandas as pd
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from api.historias.models.estudiante import Estudiante, RegistroHistoria
+from .comparadorService import _normalize_text
+from ..tools.cache_historias import leer_historia_cacheada
+from ..tools.lector_historias import extraer_codigo_estudiante
+
+# Configurar logger
+logger = logging.getLogger(__name__)
+
+# Filas por INSERT en bulk_create
+TAMANO_LOTE_INGESTA = getattr(settings, 'HISTORIAS_TAMANO_LOTE_INGESTA', 2000)
+
+
+def ingerir_historias(programa_id, archivos, tamano_lote=None):
+    """
+    Lee historias académicas y las guarda en la BD (Estudiante y RegistroHistoria).
+
+    Todo se escribe en una sola transacción con bulk_create por lotes. Un estudiante cuyo
+    archivo no cambió (misma huella SHA-256) no se vuelve a escribir; si cambió, sus
+    registros se reemplazan. La elegibilidad de los estudiantes nuevos o modificados (con
+    version_evaluacion vacía) la calcula después el worker de trabajos (ver
+    reevaluacion_service.reevaluar_programas_pendientes).
+
+    Args:
+        programa_id: ID del programa académico
+        archivos: Iterable de tuplas (nombre_archivo, contenido en bytes). El código del
+            estudiante se extrae del nombre; si se repite, prevalece el último archivo.
+        tamano_lote: Filas por INSERT (por defecto HISTORIAS_TAMANO_LOTE_INGESTA)
+
+    Returns:
+        Diccionario con estudiantes_creados, estudiantes_actualizados,
+        estudiantes_sin_cambios, registros_creados y archivos_con_error
+    """
+    tamano_lote = tamano_lote or TAMANO_LOTE_INGESTA
+
+    # 1. Leer todas las historias antes de abrir la transacción
+    historias = {}
+    archivos_con_error = []
+    for nombre, contenido in archivos:
+        try:
+            historia = leer_historia_cacheada(contenido, nombre)
+        except Exception as e:
+            logger.error(f"Error leyendo archivo {nombre} para ingesta: {str(e)}")
+            archivos_con_error.append({'archivo': nombre, 'error': str(e)})
+            continue
+        codigo = extraer_codigo_estudiante(nombre)
+        if len(codigo) > 50:
+            # Estudiante.codigo es CharField(max_length=50)
+            logger.error(f"Código de estudiante demasiado largo en {nombre}")
+            archivos_con_error.append({'archivo': nombre, 'error': 'El código del estudiante excede 50 caracteres'})
+            continue
+        historias[codigo] = (hashlib.sha256(contenido).hexdigest(), historia)
+
+    with transaction.atomic():
+        # 2. Estudiantes existentes del programa (una consulta)
+        existentes = {
+            estudiante.codigo: estudiante
+            for estudiante in Estudiante.objects.filter(programa_id=programa_id, codigo__in=list(historias))
+        }
+        nuevos = []
+        actualizados = []
+        sin_cambios = 0
+        ahora = timezone.now()
+        for codigo, (huella, historia) in historias.items():
+            estudiante = existentes.get(codigo)
+            if estudiante is None:
+                nuevos.append(Estudiante(programa_id_id=programa_id, codigo=codigo,
+                                         huella_historia=huella, total_registros=len(historia)))
+            elif estudiante.huella_historia != huella:
+                estudiante.huella_historia = huella
+                estudiante.total_registros = len(historia)
+                estudiante.fecha_actualizacion = ahora
+                estudiante.version_evaluacion = ''
+                actualizados.append(estudiante)
+            else:
+                sin_cambios += 1
+
+        Estudiante.objects.bulk_create(nuevos, batch_size=tamano_lote)
+        if any(estudiante.pk is None for estudiante in nuevos):
+            # Backends que no retornan la PK en bulk_create (MySQL): se consultan por código
+            ids = dict(
+                Estudiante.objects
+                .filter(programa_id=programa_id, codigo__in=[e.codigo for e in nuevos])
+                .values_list('codigo', 'estudiante_id')
+            )
+            for estudiante in nuevos:
+                estudiante.pk = ids[estudiante.codigo]
+
+        if actualizados:
+            Estudiante.objects.bulk_update(
+                actualizados, ['huella_historia', 'total_registros', 'fecha_actualizacion', 'version_evaluacion'],
+                batch_size=tamano_lote
+            )
+            RegistroHistoria.objects.filter(estudiante__in=actualizados).delete()
+
+        # 3. Registros de los estudiantes nuevos o con historia distinta
+        por_escribir = [(e.pk, historias[e.codigo][1]) for e in nuevos + actualizados]
+        registros = _registros_historia(por_escribir)
+        registros_creados = 0
+        while True:
+            lote = list(islice(registros, tamano_lote))
+            if not lote:
+                break
+            RegistroHistoria.objects.bulk_create(lote)
+            registros_creados += len(lote)
+
+    logger.info(
+        f"Ingesta programa {programa_id}: {len(nuevos)} nuevos, {len(actualizados)} actualizados, "
+        f"{sin_cambios} sin cambios, {registros_creados} registros"
+    )
+    return {
+        'estudiantes_creados': len(nuevos),
+        'estudiantes_actualizados': len(actualizados),
+        'estudiantes_sin_cambios': sin_cambios,
+        'registros_creados': registros_creados,
+        'archivos_con_error': archivos_con_error,
+    }
+
+
+def _registros_historia(historias):
+    """
+    Genera los RegistroHistoria de varias historias. Los nombres de materia distintos se
+    normalizan una sola vez para todo el lote.
+
+    Args:
+        historias: Lista de tuplas (estudiante_id, DataFrame con la historia)
+    """
+    frames = []
+    for estudiante_id, historia in historias:
+        frame = historia.copy(deep=False)
+        frame.columns = frame.columns.str.strip().str.lower()
+        frame = frame.reindex(columns=['materia', 'semestre', 'créditos', 'definitiva', 'periodo'])
+        frame.insert(0, '_estudiante', estudiante_id)
+        if len(frame):
+            frames.append(frame)
+    if not frames:
+        return iter(())
+    lote = pd.concat(frames, ignore_index=True)
+
+    codigos, unicos = pd.factorize(lote['materia'], use_na_sentinel=True)
+    normalizados = np.array([_normalize_text(m)[:200] for m in unicos] + [""], dtype=object)
+    originales = np.array([str(m).strip()[:200] for m in unicos] + [""], dtype=object)
+
+    def _enteros(serie):
+        numeros = pd.to_numeric(serie, errors='coerce')
+        return [None if pd.isna(n) else int(n) for n in numeros]
+
+    def _decimales(serie):
+        # Las notas se leen en float32: se redondean para no guardar 3.0999999046
+        numeros = pd.to_numeric(serie, errors='coerce').astype(float).round(2)
+        return [None if pd.isna(n) else n for n in numeros]
+
+    columnas = zip(
+        lote['_estudiante'].tolist(),
+        originales[codigos],
+        normalizados[codigos],
+        _enteros(lote['semestre']),
+        _enteros(lote['créditos']),
+        _decimales(lote['definitiva']),
+        [None if pd.isna(p) else str(p).strip()[:20] for p in lote['periodo']],
+    )
+    return (
+        RegistroHistoria(
+            estudiante_id=estudiante_id, materia=materia, materia_normalizada=normalizada,
+            semestre=semestre, creditos=creditos, definitiva=definitiva, periodo=periodo
+        )
+        for estudiante_id, materia, normalizada, semestre, creditos, definitiva, periodo in columnas
+    )
@@ -0,0 +1,215 @@
+import hashlib
+import logging
+
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from api.cache_versionada import CacheVersionada
+from api.instrumentacion import registrar_consulta_cache
+from .comparadorService import _normalize_text, _es_fish, _extraer_numero_fish
+from ..tools.indice_trigramas import IndiceTrigramas
+
+# Configurar logger
+logger = logging.getLogger(__name__)
+
+
+class CompiledPensum:
+    """
+    Representación precalculada del pensum de un programa para una configuración dada.
+
+    Contiene todo lo que el comparador necesita y que no depende del estudiante:
+    nombres normalizados, segmentación por semestre límite, créditos, las FISH
+    ordenadas, los alias de materias y los totales requeridos. Se construye una vez por
+    (pensum_id, configuración) y se reutiliza en todas las verificaciones.
+    """
+
+    def __init__(self, pensum, config, pensum_id=None, creditos_obligatorios_totales=None, alias=None):
+        """
+        Args:
+            pensum: DataFrame con columnas materia, semestre, créditos
+            config: Diccionario con nota_aprobatoria y semestre_limite_electivas
+            pensum_id: ID del pensum en BD (None si el pensum no viene de la BD)
+            creditos_obligatorios_totales: Total de créditos obligatorios. Si es None se
+                calcula como los créditos requeridos hasta el semestre límite.
+            alias: Diccionario nombre alternativo -> nombre de la materia en el pensum
+        """
+        semestre_limite = config.get("semestre_limite_electivas")
+        nota_aprobatoria = config.get("nota_aprobatoria")
+        if semestre_limite is None or nota_aprobatoria is None:
+            raise ValueError("La configuración está incompleta. Faltan campos requeridos.")
+
+        self.pensum_id = pensum_id
+        self.semestre_limite = semestre_limite
+        self.nota_aprobatoria = nota_aprobatoria
+
+        # Normalizar columnas y nombres una sola vez
+        df = pensum.copy()
+        df.columns = df.columns.str.strip().str.lower()
+        df['materia'] = df['materia'].map(_normalize_text)
+        self.pensum = df.reset_index(drop=True)
+
+        # Alias normalizados: nombre en la historia -> nombre normalizado en el pensum
+        self.alias = {
+            _normalize_text(nombre): _normalize_text(materia)
+            for nombre, materia in (alias or {}).items()
+        }
+
+        # Máscaras y segmentos por semestre límite
+        self.mascara_limite = (self.pensum['semestre'] <= semestre_limite).to_numpy()
+        self.pensum_limite = self.pensum[self.mascara_limite]
+        self.pensum_fuera_limite = self.pensum[~self.mascara_limite]
+        self.materias_requeridas = self.pensum_limite['materia'].tolist()
+
+        self.tiene_creditos = 'créditos' in self.pensum.columns
+        if self.tiene_creditos:
+            self.creditos_limite = self.pensum_limite['créditos'].to_numpy()
+            self.creditos_requeridos_hasta_limite = self.pensum_limite['créditos'].sum()
+        else:
+            self.creditos_limite = None
+            self.creditos_requeridos_hasta_limite = None
+
+        # FISH del pensum (hasta el semestre límite) ordenadas por número
+        self.fish_ordenadas = sorted(
+            [m for m in self.materias_requeridas if _es_fish(m)],
+            key=_extraer_numero_fish
+        )
+
+        if creditos_obligatorios_totales is None:
+            creditos_obligatorios_totales = self.creditos_requeridos_hasta_limite or 0
+        self.creditos_obligatorios_totales = creditos_obligatorios_totales
+
+        self.version = self._calcular_version()
+        self._indice_trigramas = None
+
+    def _calcular_version(self):
+        """Huella del contenido compilado: cambia si cambian materias, créditos o configuración."""
+        h = hashlib.sha1()
+        h.update(repr((self.semestre_limite, float(self.nota_aprobatoria),
+                       self.creditos_obligatorios_totales)).encode('utf-8'))
+        columnas = [c for c in ('materia', 'semestre', 'créditos') if c in self.pensum.columns]
+        for fila in self.pensum[columnas].itertuples(index=False, name=None):
+            h.update(repr(fila).encode('utf-8'))
+        h.update(repr(sorted(self.alias.items())).encode('utf-8'))
+        return h.hexdigest()
+
+    def aplicar_alias(self, materias):
+        """
+        Reemplaza los nombres (ya normalizados) que son alias por el nombre de la materia
+        en el pensum, con una búsqueda en diccionario por valor (Series.map).
+
+        Args:
+            materias: Series con nombres de materia normalizados
+
+        Returns:
+            Series del mismo índice con los alias resueltos
+        """
+        if not self.alias:
+            return materias
+        equivalentes = materias.map(self.alias)
+        return equivalentes.where(equivalentes.notna(), materias)
+
+    @property
+    def indice_trigramas(self):
+        """Índice de trigramas de las materias requeridas; se construye la primera vez que se usa."""
+        if self._indice_trigramas is None:
+            self._indice_trigramas = IndiceTrigramas(self.materias_requeridas)
+        return self._indice_trigramas
+
+    @property
+    def config(self):
+        return {
+            "nota_aprobatoria": self.nota_aprobatoria,
+            "semestre_limite_electivas": self.semestre_limite,
+        }
+
+    def __repr__(self):
+        return (f"CompiledPensum(pensum_id={self.pensum_id}, materias={len(self.pensum)}, "
+                f"semestre_limite={self.semestre_limite})")
+
+
+# Caché en proceso: (pensum_id, nota_aprobatoria, semestre_limite) -> CompiledPensum, invalidada
+# en todos los workers por la versión 'pensum_compilado:version'
+_cache_compilados = CacheVersionada('pensum_compilado')
+
+
+def _clave_cache(pensum_id, config):
+    return (
+        pensum_id,
+        float(config.get("nota_aprobatoria")),
+        int(config.get("semestre_limite_electivas")),
+    )
+
+
+def obtener_pensum_compilado(programa_id, config):
+    """
+    Obtiene el pensum activo del programa compilado para la configuración dada.
+    Las materias solo se consultan y normalizan cuando no hay una versión en caché.
+
+    Args:
+        programa_id: ID del programa académico
+        config: Diccionario con nota_aprobatoria y semestre_limite_electivas
+
+    Returns:
+        CompiledPensum
+
+    Raises:
+        ValueError: Si el programa no existe o no tiene pensum activo con materias
+    """
+    from api.pensum.repositories.repository_pensum import PensumRepository
+    from api.programa.models.programa import Programa
+
+    try:
+        programa = Programa.objects.get(pk=programa_id)
+    except Programa.DoesNotExist:
+        raise ValueError(f'Programa con ID {programa_id} no encontrado')
+
+    pensum_obj = PensumRepository().get_current_by_programa(programa_id)
+    if not pensum_obj:
+        raise ValueError(f'No hay pensum activo para el programa "{programa.nombre_programa}" (ID: {programa_id})')
+
+    return compilar_pensum(pensum_obj, programa, config)
+
+
+def compilar_pensum(pensum_obj, programa, config, usar_cache=True):
+    """
+    Compila un pensum ya consultado (desde caché si existe).
+
+    Args:
+        pensum_obj: Pensum activo del programa
+        programa: Programa del pensum (solo para mensajes de error)
+        config: Diccionario con nota_aprobatoria y semestre_limite_electivas
+        usar_cache: Si es False se compila desde la BD sin leer ni escribir la caché
+
+    Raises:
+        ValueError: Si el pensum no tiene materias activas
+    """
+    def _compilar():
+        from .comparadorService import pensum_a_dataframe
+        from api.materia.repositories.materia_alias_repository import MateriaAliasRepository
+        pensum_df = pensum_a_dataframe(pensum_obj, programa)
+        alias = MateriaAliasRepository().obtener_mapa_por_pensum(pensum_obj.pensum_id)
+        compilado = CompiledPensum(pensum_df, config, pensum_id=pensum_obj.pensum_id, alias=alias)
+        logger.debug(f"Pensum compilado en caché: {compilado!r}")
+        return compilado
+
+    if not usar_cache:
+        return _compilar()
+    compilado, acierto = _cache_compilados.obtener(_clave_cache(pensum_obj.pensum_id, config), _compilar)
+    registrar_consulta_cache('pensum', aciertos=int(acierto), fallos=int(not acierto))
+    return compilado
+
+
+def invalidar_pensums_compilados():
+    """
+    Descarta los pensums compilados en este proceso y, al confirmar la transacción, en todos
+    los workers (ver CacheVersionada.invalidar).
+    """
+    _cache_compilados.invalidar()
+
+
+@receiver([post_save, post_delete], sender='api.Materia')
+@receiver([post_save, post_delete], sender='api.MateriaAlias')
+@receiver([post_save, post_delete], sender='api.Pensum')
+@receiver([post_save, post_delete], sender='api.ConfiguracionElegibilidad')
+def _invalidar_por_cambio(sender, **kwargs):
+    invalidar_pensums_compilados()
@@ -0,0 +1,162 @@
+import logging
+
+import pandas as pd
+from django.conf import settings
+from django.utils import timezone
+
+from api.historias.models.estudiante import Estudiante, RegistroHistoria
+from .comparadorService import comparar_lote
+from .contexto_evaluacion import EvaluationContext, ConfiguracionNoEncontrada, PensumNoDisponible
+
+# Configurar logger
+logger = logging.getLogger(__name__)
+
+# Estudiantes que se leen de BD y se comparan en cada lote
+TAMANO_LOTE_REEVALUACION = getattr(settings, 'HISTORIAS_TAMANO_LOTE_REEVALUACION', 500)
+
+# Columnas de RegistroHistoria -> columnas de la historia que recibe el comparador
+_COLUMNAS_REGISTRO = {
+    'materia': 'materia',
+    'semestre': 'semestre',
+    'creditos': 'créditos',
+    'definitiva': 'definitiva',
+    'periodo': 'periodo',
+}
+
+
+def reevaluar_programa(programa_id, tamano_lote=None):
+    """
+    Evalúa a los estudiantes guardados de un programa cuyo resultado se calculó con otra
+    versión del pensum compilado (o que aún no se evalúan), por lotes con comparar_lote. La
+    versión cambia con las materias, los alias y la configuración, así que cualquier cambio se
+    detecta, aunque no haya disparado señales (update(), bulk_create, otro worker).
+
+    Configuración y pensum se leen de la BD sin pasar por las cachés en proceso. Solo se
+    reescribe el resultado de los estudiantes cuyo resultado cambió; a los demás solo se les
+    actualiza la versión.
+
+    Args:
+        programa_id: ID del programa académico
+        tamano_lote: Estudiantes por lote (por defecto HISTORIAS_TAMANO_LOTE_REEVALUACION)
+
+    Returns:
+        Diccionario con estudiantes_evaluados y estudiantes_actualizados
+
+    Raises:
+        ConfiguracionNoEncontrada: Si no hay configuración activa para el programa
+        PensumNoDisponible: Si el programa no tiene pensum activo con materias
+    """
+    tamano_lote = tamano_lote or TAMANO_LOTE_REEVALUACION
+    contexto = EvaluationContext.resolver(programa_id, usar_cache=False)
+    version = contexto.compilado.version
+
+    estudiantes = (
+        Estudiante.objects
+        .filter(programa_id=programa_id)
+        .exclude(version_evaluacion=version)
+        .only('estudiante_id', 'codigo', 'estado', 'resultado')
+        .order_by('estudiante_id')
+    )
+    evaluados = 0
+    actualizados = 0
+    ultimo_id = 0
+    while True:
+        lote = list(estudiantes.filter(estudiante_id__gt=ultimo_id)[:tamano_lote])
+        if not lote:
+            break
+        ultimo_id = lote[-1].estudiante_id
+
+        historias = _historias_desde_registros([e.estudiante_id for e in lote])
+        resultados = comparar_lote([(e.codigo, historias[e.estudiante_id]) for e in lote], contexto)
+
+        ahora = timezone.now()
+        cambiados = []
+        sin_cambios = []
+        for estudiante, resultado in zip(lote, resultados):
+            if estudiante.resultado == resultado:
+                sin_cambios.append(estudiante.estudiante_id)
+                continue
+            estudiante.resultado = resultado
+            estudiante.estado = resultado['estado']
+            estudiante.fecha_evaluacion = ahora
+            estudiante.version_evaluacion = version
+            cambiados.append(estudiante)
+        if cambiados:
+            Estudiante.objects.bulk_update(cambiados, ['resultado', 'estado', 'fecha_evaluacion', 'version_evaluacion'])
+        if sin_cambios:
+            Estudiante.objects.filter(estudiante_id__in=sin_cambios).update(version_evaluacion=version)
+
+        evaluados += len(lote)
+        actualizados += len(cambiados)
+
+    if evaluados:
+        logger.info(f"Reevaluación programa {programa_id}: {evaluados} evaluados, {actualizados} con cambios")
+    return {'estudiantes_evaluados': evaluados, 'estudiantes_actualizados': actualizados}
+
+
+def reevaluar_programas_pendientes():
+    """
+    Reevalúa (ver reevaluar_programa) cada programa con estudiantes guardados. La llama el
+    worker de trabajos (manage.py procesar_trabajos_verificacion) en cada ciclo, fuera de los
+    workers web. Los programas sin configuración o pensum activo se omiten.
+
+    Returns:
+        Diccionario programa_id -> resumen, solo de los programas con estudiantes evaluados
+    """
+    resumenes = {}
+    programas = Estudiante.objects.order_by('programa_id').values_list('programa_id', flat=True).distinct()
+    for programa_id in programas:
+        try:
+            resumen = reevaluar_programa(programa_id)
+        except (ConfiguracionNoEncontrada, PensumNoDisponible) as e:
+            logger.debug(f"Reevaluación programa {programa_id} omitida: {e}")
+            continue
+        except Exception as e:
+            logger.error(f"Error reevaluando programa {programa_id}: {e}", exc_info=True)
+            continue
+        if resumen['estudiantes_evaluados']:
+            resumenes[programa_id] = resumen
+    return resumenes
+
+
+def historias_guardadas(programa_id):
+    """
+    Historias de todos los estudiantes guardados de un programa, ordenados por código.
+
+    Returns:
+        Lista de tuplas (codigo_estudiante, DataFrame con la historia), como recibe comparar_lote
+    """
+    estudiantes = list(
+        Estudiante.objects.filter(programa_id=programa_id)
+        .order_by('codigo').values_list('estudiante_id', 'codigo')
+    )
+    historias = _agrupar_registros(
+        RegistroHistoria.objects.filter(estudiante__programa_id=programa_id),
+        [estudiante_id for estudiante_id, _ in estudiantes]
+    )
+    return [(codigo, historias[estudiante_id]) for estudiante_id, codigo in estudiantes]
+
+
+def _historias_desde_registros(estudiante_ids):
+    """Historias de varios estudiantes (ver _agrupar_registros), con una sola consulta."""
+    return _agrupar_registros(RegistroHistoria.objects.filter(estudiante_id__in=estudiante_ids), estudiante_ids)
+
+
+def _agrupar_registros(registros, estudiante_ids):
+    """
+    Arma las historias a partir de los RegistroHistoria del queryset.
+
+    Returns:
+        Diccionario estudiante_id -> DataFrame con la historia (columnas del comparador);
+        un estudiante sin registros tiene una historia vacía
+    """
+    filas = registros.order_by('estudiante_id', 'registro_id').values_list('estudiante_id', *_COLUMNAS_REGISTRO)
+    registros = pd.DataFrame.from_records(
+        list(filas), columns=['_estudiante', *_COLUMNAS_REGISTRO.values()]
+    )
+    historias = {
+        estudiante_id: historia.drop(columns='_estudiante').reset_index(drop=True)
+        for estudiante_id, historia in registros.groupby('_estudiante', sort=False)
+    }
+    vacia = registros.iloc[:0].drop(columns='_estudiante')
+    return {estudiante_id: historias.get(estudiante_id, vacia) for estudiante_id in estudiante_ids}
@@ -0,0 +1,128 @@
+import numpy as np
+import pandas as pd
+
+from .comparadorService import (
+    _unir_historias, _normalizar_materias, _notas_y_nota_minima, _es_fish, _extraer_numero_fish
+)
+
+# Semestres límite que se simulan si no se indican
+SEMESTRES_LIMITE_SIMULACION = (5, 6, 7, 8, 9)
+
+# Máximo de combinaciones (semestre límite x nota aprobatoria) por simulación
+MAX_PUNTOS_SIMULACION = 100
+
+
+def simular_configuraciones(historias, pensum, semestres_limite, notas_aprobatorias):
+    """
+    Evalúa la elegibilidad de varios estudiantes para cada combinación de semestre límite y
+    nota aprobatoria, sin repetir la comparación por cada combinación. Da el mismo 'estado'
+    que comparar_lote con el pensum compilado para esa configuración.
+
+    Se calcula una sola vez la mejor nota de cada estudiante en cada materia del pensum. Por
+    cada nota aprobatoria se obtienen los créditos aprobados y las materias faltantes por
+    semestre del pensum y se acumulan (cumsum), de modo que cada semestre límite es una
+    lectura de la suma acumulada. Solo las FISH se recalculan por semestre límite, porque
+    cuáles cubren las Electivas FISH depende de las FISH que quedan dentro del límite.
+
+    Args:
+        historias: Lista de tuplas (codigo_estudiante, DataFrame con la historia académica)
+        pensum: CompiledPensum del programa (se usan sus materias y alias, no su configuración)
+        semestres_limite: Semestres límite a simular
+        notas_aprobatorias: Notas aprobatorias a simular
+
+    Returns:
+        Diccionario con 'puntos' (una entrada por combinación, nota aprobatoria por fuera y
+        semestre límite por dentro, con elegibles y no_elegibles) y 'estudiantes' (código y
+        estado en cada punto, en el mismo orden)
+    """
+    n_estudiantes = len(historias)
+    # Umbrales en float32, como las notas (ver _notas_y_nota_minima)
+    umbrales = np.array(notas_aprobatorias, dtype=np.float32)
+    materias_pensum = pensum.pensum['materia'].to_numpy(dtype=object)
+    n_materias = len(materias_pensum)
+
+    # 1. Mejor nota de cada estudiante en cada materia (las notas vacías no aprueban)
+    lote = _unir_historias(historias)
+    _normalizar_materias(lote, pensum)
+    lote['definitiva'], _ = _notas_y_nota_minima(lote['definitiva'], 0)
+    mejores = (
+        lote.dropna(subset=['definitiva'])
+        .groupby(['_idx', 'materia'], sort=False)['definitiva'].max()
+        .reset_index()
+    )
+    nota_maxima = np.full((n_estudiantes, n_materias), -np.inf, dtype=np.float32)
+    posiciones = pd.DataFrame({'materia': materias_pensum, '_pos': np.arange(n_materias)})
+    coincidencias = mejores.merge(posiciones, on='materia', how='inner')
+    nota_maxima[coincidencias['_idx'].to_numpy(dtype=int), coincidencias['_pos'].to_numpy(dtype=int)] = (
+        coincidencias['definitiva'].to_numpy(dtype=np.float32)
+    )
+
+    # aprobadas[g, e, m]: el estudiante e aprueba la materia m con la nota aprobatoria g
+    aprobadas = nota_maxima[None, :, :] >= umbrales[:, None, None]
+
+    # Electivas FISH distintas aprobadas por estudiante, para cada nota aprobatoria
+    electivas = mejores[mejores['materia'].str.startswith('ELECTIVA FISH')]
+    num_electivas_fish = np.zeros((len(umbrales), n_estudiantes), dtype=int)
+    for g, umbral in enumerate(umbrales):
+        np.add.at(num_electivas_fish[g], electivas.loc[electivas['definitiva'] >= umbral, '_idx'].to_numpy(dtype=int), 1)
+
+    # 2. Créditos aprobados y materias faltantes por semestre del pensum, acumulados
+    semestres_materia = pd.to_numeric(pensum.pensum['semestre'], errors='coerce').to_numpy(dtype=float)
+    if pensum.tiene_creditos:
+        creditos = np.nan_to_num(pd.to_numeric(pensum.pensum['créditos'], errors='coerce').to_numpy(dtype=float))
+    else:
+        creditos = np.zeros(n_materias)
+    es_fish = np.array([_es_fish(m) for m in materias_pensum], dtype=bool)
+    con_semestre = ~np.isnan(semestres_materia)
+    semestres = np.unique(semestres_materia[con_semestre])
+
+    # Matriz materia -> semestre del pensum (materias sin semestre nunca entran al límite)
+    por_semestre = np.zeros((n_materias, len(semestres)))
+    por_semestre[np.flatnonzero(con_semestre), np.searchsorted(semestres, semestres_materia[con_semestre])] = 1
+    no_fish = por_semestre * ~es_fish[:, None]
+
+    creditos_acumulados = np.cumsum((aprobadas * creditos) @ no_fish, axis=2)
+    faltantes_acumuladas = np.cumsum((~aprobadas) @ no_fish, axis=2)
+    requeridos_acumulados = np.cumsum(creditos @ por_semestre)
+
+    # 3. Estado por semestre límite: lectura de las sumas acumuladas más las FISH del límite
+    estados = np.zeros((len(umbrales), len(semestres_limite), n_estudiantes), dtype=np.int8)
+    for l, semestre_limite in enumerate(semestres_limite):
+        k = np.searchsorted(semestres, semestre_limite, side='right')
+        if k == 0 or not pensum.tiene_creditos:
+            continue
+        creditos_aprobados = creditos_acumulados[:, :, k - 1].copy()
+        faltantes = faltantes_acumuladas[:, :, k - 1].copy()
+        requeridos = requeridos_acumulados[k - 1]
+
+        # Las FISH del límite se asignan en orden de número a las Electivas FISH aprobadas
+        columnas_fish = np.flatnonzero(es_fish & con_semestre & (semestres_materia <= semestre_limite))
+        rango_fish = {}
+        for rango, nombre in enumerate(sorted(materias_pensum[columnas_fish], key=_extraer_numero_fish)):
+            rango_fish.setdefault(nombre, rango)
+        for m in columnas_fish:
+            cubierta = aprobadas[:, :, m] | (rango_fish[materias_pensum[m]] < num_electivas_fish)
+            creditos_aprobados += cubierta * creditos[m]
+            faltantes += ~cubierta
+
+        if requeridos > 0:
+            estados[:, l, :] = (creditos_aprobados >= requeridos) & (faltantes == 0)
+
+    puntos = [
+        {
+            'semestre_limite_electivas': int(semestre_limite),
+            'nota_aprobatoria': float(nota),
+            'elegibles': int(estados[g, l].sum()),
+            'no_elegibles': int(n_estudiantes - estados[g, l].sum()),
+        }
+        for g, nota in enumerate(notas_aprobatorias)
+        for l, semestre_limite in enumerate(semestres_limite)
+    ]
+    por_estudiante = estados.reshape(len(puntos), n_estudiantes).T
+    return {
+        'puntos': puntos,
+        'estudiantes': [
+            {'estudiante': codigo, 'estados': por_estudiante[idx].tolist()}
+            for idx, (codigo, _) in enumerate(historias)
+        ],
+    }
@@ -0,0 +1,232 @@
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from api.historias.models.trabajo_verificacion import TrabajoVerificacion, ArchivoTrabajo
+from api.historias.services.ejecucion_paralela import ComparadorParalelo, TAMANO_MINIMO_FRAGMENTO
+from api.historias.services.contexto_evaluacion import EvaluationContext
+
+# Configurar logger
+logger = logging.getLogger(__name__)
+
+# Cantidad de archivos que se leen de BD y se comparan en cada lote
+TAMANO_LOTE_TRABAJO = getattr(settings, 'HISTORIAS_TAMANO_LOTE_TRABAJO', 50)
+
+# Segundos sin progreso tras los cuales un trabajo en proceso se considera abandonado (su
+# worker murió o se reinició) y vuelve a pendiente
+TIMEOUT_TRABAJO = getattr(settings, 'HISTORIAS_TRABAJOS_TIMEOUT', 600)
+
+# Días que se conservan los trabajos terminados (y sus resultados) antes de eliminarlos
+RETENCION_TRABAJOS_DIAS = getattr(settings, 'HISTORIAS_TRABAJOS_RETENCION_DIAS', 7)
+
+
+def crear_trabajo(programa_id, archivos):
+    """
+    Registra un trabajo de verificación con sus archivos en estado pendiente. Lo procesa el
+    worker de trabajos (manage.py procesar_trabajos_verificacion), fuera del servidor web.
+
+    Args:
+        programa_id: ID del programa académico
+        archivos: Lista de archivos subidos (deben tener .name y .read())
+
+    Returns:
+        TrabajoVerificacion creado (en estado pendiente)
+    """
+    with transaction.atomic():
+        trabajo = TrabajoVerificacion.objects.create(
+            programa_id_id=programa_id,
+            total_archivos=len(archivos)
+        )
+        # Insertar por lotes para no cargar todos los archivos en memoria a la vez
+        for inicio in range(0, len(archivos), TAMANO_LOTE_TRABAJO):
+            ArchivoTrabajo.objects.bulk_create([
+                ArchivoTrabajo(trabajo=trabajo, nombre=archivo.name, contenido=archivo.read())
+                for archivo in archivos[inicio:inicio + TAMANO_LOTE_TRABAJO]
+            ])
+    return trabajo
+
+
+def procesar_trabajo(trabajo_id):
+    """
+    Procesa un trabajo pendiente por lotes de archivos. Solo un worker puede tomar el trabajo:
+    el cambio de estado pendiente -> en_proceso se hace con un UPDATE condicional. Cada lote
+    actualiza fecha_actualizacion, que sirve para detectar trabajos abandonados. El contenido
+    de cada archivo se vacía al procesarlo y, si el trabajo falla, el de los que quedaron.
+
+    Returns:
+        True si este worker procesó el trabajo, False si ya había sido tomado
+    """
+    tomado = TrabajoVerificacion.objects.filter(
+        trabajo_id=trabajo_id,
+        estado=TrabajoVerificacion.ESTADO_PENDIENTE
+    ).update(
+        estado=TrabajoVerificacion.ESTADO_EN_PROCESO,
+        fecha_inicio=timezone.now(),
+        fecha_actualizacion=timezone.now()
+    )
+    if not tomado:
+        return False
+
+    trabajo = TrabajoVerificacion.objects.get(trabajo_id=trabajo_id)
+    try:
+        # Configuración y pensum se resuelven una vez para todo el trabajo
+        contexto = EvaluationContext.resolver(trabajo.programa_id_id)
+
+        # En modo 'procesos' se usa el pool del worker; cada lote alcanza para darle al menos un
+        # fragmento de TAMANO_MINIMO_FRAGMENTO archivos a cada proceso
+        num_procesos = None if settings.HISTORIAS_MODO_EJECUCION == 'procesos' else 1
+        pendientes = trabajo.archivos.filter(estado=ArchivoTrabajo.ESTADO_PENDIENTE).order_by('archivo_id')
+        with ComparadorParalelo(contexto.compilado, contexto.config, num_procesos=num_procesos) as comparador:
+            tamano_lote = TAMANO_LOTE_TRABAJO
+            if comparador.num_procesos > 1:
+                tamano_lote = max(tamano_lote, comparador.num_procesos * TAMANO_MINIMO_FRAGMENTO)
+            while True:
+                lote = list(pendientes[:tamano_lote])
+                if not lote:
+                    break
+                _procesar_lote(trabajo, lote, comparador)
+
+        TrabajoVerificacion.objects.filter(trabajo_id=trabajo_id).update(
+            estado=TrabajoVerificacion.ESTADO_COMPLETADO,
+            fecha_fin=timezone.now()
+        )
+    except Exception as e:
+        logger.error(f"Error procesando trabajo {trabajo_id}: {e}", exc_info=True)
+        TrabajoVerificacion.objects.filter(trabajo_id=trabajo_id).update(
+            estado=TrabajoVerificacion.ESTADO_FALLIDO,
+            error=str(e),
+            fecha_fin=timezone.now()
+        )
+        # Los archivos que no se alcanzaron a procesar ya no se leerán. Si el worker muere
+        # (sin pasar por aquí), se conservan para reanudar el trabajo cuando se reclame
+        ArchivoTrabajo.objects.filter(
+            trabajo_id=trabajo_id, estado=ArchivoTrabajo.ESTADO_PENDIENTE
+        ).update(contenido=b'')
+    return True
+
+
+def _procesar_lote(trabajo, archivos, comparador):
+    """Lee y compara un lote de archivos y guarda sus resultados y el progreso del trabajo."""
+    salida = comparador.comparar([(archivo.nombre, bytes(archivo.contenido)) for archivo in archivos])
+    resultados = []
+    for archivo, (resultado, error) in zip(archivos, salida):
+        if error is not None:
+            archivo.estado = ArchivoTrabajo.ESTADO_ERROR
+            archivo.error = error
+        else:
+            archivo.estado = ArchivoTrabajo.ESTADO_PROCESADO
+            archivo.resultado = resultado
+            resultados.append(resultado)
+
+    elegibles = sum(1 for r in resultados if r['estado'] == 1)
+    for archivo in archivos:
+        archivo.contenido = b''
+
+    with transaction.atomic():
+        ArchivoTrabajo.objects.bulk_update(archivos, ['estado', 'resultado', 'error', 'contenido'])
+        TrabajoVerificacion.objects.filter(trabajo_id=trabajo.trabajo_id).update(
+            archivos_procesados=F('archivos_procesados') + len(archivos),
+            archivos_con_error=F('archivos_con_error') + (len(archivos) - len(resultados)),
+            elegibles=F('elegibles') + elegibles,
+            no_elegibles=F('no_elegibles') + (len(resultados) - elegibles),
+            fecha_actualizacion=timezone.now()
+        )
+
+
+def reclamar_trabajos_abandonados(timeout=None):
+    """
+    Vuelve a pendiente los trabajos en proceso sin progreso en los últimos timeout segundos
+    (por defecto HISTORIAS_TRABAJOS_TIMEOUT); los archivos ya procesados se conservan y el
+    trabajo continúa con los pendientes. Con timeout=0 reclama todos los trabajos en proceso.
+
+    Returns:
+        Cantidad de trabajos reclamados
+    """
+    timeout = TIMEOUT_TRABAJO if timeout is None else timeout
+    reclamados = TrabajoVerificacion.objects.filter(
+        Q(fecha_actualizacion__lte=timezone.now() - timedelta(seconds=timeout)) | Q(fecha_actualizacion__isnull=True),
+        estado=TrabajoVerificacion.ESTADO_EN_PROCESO
+    ).update(estado=TrabajoVerificacion.ESTADO_PENDIENTE)
+    if reclamados:
+        logger.warning(f"Se reclamaron {reclamados} trabajo(s) en proceso sin progreso")
+    return reclamados
+
+
+def purgar_trabajos_terminados(dias=None):
+    """
+    Elimina los trabajos completados o fallidos hace más de dias días (por defecto
+    HISTORIAS_TRABAJOS_RETENCION_DIAS) junto con sus archivos.
+
+    Returns:
+        Cantidad de trabajos eliminados
+    """
+    dias = RETENCION_TRABAJOS_DIAS if dias is None else dias
+    _, eliminados = TrabajoVerificacion.objects.filter(
+        estado__in=[TrabajoVerificacion.ESTADO_COMPLETADO, TrabajoVerificacion.ESTADO_FALLIDO],
+        fecha_fin__lt=timezone.now() - timedelta(days=dias)
+    ).delete()
+    return eliminados.get(TrabajoVerificacion._meta.label, 0)
+
+
+def procesar_trabajos_pendientes():
+    """
+    Procesa en este proceso todos los trabajos pendientes, incluidos los abandonados por otro
+    worker, y luego elimina los terminados que superaron la retención. Retorna cuántos procesó.
+    """
+    reclamar_trabajos_abandonados()
+    procesados = 0
+    for trabajo_id in TrabajoVerificacion.objects.filter(
+        estado=TrabajoVerificacion.ESTADO_PENDIENTE
+    ).order_by('trabajo_id').values_list('trabajo_id', flat=True):
+        if procesar_trabajo(trabajo_id):
+            procesados += 1
+    purgar_trabajos_terminados()
+    return procesados
+
+
+def obtener_estado_trabajo(trabajo, desde=0):
+    """
+    Construye la respuesta de progreso de un trabajo con sus resultados parciales.
+
+    Args:
+        trabajo: TrabajoVerificacion
+        desde: Cantidad de archivos procesados que el cliente ya recibió (para sondeo incremental)
+    """
+    archivos = (
+        trabajo.archivos
+        .exclude(estado=ArchivoTrabajo.ESTADO_PENDIENTE)
+        .order_by('archivo_id')
+        .values('nombre', 'estado', 'resultado', 'error')[desde:]
+    )
+    resultados = []
+    archivos_con_error = []
+    for archivo in archivos:
+        if archivo['estado'] == ArchivoTrabajo.ESTADO_PROCESADO:
+            resultados.append(archivo['resultado'])
+        else:
+            archivos_con_error.append({'archivo': archivo['nombre'], 'error': archivo['error']})
+
+    respuesta = {
+        'trabajo_id': trabajo.trabajo_id,
+        'programa_id': trabajo.programa_id_id,
+        'estado': trabajo.estado,
+        'total_archivos': trabajo.total_archivos,
+        'archivos_procesados': trabajo.archivos_procesados,
+        'porcentaje_progreso': trabajo.porcentaje_progreso,
+        'elegibles': trabajo.elegibles,
+        'no_elegibles': trabajo.no_elegibles,
+        'desde': desde,
+        'resultados': resultados,
+        'fecha_creacion': trabajo.fecha_creacion,
+        'fecha_inicio': trabajo.fecha_inicio,
+        'fecha_fin': trabajo.fecha_fin,
+    }
+    if archivos_con_error:
+        respuesta['archivos_con_error'] = archivos_con_error
+    if trabajo.error:
+        respuesta['error'] = trabajo.error
+    return respuesta
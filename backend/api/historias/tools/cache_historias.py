@@ -0,0 +1,171 @@
+import contextlib
+import hashlib
+import io
+import logging
+import os
+import shutil
+import tempfile
+import threading
+import time
+
+import pandas as pd
+from django.conf import settings
+
+from api.instrumentacion import etapa_request, registrar_consulta_cache, registrar_tamano_historia
+from .lector_historias import leer_archivo_historia, VERSION_LECTOR
+
+try:
+    import pyarrow  # noqa: F401  (motor de Parquet; opcional)
+except ImportError:
+    pyarrow = None
+
+# Configurar logger
+logger = logging.getLogger(__name__)
+
+# Cada cuántas escrituras de este proceso se revisan los límites de tamaño y antigüedad
+PURGAR_CADA_ESCRITURAS = 200
+
+_escrituras = 0
+_escrituras_lock = threading.Lock()
+
+
+def cache_historias_habilitada():
+    """La caché en disco requiere pyarrow y un directorio configurado en HISTORIAS_CACHE_PARQUET_DIR."""
+    return pyarrow is not None and bool(getattr(settings, 'HISTORIAS_CACHE_PARQUET_DIR', None))
+
+
+def _directorio_version():
+    # Las historias de otra versión del lector quedan en otro directorio y nunca se leen
+    return os.path.join(settings.HISTORIAS_CACHE_PARQUET_DIR, f'v{VERSION_LECTOR}')
+
+
+def _ruta_historia(huella):
+    # Subdirectorio por los dos primeros caracteres para no acumular miles de archivos en uno solo
+    return os.path.join(_directorio_version(), huella[:2], f'{huella}.parquet')
+
+
+def cargar_historia(huella):
+    """
+    Retorna la historia compacta guardada para la huella, o None si no está en caché. Un
+    archivo ilegible (escritura interrumpida, disco dañado) se elimina para volver a generarlo.
+    """
+    ruta = _ruta_historia(huella)
+    if not os.path.exists(ruta):
+        return None
+    try:
+        historia = pd.read_parquet(ruta, engine='pyarrow')
+    except Exception as e:
+        logger.warning(f"Caché de historia ilegible {ruta}: {e}")
+        with contextlib.suppress(OSError):
+            os.remove(ruta)
+        return None
+    # La fecha de modificación marca el último uso: la purga por tamaño elimina primero las menos usadas
+    with contextlib.suppress(OSError):
+        os.utime(ruta)
+    return historia
+
+
+def guardar_historia(huella, historia):
+    """Escribe la historia compacta en disco (escritura atómica: archivo temporal + rename)."""
+    ruta = _ruta_historia(huella)
+    temporal = None
+    try:
+        os.makedirs(os.path.dirname(ruta), exist_ok=True)
+        descriptor, temporal = tempfile.mkstemp(dir=os.path.dirname(ruta), suffix='.tmp')
+        with os.fdopen(descriptor, 'wb') as archivo:
+            historia.to_parquet(archivo, engine='pyarrow', index=False)
+        os.replace(temporal, ruta)
+    except Exception as e:
+        logger.warning(f"No se pudo guardar la historia en caché {ruta}: {e}")
+        if temporal and os.path.exists(temporal):
+            os.remove(temporal)
+        return
+
+    global _escrituras
+    with _escrituras_lock:
+        _escrituras += 1
+        purgar = _escrituras % PURGAR_CADA_ESCRITURAS == 0
+    if purgar:
+        purgar_cache_historias()
+
+
+def purgar_cache_historias():
+    """
+    Aplica los límites de la caché en disco: elimina los directorios de otras versiones del
+    lector, las historias sin usar hace más de HISTORIAS_CACHE_PARQUET_MAX_DIAS días y, si el
+    total sigue superando HISTORIAS_CACHE_PARQUET_MAX_MB, las menos usadas recientemente.
+
+    Returns:
+        Cantidad de historias eliminadas
+    """
+    raiz = settings.HISTORIAS_CACHE_PARQUET_DIR
+    actual = _directorio_version()
+    if not os.path.isdir(raiz):
+        return 0
+    for nombre in os.listdir(raiz):
+        ruta = os.path.join(raiz, nombre)
+        if ruta != actual and os.path.isdir(ruta):
+            shutil.rmtree(ruta, ignore_errors=True)
+
+    limite_edad = time.time() - getattr(settings, 'HISTORIAS_CACHE_PARQUET_MAX_DIAS', 30) * 24 * 60 * 60
+    limite_bytes = getattr(settings, 'HISTORIAS_CACHE_PARQUET_MAX_MB', 500) * 1024 * 1024
+    archivos = []
+    eliminadas = 0
+    for directorio, _, nombres in os.walk(actual):
+        for nombre in nombres:
+            ruta = os.path.join(directorio, nombre)
+            try:
+                estado = os.stat(ruta)
+                if estado.st_mtime < limite_edad:
+                    os.remove(ruta)
+                    eliminadas += 1
+                else:
+                    archivos.append((estado.st_mtime, estado.st_size, ruta))
+            except OSError:
+                # Eliminado por otro proceso mientras se recorría
+                continue
+
+    total = sum(tamano for _, tamano, _ in archivos)
+    for _, tamano, ruta in sorted(archivos):
+        if total <= limite_bytes:
+            break
+        with contextlib.suppress(OSError):
+            os.remove(ruta)
+            eliminadas += 1
+        total -= tamano
+    if eliminadas:
+        logger.info(f"Caché de historias: {eliminadas} archivo(s) eliminado(s)")
+    return eliminadas
+
+
+def leer_historia_cacheada(contenido, nombre_archivo):
+    """
+    Lee una historia desde su contenido, usando la caché en disco por hash del contenido y
+    versión del lector (VERSION_LECTOR). Si la caché no está habilitada, equivale a
+    leer_archivo_historia.
+
+    Args:
+        contenido: Contenido del archivo en bytes
+        nombre_archivo: Nombre original del archivo (se usa para detectar el formato)
+
+    Returns:
+        DataFrame con las columnas del comparador
+
+    Raises:
+        KeyError: Si falta alguna columna requerida por el comparador
+    """
+    registrar_tamano_historia(nombre_archivo, len(contenido))
+    with etapa_request('lectura'):
+        if not cache_historias_habilitada():
+            return leer_archivo_historia(io.BytesIO(contenido), nombre_archivo)
+
+        huella = hashlib.sha256(contenido).hexdigest()
+        historia = cargar_historia(huella)
+        registrar_consulta_cache('historias', aciertos=int(historia is not None), fallos=int(historia is None))
+        if historia is not None:
+            return historia
+
+        # HistoriaReader ya deja solo las columnas del comparador y con tipos compactos
+        historia = leer_archivo_historia(io.BytesIO(contenido), nombre_archivo)
+        guardar_historia(huella, historia)
+        return historia
@@ -0,0 +1,101 @@
+from collections import defaultdict
+
+
+def trigramas(texto):
+    """
+    Conjunto de trigramas de un texto, palabra por palabra (como pg_trgm): cada palabra se
+    rellena con dos espacios al inicio y uno al final, de modo que las palabras cortas
+    ("I", "II", "1") también aportan trigramas y el orden de las palabras no importa.
+    """
+    resultado = set()
+    for palabra in str(texto).split():
+        relleno = f"  {palabra} "
+        resultado.update(relleno[i:i + 3] for i in range(len(relleno) - 2))
+    return resultado
+
+
+class IndiceTrigramas:
+    """
+    Índice invertido trigrama -> nombres, para encontrar nombres parecidos sin comparar
+    cada par de nombres. La similitud es la de Jaccard entre los conjuntos de trigramas
+    (intersección / unión, de 0 a 1).
+
+    Uso:
+        indice = IndiceTrigramas(['FISICA I', 'CALCULO II'])
+        indice.buscar('FISICA 1')  # [('FISICA I', 0.636)]
+    """
+
+    def __init__(self, nombres):
+        """
+        Args:
+            nombres: Nombres a indexar (ya normalizados); los repetidos se indexan una vez
+        """
+        self.nombres = list(dict.fromkeys(nombres))
+        self._posiciones = {nombre: pos for pos, nombre in enumerate(self.nombres)}
+        self._tamanos = []
+        self._indice = defaultdict(list)
+        for pos, nombre in enumerate(self.nombres):
+            conjunto = trigramas(nombre)
+            self._tamanos.append(len(conjunto))
+            for trigrama in conjunto:
+                self._indice[trigrama].append(pos)
+
+    def __len__(self):
+        return len(self.nombres)
+
+    def similitudes(self, consulta):
+        """
+        Similitud de la consulta con cada nombre indexado que comparte al menos un trigrama.
+
+        Returns:
+            Diccionario posición del nombre -> similitud
+        """
+        conjunto = trigramas(consulta)
+        comunes = defaultdict(int)
+        for trigrama in conjunto:
+            for pos in self._indice.get(trigrama, ()):
+                comunes[pos] += 1
+        return {
+            pos: n / (len(conjunto) + self._tamanos[pos] - n)
+            for pos, n in comunes.items()
+        }
+
+    def buscar(self, consulta, k=3, similitud_minima=0.3):
+        """
+        Los k nombres indexados más parecidos a la consulta.
+
+        Returns:
+            Lista de tuplas (nombre, similitud) de mayor a menor similitud
+        """
+        candidatos = [
+            (self.nombres[pos], round(similitud, 3))
+            for pos, similitud in self.similitudes(consulta).items()
+            if similitud >= similitud_minima
+        ]
+        candidatos.sort(key=lambda c: (-c[1], c[0]))
+        return candidatos[:k]
+
+    def coincidencias(self, consultas, objetivos, k=3, similitud_minima=0.3):
+        """
+        Para cada nombre objetivo (indexado), las k consultas más parecidas. Recorre una vez
+        cada consulta en lugar de comparar cada par (objetivo, consulta).
+
+        Args:
+            consultas: Nombres a comparar contra el índice (p. ej. materias de una historia)
+            objetivos: Nombres indexados de interés (p. ej. materias faltantes)
+            k: Máximo de consultas por objetivo
+            similitud_minima: Similitud mínima para incluir una consulta
+
+        Returns:
+            Diccionario objetivo -> lista de tuplas (consulta, similitud) de mayor a menor
+        """
+        posiciones = {self._posiciones[o]: o for o in objetivos if o in self._posiciones}
+        resultado = {objetivo: [] for objetivo in objetivos}
+        for consulta in dict.fromkeys(consultas):
+            for pos, similitud in self.similitudes(consulta).items():
+                if pos in posiciones and similitud >= similitud_minima:
+                    resultado[posiciones[pos]].append((consulta, round(similitud, 3)))
+        for objetivo, candidatos in resultado.items():
+            candidatos.sort(key=lambda c: (-c[1], c[0]))
+            del candidatos[k:]
+        return resultado
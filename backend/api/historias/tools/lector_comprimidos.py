@@ -0,0 +1,111 @@
+import os
+import tarfile
+import zipfile
+import zlib
+
+# Extensiones de archivo comprimido aceptadas en la verificación masiva
+EXTENSIONES_COMPRIMIDO = ('.zip', '.tar.gz', '.tgz')
+
+# Extensiones de historia académica que se extraen; las demás entradas se ignoran
+EXTENSIONES_HISTORIA = ('.csv', '.xls', '.xlsx')
+
+# Límites para proteger al servidor de archivos comprimidos maliciosos
+MAX_ENTRADAS_COMPRIMIDO = 5000
+MAX_TAMANO_ENTRADA = 10 * 1024 * 1024  # 10 MB descomprimido por historia
+
+
+class ComprimidoInvalido(ValueError):
+    """El comprimido no se puede leer, tiene un formato no soportado o supera los límites."""
+
+
+def es_archivo_comprimido(nombre_archivo):
+    return nombre_archivo.lower().endswith(EXTENSIONES_COMPRIMIDO)
+
+
+def _es_entrada_historia(nombre):
+    """Descarta carpetas, metadatos de macOS, archivos ocultos y extensiones no soportadas."""
+    base = os.path.basename(nombre)
+    if not base or base.startswith('.') or '__MACOSX' in nombre.split('/'):
+        return False
+    return base.lower().endswith(EXTENSIONES_HISTORIA)
+
+
+def _validar_entrada(nombre, tamano, cantidad, max_entradas):
+    if cantidad > max_entradas:
+        raise ComprimidoInvalido(f'El archivo comprimido supera el máximo de {max_entradas} historias')
+    if tamano > MAX_TAMANO_ENTRADA:
+        raise ComprimidoInvalido(
+            f'La entrada {nombre} supera el tamaño máximo de {MAX_TAMANO_ENTRADA // (1024 * 1024)} MB'
+        )
+
+
+def iterar_historias_comprimidas(archivo, nombre_archivo, max_entradas=MAX_ENTRADAS_COMPRIMIDO):
+    """
+    Recorre las historias de un .zip o .tar.gz extrayendo una entrada a la vez.
+    Solo la entrada actual se mantiene en memoria.
+
+    Args:
+        archivo: Archivo subido u objeto tipo archivo con el comprimido
+        nombre_archivo: Nombre original del archivo (se usa para detectar el formato)
+        max_entradas: Historias máximas; la extracción se detiene al encontrar una más
+            (nunca más de MAX_ENTRADAS_COMPRIMIDO)
+
+    Yields:
+        Tuplas (nombre_entrada, contenido en bytes)
+
+    Raises:
+        ComprimidoInvalido: Si el formato no es soportado, el comprimido está dañado o se superan los límites
+    """
+    max_entradas = min(max_entradas, MAX_ENTRADAS_COMPRIMIDO)
+    nombre = nombre_archivo.lower()
+    if nombre.endswith('.zip'):
+        yield from _iterar_zip(archivo, max_entradas)
+    elif nombre.endswith(('.tar.gz', '.tgz')):
+        yield from _iterar_tar(archivo, max_entradas)
+    else:
+        raise ComprimidoInvalido(f'Formato de archivo comprimido no soportado: {nombre_archivo}')
+
+
+def _iterar_zip(archivo, max_entradas):
+    try:
+        comprimido = zipfile.ZipFile(archivo)
+    except zipfile.BadZipFile as e:
+        raise ComprimidoInvalido(f'Archivo ZIP inválido: {e}')
+
+    with comprimido:
+        cantidad = 0
+        for info in comprimido.infolist():
+            if info.is_dir() or not _es_entrada_historia(info.filename):
+                continue
+            cantidad += 1
+            _validar_entrada(info.filename, info.file_size, cantidad, max_entradas)
+            try:
+                with comprimido.open(info) as entrada:
+                    # Leer como máximo el límite + 1 por si el tamaño declarado no es real
+                    contenido = entrada.read(MAX_TAMANO_ENTRADA + 1)
+            except (zipfile.BadZipFile, RuntimeError, NotImplementedError, zlib.error, OSError, EOFError) as e:
+                # CRC inválido, entrada cifrada, compresión no soportada o datos truncados
+                raise ComprimidoInvalido(f'Archivo ZIP inválido: {info.filename}: {e}')
+            _validar_entrada(info.filename, len(contenido), cantidad, max_entradas)
+            yield info.filename, contenido
+
+
+def _iterar_tar(archivo, max_entradas):
+    try:
+        # Modo 'r|gz': lectura secuencial sin volver atrás en el archivo
+        comprimido = tarfile.open(fileobj=archivo, mode='r|gz')
+    except (tarfile.TarError, OSError) as e:
+        raise ComprimidoInvalido(f'Archivo TAR.GZ inválido: {e}')
+
+    with comprimido:
+        cantidad = 0
+        try:
+            for miembro in comprimido:
+                if not miembro.isfile() or not _es_entrada_historia(miembro.name):
+                    continue
+                cantidad += 1
+                _validar_entrada(miembro.name, miembro.size, cantidad, max_entradas)
+                contenido = comprimido.extractfile(miembro).read()
+                yield miembro.name, contenido
+        except (tarfile.TarError, EOFError, OSError) as e:
+            raise ComprimidoInvalido(f'Archivo TAR.GZ inválido: {e}')
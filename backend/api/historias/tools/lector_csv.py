@@ -1,6 +1,8 @@
 import pandas as pd
 import os
 
+from .lector_historias import HistoriaReader
+
 def leer_pensum(ruta_pensum: str) -> pd.DataFrame:
     """
     Lee el archivo de pensum (.xlsx) y normaliza las columnas.
@@ -15,11 +17,8 @@ def leer_historia(ruta_csv: str) -> pd.DataFrame:
     Lee un archivo CSV de historia académica y limpia sus columnas.
     Retorna un DataFrame.
     """
-    df = pd.read_csv(ruta_csv, encoding="latin1", sep=",")
-    df.columns = df.columns.str.strip().str.lower()
-
-    # Notas a número
-    df["definitiva"] = pd.to_numeric(df["definitiva"], errors="coerce")
+    # Delimitador, codificación y tipos (definitiva como float32) los resuelve HistoriaReader
+    df = HistoriaReader().leer(ruta_csv, ruta_csv)
 
     # Normalizar nombre de materias
     df["materia"] = df["materia"].str.strip().str.lower()
@@ -0,0 +1,207 @@
+import codecs
+import csv
+import io
+import os
+import re
+
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow  # noqa: F401  (motor CSV rápido; opcional)
+except ImportError:
+    pyarrow = None
+
+# Columnas de la historia que necesita el comparador
+COLUMNAS_REQUERIDAS_HISTORIA = ('materia', 'semestre', 'definitiva')
+
+# Columnas de la historia que usa el comparador (las opcionales pueden no venir)
+COLUMNAS_HISTORIA = COLUMNAS_REQUERIDAS_HISTORIA + ('periodo', 'créditos')
+
+# Tipos explícitos por columna: evita la inferencia de tipos en cada lectura.
+# materia y periodo se leen como texto (object): convertirlas a category al leer cuesta más
+# de lo que ahorra (el comparador factoriza los nombres de materia de todo el lote de una vez)
+TIPOS_HISTORIA = {
+    'materia': object,
+    'periodo': object,
+    'semestre': np.float32,
+    'créditos': np.float32,
+    'definitiva': np.float32,
+}
+
+# Versión del formato que entrega HistoriaReader (columnas, tipos y normalización). Forma parte
+# de la clave de la caché en disco de historias: incrementarla al cambiar cualquiera de ellos
+VERSION_LECTOR = 1
+
+# Patrón para Historia-Academica-CODIGO.csv o Historia-Academica_CODIGO.csv
+PATRON_CODIGO_ESTUDIANTE = re.compile(r'Historia-Academica[_-]?(\d+)', re.IGNORECASE)
+
+
+def extraer_codigo_estudiante(nombre_archivo):
+    """
+    Extrae el código del estudiante desde el nombre del archivo.
+    Si no coincide con el patrón Historia-Academica-CODIGO, retorna el nombre sin extensión.
+    """
+    nombre_archivo = os.path.basename(nombre_archivo)
+    match = PATRON_CODIGO_ESTUDIANTE.search(nombre_archivo)
+    if match:
+        return match.group(1)
+    return os.path.splitext(nombre_archivo)[0]
+
+
+def _normalizar_columna(nombre):
+    return str(nombre).strip().lower()
+
+
+class HistoriaReader:
+    """
+    Lector de historias académicas (CSV, .xlsx y .xls).
+
+    - Proyecta solo las columnas que usa el comparador.
+    - Usa tipos explícitos (texto para materia y periodo, float32 para números).
+    - En CSV detecta delimitador y codificación con el primer KB del archivo.
+    - Usa el motor CSV de pyarrow (si está instalado) para archivos grandes.
+
+    Uso:
+        historia = HistoriaReader().leer(archivo, 'Historia-Academica-123.csv')
+    """
+
+    TAMANO_MUESTRA = 1024
+    DELIMITADORES = ';,\t|'
+    # Por debajo de este tamaño el costo fijo del motor pyarrow supera su ganancia
+    UMBRAL_PYARROW = 128 * 1024
+
+    def __init__(self, columnas=COLUMNAS_HISTORIA, motor_csv=None):
+        """
+        Args:
+            columnas: Columnas (normalizadas) a conservar
+            motor_csv: 'pyarrow' o 'c'. Por defecto pyarrow (si está instalado) para archivos
+                de más de UMBRAL_PYARROW bytes y 'c' para el resto
+        """
+        self.columnas = tuple(columnas)
+        self.motor_csv = motor_csv
+
+    def leer(self, archivo, nombre_archivo):
+        """
+        Args:
+            archivo: Ruta, archivo subido u objeto tipo archivo
+            nombre_archivo: Nombre original del archivo (se usa para detectar el formato)
+
+        Returns:
+            DataFrame con las columnas proyectadas, en minúsculas y con tipos compactos
+
+        Raises:
+            KeyError: Si falta alguna columna requerida por el comparador
+        """
+        nombre = (nombre_archivo or '').lower()
+        if nombre.endswith('.xlsx'):
+            historia = self._leer_excel(archivo, 'openpyxl')
+        elif nombre.endswith('.xls'):
+            historia = self._leer_excel(archivo, 'xlrd')
+        else:
+            # CSV, o CSV por defecto
+            historia = self._leer_csv(archivo)
+
+        historia.columns = [_normalizar_columna(c) for c in historia.columns]
+        for columna in COLUMNAS_REQUERIDAS_HISTORIA:
+            if columna in self.columnas and columna not in historia.columns:
+                raise KeyError(columna)
+        return self._aplicar_tipos(historia)
+
+    def _leer_excel(self, archivo, motor):
+        return pd.read_excel(
+            archivo,
+            engine=motor,
+            usecols=lambda c: _normalizar_columna(c) in self.columnas
+        )
+
+    def _leer_csv(self, archivo):
+        contenido = self._contenido(archivo)
+        muestra = contenido[:self.TAMANO_MUESTRA]
+        codificacion = self.detectar_codificacion(muestra)
+        delimitador = self.detectar_delimitador(muestra.decode(codificacion, errors='ignore'))
+
+        # Proyección y tipos por nombre original de columna (tomados del encabezado)
+        primera_linea = contenido.split(b'\n', 1)[0].decode(codificacion, errors='ignore').rstrip('\r')
+        encabezado = next(csv.reader([primera_linea], delimiter=delimitador), [])
+        usecols = [c for c in encabezado if _normalizar_columna(c) in self.columnas]
+        dtype = {c: TIPOS_HISTORIA[_normalizar_columna(c)] for c in usecols
+                 if _normalizar_columna(c) in TIPOS_HISTORIA}
+
+        motor = self.motor_csv
+        if motor is None:
+            motor = 'pyarrow' if pyarrow is not None and len(contenido) > self.UMBRAL_PYARROW else 'c'
+
+        opciones = dict(sep=delimitador, encoding=codificacion, usecols=usecols)
+        try:
+            return pd.read_csv(io.BytesIO(contenido), engine=motor, dtype=dtype, **opciones)
+        except UnicodeDecodeError:
+            # La muestra parecía UTF-8 pero el resto del archivo no lo es
+            opciones['encoding'] = 'latin-1'
+        except (ValueError, TypeError):
+            # Valores con formato inesperado (p. ej. nota "3,5"): se lee sin tipos
+            # y _aplicar_tipos convierte lo que pueda
+            pass
+        return pd.read_csv(io.BytesIO(contenido), engine='c', dtype=str, **opciones)
+
+    @staticmethod
+    def _contenido(archivo):
+        if isinstance(archivo, (str, os.PathLike)):
+            with open(archivo, 'rb') as f:
+                return f.read()
+        return archivo.read()
+
+    @staticmethod
+    def detectar_codificacion(muestra):
+        """
+        UTF-8 (con o sin BOM) si la muestra es UTF-8 válido con caracteres no ASCII;
+        latin-1 en otro caso (nunca falla al decodificar).
+        """
+        if muestra.startswith(codecs.BOM_UTF8):
+            return 'utf-8-sig'
+        try:
+            # final=False: la muestra puede cortar un carácter multibyte al final
+            codecs.getincrementaldecoder('utf-8')().decode(muestra, final=False)
+        except UnicodeDecodeError:
+            return 'latin-1'
+        return 'utf-8' if any(b > 127 for b in muestra) else 'latin-1'
+
+    @classmethod
+    def detectar_delimitador(cls, texto):
+        """
+        Delimitador del CSV: el candidato que más aparece en el encabezado de la muestra
+        (los nombres de columna no lo contienen); ';' si no aparece ninguno.
+        csv.Sniffer es más general pero cuesta más que leer una historia completa.
+        """
+        encabezado = texto.split('\n', 1)[0]
+        conteos = {d: encabezado.count(d) for d in cls.DELIMITADORES}
+        delimitador = max(conteos, key=conteos.get)
+        return delimitador if conteos[delimitador] else ';'
+
+    def _aplicar_tipos(self, historia):
+        for columna, tipo in TIPOS_HISTORIA.items():
+            if columna not in historia.columns or tipo is object or historia[columna].dtype == tipo:
+                continue
+            serie = historia[columna]
+            if serie.dtype == object:
+                # Coma decimal (p. ej. "3,5")
+                serie = serie.astype(str).str.replace(',', '.', regex=False)
+            historia[columna] = pd.to_numeric(serie, errors='coerce').astype(tipo)
+        return historia
+
+
+def leer_archivo_historia(archivo, nombre_archivo):
+    """
+    Lee un archivo de historia académica (CSV, .xlsx o .xls) con HistoriaReader.
+
+    Args:
+        archivo: Ruta, archivo subido u objeto tipo archivo
+        nombre_archivo: Nombre original del archivo (se usa para detectar el formato)
+
+    Returns:
+        DataFrame con las columnas del comparador en minúsculas
+
+    Raises:
+        KeyError: Si falta alguna columna requerida por el comparador
+    """
+    return HistoriaReader().leer(archivo, nombre_archivo)
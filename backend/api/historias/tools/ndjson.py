@@ -0,0 +1,28 @@
+import json
+
+from django.core.serializers.json import DjangoJSONEncoder
+from rest_framework.renderers import BaseRenderer
+
+# Media type de JSON delimitado por saltos de línea (un objeto JSON por línea)
+MEDIA_TYPE_NDJSON = 'application/x-ndjson'
+
+
+def linea_ndjson(datos):
+    """Serializa un objeto como una línea NDJSON (bytes terminados en salto de línea)."""
+    return (json.dumps(datos, cls=DjangoJSONEncoder, ensure_ascii=False) + '\n').encode('utf-8')
+
+
+class NDJSONRenderer(BaseRenderer):
+    """
+    Renderer para peticiones con Accept: application/x-ndjson.
+    Las respuestas en streaming se arman con linea_ndjson; este renderer solo cubre
+    las respuestas normales (p. ej. errores 400) que DRF negocia con ese Accept.
+    """
+    media_type = MEDIA_TYPE_NDJSON
+    format = 'ndjson'
+    charset = 'utf-8'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        return linea_ndjson(data)
@@ -1,10 +1,32 @@
 from django.urls import path
 from .controllers.comparadorController import (
     verificar_elegibilidad_estudiante,
-    verificar_elegibilidad_masiva
+    verificar_elegibilidad_masiva,
+    obtener_estadisticas_cache
+)
+from .controllers.estudianteController import (
+    ingerir_historias_estudiantes,
+    listar_estudiantes
+)
+from .controllers.simulacionController import (
+    simular_configuracion
+)
+from .controllers.trabajoController import (
+    crear_trabajo_verificacion,
+    obtener_trabajo_verificacion
 )
 
 urlpatterns = [
     path("verificar/estudiante/", verificar_elegibilidad_estudiante, name="verificar_elegibilidad_estudiante"),
     path("verificar/masiva/", verificar_elegibilidad_masiva, name="verificar_elegibilidad_masiva"),
+    path("cache/", obtener_estadisticas_cache, name="obtener_estadisticas_cache"),
+    path("simular/", simular_configuracion, name="simular_configuracion"),
+
+    # Trabajos asíncronos de verificación masiva
+    path("jobs/", crear_trabajo_verificacion, name="crear_trabajo_verificacion"),
+    path("jobs/<int:trabajo_id>/", obtener_trabajo_verificacion, name="obtener_trabajo_verificacion"),
+
+    # Historias académicas guardadas en BD
+    path("estudiantes/", listar_estudiantes, name="listar_estudiantes"),
+    path("estudiantes/ingestar/", ingerir_historias_estudiantes, name="ingerir_historias_estudiantes"),
 ]
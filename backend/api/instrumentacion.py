@@ -0,0 +1,172 @@
+"""
+Medición de etapas del request en curso y métricas de Prometheus. Los servicios la importan
+directamente; RendimientoMiddleware abre la medición y el endpoint de métricas la exporta.
+"""
+import json
+import os
+import time
+from contextlib import contextmanager, nullcontext
+from contextvars import ContextVar
+
+try:
+    import prometheus_client  # opcional: sin él las métricas no se registran ni se exponen
+    from prometheus_client import Counter, Histogram
+except ImportError:
+    prometheus_client = None
+
+# Medición del request en curso (None fuera de un request, p. ej. en los workers de trabajos)
+_medicion_actual = ContextVar('medicion_request', default=None)
+
+
+class MedicionRequest:
+    """Tiempo de SQL y etapas con nombre de un request, en milisegundos."""
+
+    __slots__ = ('consultas', 'sql_ms', 'etapas')
+
+    def __init__(self):
+        self.consultas = 0
+        self.sql_ms = 0.0
+        self.etapas = {}
+
+    def registrar_sql(self, execute, sql, params, many, context):
+        inicio = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.sql_ms += (time.perf_counter() - inicio) * 1000
+            self.consultas += 1
+
+    @contextmanager
+    def etapa(self, nombre):
+        inicio = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.etapas[nombre] = self.etapas.get(nombre, 0.0) + (time.perf_counter() - inicio) * 1000
+
+
+def etapa_request(nombre):
+    """
+    Mide una etapa con nombre (p. ej. 'lectura' o 'normalizacion') dentro del request en curso.
+    Fuera de un request medido no hace nada.
+
+    Uso:
+        with etapa_request('lectura'):
+            historia = ...
+    """
+    medicion = _medicion_actual.get()
+    return medicion.etapa(nombre) if medicion is not None else nullcontext()
+
+
+@contextmanager
+def medir_request(medicion):
+    """Hace de medicion la del request en curso mientras dura el bloque (ver etapa_request)."""
+    token = _medicion_actual.set(medicion)
+    try:
+        yield medicion
+    finally:
+        _medicion_actual.reset(token)
+
+
+# Buckets de duración (segundos) y de tamaño de historias (bytes)
+BUCKETS_SEGUNDOS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+BUCKETS_BYTES = tuple(1024 * kb for kb in (1, 4, 16, 64, 256, 1024, 4096, 16384))
+
+# Valores posibles de la etiqueta 'tipo' de agora_errores_total (ver _tipo_error): códigos de
+# error de la API y códigos de las excepciones de DRF
+CODIGOS_ERROR = frozenset({
+    'AUTHENTICATION_REQUIRED', 'INVALID_TOKEN', 'TOKEN_EXPIRED', 'USER_NOT_FOUND', 'AUTHENTICATION_ERROR',
+})
+CODIGOS_ERROR_DRF = frozenset({
+    'parse_error', 'authentication_failed', 'not_authenticated', 'permission_denied', 'not_found',
+    'method_not_allowed', 'not_acceptable', 'unsupported_media_type', 'throttled',
+})
+
+if prometheus_client is not None:
+    REQUESTS = Counter(
+        'agora_requests_total', 'Requests atendidos', ['endpoint', 'metodo', 'estado']
+    )
+    DURACION_REQUEST = Histogram(
+        'agora_request_duracion_segundos', 'Duración de los requests', ['endpoint'], buckets=BUCKETS_SEGUNDOS
+    )
+    DURACION_ETAPA = Histogram(
+        'agora_etapa_duracion_segundos', 'Duración de las etapas de lectura y comparación por request',
+        ['etapa'], buckets=BUCKETS_SEGUNDOS
+    )
+    ESTUDIANTES_EVALUADOS = Counter(
+        'agora_estudiantes_evaluados_total', 'Estudiantes comparados contra el pensum'
+    )
+    CONSULTAS_CACHE = Counter(
+        'agora_cache_consultas_total', 'Consultas a las cachés (pensum, configuracion, resultados, historias)',
+        ['cache', 'resultado']
+    )
+    TAMANO_HISTORIA = Histogram(
+        'agora_historia_tamano_bytes', 'Tamaño de las historias académicas leídas', ['formato'], buckets=BUCKETS_BYTES
+    )
+    ERRORES = Counter(
+        'agora_errores_total', 'Respuestas de error por tipo (código de error o clase del estado)',
+        ['endpoint', 'estado', 'tipo']
+    )
+
+
+def metricas_habilitadas():
+    return prometheus_client is not None
+
+
+def registrar_request(endpoint, metodo, estado, segundos, etapas_ms, response):
+    """
+    Registra un request atendido: contador por estado, duración, etapas medidas y, si es
+    una respuesta de error, su tipo (ver _tipo_error).
+    """
+    if prometheus_client is None:
+        return
+    REQUESTS.labels(endpoint, metodo, estado).inc()
+    DURACION_REQUEST.labels(endpoint).observe(segundos)
+    for etapa, ms in etapas_ms.items():
+        DURACION_ETAPA.labels(etapa).observe(ms / 1000)
+    if estado >= 400:
+        ERRORES.labels(endpoint, estado, _tipo_error(response)).inc()
+
+
+def registrar_estudiantes_evaluados(cantidad):
+    if prometheus_client is not None and cantidad:
+        ESTUDIANTES_EVALUADOS.inc(cantidad)
+
+
+def registrar_consulta_cache(cache, aciertos=0, fallos=0):
+    """Acumula aciertos y fallos de una caché ('pensum', 'configuracion', 'resultados' o 'historias')."""
+    if prometheus_client is None:
+        return
+    if aciertos:
+        CONSULTAS_CACHE.labels(cache, 'acierto').inc(aciertos)
+    if fallos:
+        CONSULTAS_CACHE.labels(cache, 'fallo').inc(fallos)
+
+
+def registrar_tamano_historia(nombre_archivo, tamano):
+    if prometheus_client is not None:
+        formato = os.path.splitext(nombre_archivo)[1].lower().lstrip('.') or 'desconocido'
+        TAMANO_HISTORIA.labels(formato).observe(tamano)
+
+
+def _tipo_error(response):
+    """
+    Tipo de una respuesta de error, de un conjunto cerrado para acotar las series de
+    agora_errores_total: su 'code' si está en CODIGOS_ERROR, el código de una excepción de DRF
+    ('detail') si está en CODIGOS_ERROR_DRF y, si no, la clase del estado ('4xx' o '5xx').
+    Nunca el texto del mensaje, que incluye IDs, nombres y excepciones.
+    """
+    datos = getattr(response, 'data', None)
+    if datos is None and not response.streaming and response.get('Content-Type', '').startswith('application/json'):
+        try:
+            datos = json.loads(response.content)
+        except ValueError:
+            datos = None
+    if isinstance(datos, dict):
+        codigo = datos.get('code')
+        if isinstance(codigo, str) and codigo in CODIGOS_ERROR:
+            return codigo
+        codigo = getattr(datos.get('detail'), 'code', None)
+        if codigo in CODIGOS_ERROR_DRF:
+            return codigo
+    return f'{response.status_code // 100}xx'
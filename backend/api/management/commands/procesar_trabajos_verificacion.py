@@ -0,0 +1,57 @@
+"""
+Comando de gestión para procesar trabajos de verificación de elegibilidad pendientes
+en un proceso separado del servidor web. En cada pasada también reevalúa a los estudiantes
+guardados cuyo resultado quedó desactualizado (ingesta, cambios de configuración o de pensum).
+
+Uso:
+    python manage.py procesar_trabajos_verificacion
+    python manage.py procesar_trabajos_verificacion --continuo --intervalo 5
+    python manage.py procesar_trabajos_verificacion --reanudar
+"""
+import time
+
+from django.core.management.base import BaseCommand
+
+from api.historias.services.reevaluacion_service import reevaluar_programas_pendientes
+from api.historias.services.trabajos_service import procesar_trabajos_pendientes, reclamar_trabajos_abandonados
+
+
+class Command(BaseCommand):
+    help = 'Procesa los trabajos de verificación de elegibilidad pendientes'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--continuo',
+            action='store_true',
+            help='Queda esperando nuevos trabajos en lugar de terminar',
+        )
+        parser.add_argument(
+            '--intervalo',
+            type=int,
+            default=5,
+            help='Segundos entre consultas en modo continuo (default: 5)',
+        )
+        parser.add_argument(
+            '--reanudar',
+            action='store_true',
+            help='Vuelve a pendiente todos los trabajos en proceso sin esperar HISTORIAS_TRABAJOS_TIMEOUT',
+        )
+
+    def handle(self, *args, **options):
+        if options['reanudar']:
+            count = reclamar_trabajos_abandonados(timeout=0)
+            if count > 0:
+                self.stdout.write(self.style.WARNING(f'Se reanudaron {count} trabajo(s) en proceso'))
+
+        while True:
+            procesados = procesar_trabajos_pendientes()
+            if procesados:
+                self.stdout.write(self.style.SUCCESS(f'✓ {procesados} trabajo(s) procesado(s)'))
+            for programa_id, resumen in reevaluar_programas_pendientes().items():
+                self.stdout.write(self.style.SUCCESS(
+                    f"✓ Programa {programa_id}: {resumen['estudiantes_evaluados']} estudiante(s) "
+                    f"reevaluado(s), {resumen['estudiantes_actualizados']} con resultado nuevo"
+                ))
+            if not options['continuo']:
+                break
+            time.sleep(options['intervalo'])
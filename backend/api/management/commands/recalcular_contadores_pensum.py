@@ -0,0 +1,49 @@
+"""
+Comando de gestión para reconstruir o verificar los contadores de materias y créditos
+guardados en cada pensum (ver PensumRepository.actualizar_contadores).
+
+Uso:
+    python manage.py recalcular_contadores_pensum
+    python manage.py recalcular_contadores_pensum --verificar
+    python manage.py recalcular_contadores_pensum --pensum_id 1 --pensum_id 2
+"""
+from django.core.management.base import BaseCommand, CommandError
+
+from api.pensum.repositories.repository_pensum import PensumRepository
+
+
+class Command(BaseCommand):
+    help = 'Recalcula los contadores de materias y créditos de los pensums desde sus materias'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--pensum_id',
+            type=int,
+            action='append',
+            help='ID del pensum a recalcular; se puede repetir (por defecto todos)',
+        )
+        parser.add_argument(
+            '--verificar',
+            action='store_true',
+            help='Solo reporta los contadores que difieren, sin corregirlos (termina con error si hay diferencias)',
+        )
+
+    def handle(self, *args, **options):
+        verificar = options['verificar']
+        diferencias = PensumRepository().recalcular_contadores(
+            pensum_ids=options.get('pensum_id'),
+            guardar=not verificar,
+        )
+
+        for pensum_id, campos in sorted(diferencias.items()):
+            for campo, (guardado, calculado) in campos.items():
+                self.stdout.write(
+                    self.style.WARNING(f'Pensum {pensum_id}: {campo} guardado={guardado} calculado={calculado}')
+                )
+
+        if not diferencias:
+            self.stdout.write(self.style.SUCCESS('✓ Los contadores de los pensums están al día'))
+        elif verificar:
+            raise CommandError(f'{len(diferencias)} pensum(s) con contadores desactualizados')
+        else:
+            self.stdout.write(self.style.SUCCESS(f'✓ Contadores corregidos en {len(diferencias)} pensum(s)'))
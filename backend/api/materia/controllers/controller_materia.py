@@ -1,11 +1,15 @@
 from rest_framework import status
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import AllowAny, IsAuthenticated
+from rest_framework.decorators import parser_classes
+from rest_framework.parsers import JSONParser, MultiPartParser, FormParser
 from rest_framework.response import Response
 from api.materia.services.materia_service import MateriaService
+from api.materia.services.materia_alias_service import MateriaAliasService
 from api.materia.serializers.materia_serializer import (
     MateriaSerializer, MateriaCreateSerializer, MateriaUpdateSerializer
 )
+from api.materia.serializers.materia_alias_serializer import MateriaAliasImportSerializer
 import json
 from drf_spectacular.utils import extend_schema, OpenApiResponse, OpenApiExample, OpenApiParameter
 
@@ -14,6 +18,7 @@ class MateriaController:
     
     def __init__(self):
         self.service = MateriaService()
+        self.alias_service = MateriaAliasService()
 
 # Instancia global del controller
 materia_controller = MateriaController()
@@ -505,6 +510,8 @@ def listar_materias_obligatorias(request):
                 "GET /api/materia/semestre/{semestre}/ - Obtener materias por semestre",
                 "GET /api/materia/buscar/?nombre=<nombre> - Buscar materias",
                 "GET /api/materia/obligatorias/ - Listar materias obligatorias",
+                "GET /api/materia/alias/pensum/{pensum_id}/ - Listar alias de materias por pensum",
+                "POST /api/materia/alias/importar/ - Importar alias de materias",
                 "GET /api/materia/test/ - Test de conexión"
             ]
         })])
@@ -530,6 +537,8 @@ def test_materia_connection(request):
             'GET /api/materia/semestre/{semestre}/ - Obtener materias por semestre',
             'GET /api/materia/buscar/?nombre=<nombre> - Buscar materias',
             'GET /api/materia/obligatorias/ - Listar materias obligatorias',
+            'GET /api/materia/alias/pensum/{pensum_id}/ - Listar alias de materias por pensum',
+            'POST /api/materia/alias/importar/ - Importar alias de materias',
             'GET /api/materia/test/ - Test de conexión'
         ]
     }, status=status.HTTP_200_OK)
@@ -599,4 +608,130 @@ def patch_materia(request, materia_id):
         return Response({
             'error': 'Error interno del servidor',
             'details': str(e)
-        }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
\ No newline at end of file
+        }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+@extend_schema(
+    tags=['Materia - Público'],
+    summary="Listar alias de materias por pensum",
+    description="Devuelve los nombres alternativos (alias) de las materias de un pensum. El comparador de historias los trata como equivalentes al nombre de la materia.",
+    parameters=[OpenApiParameter(name='pensum_id', type=int, location=OpenApiParameter.PATH, required=True)],
+    responses={
+        200: OpenApiResponse(
+            description="Alias del pensum (puede estar vacía)",
+            examples=[OpenApiExample(
+                "Success Example",
+                value={
+                    "message": "Alias del pensum 1 obtenidos exitosamente",
+                    "alias": [
+                        {
+                            "alias_id": 1,
+                            "materia_id": 12,
+                            "nombre_materia": "Cálculo I",
+                            "alias": "CALCULO DIFERENCIAL",
+                            "fecha_creacion": "2025-01-15T10:30:00Z"
+                        }
+                    ],
+                    "total": 1
+                }
+            )]
+        ),
+        400: OpenApiResponse(description="ID de pensum inválido"),
+        500: OpenApiResponse(description="Error interno del servidor")
+    }
+)
+@api_view(['GET'])
+@permission_classes([AllowAny])
+def listar_alias_por_pensum(request, pensum_id):
+    """
+    Listar alias de las materias de un pensum
+    """
+    try:
+        success, response = materia_controller.alias_service.obtener_alias_por_pensum(pensum_id)
+        
+        if success:
+            return Response(response, status=status.HTTP_200_OK)
+        else:
+            return Response(response, status=status.HTTP_400_BAD_REQUEST)
+            
+    except Exception as e:
+        return Response({
+            'error': 'Error interno del servidor',
+            'details': str(e)
+        }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+@extend_schema(
+    tags=['Materia - Admin'],
+    summary="Importar alias de materias",
+    description="""
+    Registra en bloque nombres alternativos de materias de un pensum, para que las historias
+    académicas con nombres distintos (sin tildes, abreviados, nombres anteriores) coincidan
+    con la materia del pensum sin cambiar código.
+    
+    **JSON:** `{"pensum_id": 1, "reemplazar": false, "alias": [{"materia": "Cálculo I", "alias": "Calculo Diferencial"}]}`
+    (cada fila indica la materia por `materia_id` o por nombre en `materia`).
+    
+    **CSV (multipart):** campo `archivo` con columnas `alias` y `materia` o `materia_id`,
+    más los campos `pensum_id` y opcionalmente `reemplazar`.
+    
+    Los alias se guardan normalizados. Los repetidos se omiten; las filas con materia
+    inexistente o alias ya asignado a otra materia se reportan en `errores`.
+    Con `reemplazar=true` se eliminan antes los alias existentes del pensum.
+    """,
+    request=MateriaAliasImportSerializer,
+    responses={
+        200: OpenApiResponse(
+            description="Alias importados",
+            examples=[OpenApiExample(
+                "Success Example",
+                value={
+                    "message": "2 alias importados exitosamente",
+                    "creados": 2,
+                    "omitidos": 1,
+                    "total_filas": 4,
+                    "errores": [{"fila": 4, "alias": "FISICA", "error": "Materia no encontrada en el pensum"}]
+                }
+            )]
+        ),
+        400: OpenApiResponse(description="Datos inválidos"),
+        500: OpenApiResponse(description="Error interno del servidor")
+    }
+)
+@api_view(['POST'])
+@parser_classes([JSONParser, MultiPartParser, FormParser])
+@permission_classes([AllowAny])  # Cambiar a IsAuthenticated si requiere autenticación
+def importar_alias_materias(request):
+    """
+    Importar alias de materias desde JSON o desde un archivo CSV
+    """
+    try:
+        archivo = request.FILES.get('archivo')
+        if archivo:
+            try:
+                filas = MateriaAliasService.leer_csv_alias(archivo)
+            except Exception as e:
+                return Response({
+                    'error': 'Error al leer el archivo de alias',
+                    'details': str(e)
+                }, status=status.HTTP_400_BAD_REQUEST)
+            data = {
+                'pensum_id': request.data.get('pensum_id'),
+                'reemplazar': request.data.get('reemplazar', False),
+                'alias': filas
+            }
+        else:
+            data = request.data
+        
+        success, response = materia_controller.alias_service.importar_alias(data)
+        
+        if success:
+            return Response(response, status=status.HTTP_200_OK)
+        else:
+            return Response(response, status=status.HTTP_400_BAD_REQUEST)
+            
+    except Exception as e:
+        return Response({
+            'error': 'Error interno del servidor',
+            'details': str(e)
+        }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
@@ -0,0 +1,37 @@
+from django.db import models
+
+
+class MateriaAlias(models.Model):
+    """
+    Nombre alternativo con el que una materia aparece en las historias académicas
+    (sin tildes, abreviado, nombre anterior, etc.). El alias se guarda normalizado igual
+    que los nombres que compara el comparador, de modo que la equivalencia es exacta.
+    """
+    alias_id = models.AutoField(primary_key=True)
+    materia_id = models.ForeignKey(
+        'Materia',
+        on_delete=models.CASCADE,
+        db_column='materia_id',
+        related_name='alias',
+        help_text="Materia del pensum a la que equivale el alias"
+    )
+    alias = models.CharField(max_length=150, help_text="Nombre alternativo normalizado (mayúsculas, sin tildes)")
+    fecha_creacion = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = 'materia_alias'
+        app_label = 'api'
+        constraints = [
+            models.UniqueConstraint(fields=['materia_id', 'alias'], name='materia_alias_unico'),
+        ]
+        indexes = [
+            models.Index(fields=['alias']),
+        ]
+
+    def save(self, *args, **kwargs):
+        from api.historias.services.comparadorService import _normalize_text
+        self.alias = _normalize_text(self.alias)
+        super().save(*args, **kwargs)
+
+    def __str__(self):
+        return f"{self.alias} -> {self.materia_id_id}"
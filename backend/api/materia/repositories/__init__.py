@@ -1,4 +1,5 @@
 from .materia_repository import MateriaRepository
+from .materia_alias_repository import MateriaAliasRepository
 
-__all__ = ['MateriaRepository']
+__all__ = ['MateriaRepository', 'MateriaAliasRepository']
 
@@ -0,0 +1,89 @@
+from django.db import transaction
+from api.materia.models.materia import Materia
+from api.materia.models.materia_alias import MateriaAlias
+from typing import List, Dict, Any, Tuple
+
+class MateriaAliasRepository:
+    """Repository para manejar el acceso a datos de MateriaAlias"""
+    
+    def obtener_por_pensum(self, pensum_id: int) -> List[MateriaAlias]:
+        """Obtener los alias de las materias de un pensum"""
+        try:
+            return list(
+                MateriaAlias.objects.select_related('materia_id')
+                .filter(materia_id__pensum_id=pensum_id)
+                .order_by('materia_id__nombre_materia', 'alias')
+            )
+        except Exception as e:
+            print(f"[REPOSITORY] Error al obtener alias del pensum {pensum_id}: {e}")
+            return []
+    
+    def obtener_mapa_por_pensum(self, pensum_id: int) -> Dict[str, str]:
+        """Diccionario alias -> nombre de la materia (solo materias activas), en una sola consulta"""
+        return dict(
+            MateriaAlias.objects
+            .filter(materia_id__pensum_id=pensum_id, materia_id__es_activa=True)
+            .values_list('alias', 'materia_id__nombre_materia')
+        )
+    
+    def importar(self, pensum_id: int, filas: List[Dict[str, Any]], reemplazar: bool = False) -> Tuple[int, int, List[Dict[str, Any]]]:
+        """
+        Importar alias en bloque (una consulta para las materias, una para los alias existentes
+        y un bulk_create).
+        
+        Args:
+            pensum_id: ID del pensum
+            filas: Diccionarios con alias y materia_id o materia (nombre)
+            reemplazar: Si es True, elimina antes los alias existentes del pensum
+        
+        Returns:
+            Tupla (creados, omitidos, errores). Se omiten los alias repetidos; los errores
+            indican la fila, el alias y el motivo.
+        """
+        from api.historias.services.comparadorService import _normalize_text
+        
+        materias = list(Materia.objects.filter(pensum_id=pensum_id, es_activa=True).only('materia_id', 'nombre_materia'))
+        por_id = {m.materia_id: m for m in materias}
+        por_nombre = {_normalize_text(m.nombre_materia): m for m in materias}
+        
+        with transaction.atomic():
+            if reemplazar:
+                MateriaAlias.objects.filter(materia_id__pensum_id=pensum_id).delete()
+                existentes = {}
+            else:
+                existentes = dict(
+                    MateriaAlias.objects.filter(materia_id__pensum_id=pensum_id).values_list('alias', 'materia_id')
+                )
+            
+            nuevos = {}
+            omitidos = 0
+            errores = []
+            for fila_num, fila in enumerate(filas, start=1):
+                alias = _normalize_text(fila['alias'])
+                if fila.get('materia_id'):
+                    materia = por_id.get(fila['materia_id'])
+                else:
+                    materia = por_nombre.get(_normalize_text(fila['materia']))
+                
+                # Materia a la que ya está asignado el alias (en BD o en esta importación)
+                asignada = existentes.get(alias)
+                if asignada is None and alias in nuevos:
+                    asignada = nuevos[alias].materia_id
+                
+                if materia is None:
+                    errores.append({'fila': fila_num, 'alias': alias, 'error': 'Materia no encontrada en el pensum'})
+                elif alias in por_nombre:
+                    errores.append({'fila': fila_num, 'alias': alias, 'error': 'El alias es el nombre de una materia del pensum'})
+                elif asignada is not None and asignada != materia.materia_id:
+                    errores.append({'fila': fila_num, 'alias': alias, 'error': 'El alias ya está asignado a otra materia'})
+                elif asignada is not None:
+                    omitidos += 1
+                else:
+                    nuevos[alias] = materia
+            
+            # bulk_create no llama a save(): los alias ya van normalizados
+            MateriaAlias.objects.bulk_create(
+                [MateriaAlias(materia_id=materia, alias=alias) for alias, materia in nuevos.items()]
+            )
+        
+        return len(nuevos), omitidos, errores
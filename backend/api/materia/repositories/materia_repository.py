@@ -1,9 +1,20 @@
-from django.db import models
+import copy
+
+from django.db import models, transaction
 from api.materia.models.materia import Materia
+from api.pensum.repositories.repository_pensum import PensumRepository
 from typing import List, Dict, Any, Optional, Tuple
 
 class MateriaRepository:
-    """Repository para manejar el acceso a datos de Materia"""
+    """
+    Repository para manejar el acceso a datos de Materia.
+
+    crear, actualizar y eliminar actualizan en la misma transacción los contadores del pensum
+    (ver PensumRepository.actualizar_contadores).
+    """
+
+    def __init__(self):
+        self.pensum_repository = PensumRepository()
     
     def obtener_todas(self) -> List[Materia]:
         """Obtener todas las materias activas"""
@@ -34,14 +45,16 @@ class MateriaRepository:
             except Pensum.DoesNotExist:
                 return False, None, "El pensum especificado no existe"
             
-            materia = Materia.objects.create(
-                pensum_id=pensum,
-                nombre_materia=data['nombre_materia'],
-                creditos=data['creditos'],
-                es_obligatoria=data.get('es_obligatoria', True),
-                es_activa=data.get('es_activa', True),
-                semestre=data['semestre']
-            )
+            with transaction.atomic():
+                materia = Materia.objects.create(
+                    pensum_id=pensum,
+                    nombre_materia=data['nombre_materia'],
+                    creditos=data['creditos'],
+                    es_obligatoria=data.get('es_obligatoria', True),
+                    es_activa=data.get('es_activa', True),
+                    semestre=data['semestre']
+                )
+                self.pensum_repository.actualizar_contadores(actual=materia)
             return True, materia, "Materia creada exitosamente"
         except Exception as e:
             print(f"[REPOSITORY] Error al crear materia: {e}")
@@ -50,28 +63,32 @@ class MateriaRepository:
     def actualizar(self, materia_id: int, data: Dict[str, Any]) -> Tuple[bool, Optional[Materia], str]:
         """Actualizar materia existente"""
         try:
-            materia = Materia.objects.get(materia_id=materia_id)
-            
-            if 'pensum_id' in data:
-                from api.pensum.models.pensum import Pensum
-                try:
-                    pensum = Pensum.objects.get(pensum_id=data['pensum_id'])
-                    materia.pensum_id = pensum
-                except Pensum.DoesNotExist:
-                    return False, None, "El pensum especificado no existe"
+            with transaction.atomic():
+                # Fila bloqueada: el estado anterior no cambia hasta actualizar los contadores
+                materia = Materia.objects.select_for_update().get(materia_id=materia_id)
+                anterior = copy.copy(materia)
+                
+                if 'pensum_id' in data:
+                    from api.pensum.models.pensum import Pensum
+                    try:
+                        pensum = Pensum.objects.get(pensum_id=data['pensum_id'])
+                        materia.pensum_id = pensum
+                    except Pensum.DoesNotExist:
+                        return False, None, "El pensum especificado no existe"
             
-            if 'nombre_materia' in data:
-                materia.nombre_materia = data['nombre_materia']
-            if 'creditos' in data:
-                materia.creditos = data['creditos']
-            if 'es_obligatoria' in data:
-                materia.es_obligatoria = data['es_obligatoria']
-            if 'es_activa' in data:
-                materia.es_activa = data['es_activa']
-            if 'semestre' in data:
-                materia.semestre = data['semestre']
+                if 'nombre_materia' in data:
+                    materia.nombre_materia = data['nombre_materia']
+                if 'creditos' in data:
+                    materia.creditos = data['creditos']
+                if 'es_obligatoria' in data:
+                    materia.es_obligatoria = data['es_obligatoria']
+                if 'es_activa' in data:
+                    materia.es_activa = data['es_activa']
+                if 'semestre' in data:
+                    materia.semestre = data['semestre']
             
-            materia.save()
+                materia.save()
+                self.pensum_repository.actualizar_contadores(anterior, materia)
             return True, materia, "Materia actualizada exitosamente"
         except Materia.DoesNotExist:
             return False, None, "Materia no encontrada"
@@ -82,9 +99,12 @@ class MateriaRepository:
     def eliminar(self, materia_id: int) -> Tuple[bool, str]:
         """Eliminar materia (soft delete - actualiza es_activa a False)"""
         try:
-            materia = Materia.objects.get(materia_id=materia_id)
-            materia.es_activa = False
-            materia.save()
+            with transaction.atomic():
+                materia = Materia.objects.select_for_update().get(materia_id=materia_id)
+                anterior = copy.copy(materia)
+                materia.es_activa = False
+                materia.save()
+                self.pensum_repository.actualizar_contadores(anterior, materia)
             return True, "Materia marcada como inactiva exitosamente"
         except Materia.DoesNotExist:
             return False, "Materia no encontrada"
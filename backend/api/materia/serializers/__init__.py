@@ -1,4 +1,6 @@
 from .materia_serializer import MateriaSerializer, MateriaCreateSerializer, MateriaUpdateSerializer
+from .materia_alias_serializer import MateriaAliasSerializer, MateriaAliasFilaSerializer, MateriaAliasImportSerializer
 
-__all__ = ['MateriaSerializer', 'MateriaCreateSerializer', 'MateriaUpdateSerializer']
+__all__ = ['MateriaSerializer', 'MateriaCreateSerializer', 'MateriaUpdateSerializer',
+           'MateriaAliasSerializer', 'MateriaAliasFilaSerializer', 'MateriaAliasImportSerializer']
 
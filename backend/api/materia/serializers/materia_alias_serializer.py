@@ -0,0 +1,53 @@
+from rest_framework import serializers
+from api.materia.models.materia_alias import MateriaAlias
+
+class MateriaAliasSerializer(serializers.ModelSerializer):
+    """Serializer para el modelo MateriaAlias"""
+    nombre_materia = serializers.CharField(source='materia_id.nombre_materia', read_only=True)
+    
+    class Meta:
+        model = MateriaAlias
+        fields = ['alias_id', 'materia_id', 'nombre_materia', 'alias', 'fecha_creacion']
+        read_only_fields = ['alias_id', 'fecha_creacion']
+
+class MateriaAliasFilaSerializer(serializers.Serializer):
+    """Una fila de la importación: la materia se indica por ID o por nombre"""
+    materia_id = serializers.IntegerField(required=False)
+    materia = serializers.CharField(max_length=100, required=False)
+    alias = serializers.CharField(max_length=150, required=True)
+    
+    def validate_alias(self, value):
+        """Validar alias"""
+        if not value or not value.strip():
+            raise serializers.ValidationError("El alias no puede estar vacío")
+        return value.strip()
+    
+    def validate(self, data):
+        """Validar que se indique la materia"""
+        if not data.get('materia_id') and not (data.get('materia') or '').strip():
+            raise serializers.ValidationError("Debe indicar materia_id o el nombre de la materia")
+        return data
+
+class MateriaAliasImportSerializer(serializers.Serializer):
+    """Serializer para la importación masiva de alias de un pensum"""
+    pensum_id = serializers.IntegerField(required=True)
+    alias = MateriaAliasFilaSerializer(many=True, required=True)
+    reemplazar = serializers.BooleanField(default=False, required=False)
+    
+    def validate_pensum_id(self, value):
+        """Validar que el pensum_id existe"""
+        from api.pensum.models.pensum import Pensum
+        
+        if value <= 0:
+            raise serializers.ValidationError("El ID del pensum debe ser mayor a 0")
+        
+        if not Pensum.objects.filter(pensum_id=value).exists():
+            raise serializers.ValidationError("El pensum especificado no existe")
+        
+        return value
+    
+    def validate_alias(self, value):
+        """Validar que haya al menos un alias"""
+        if not value:
+            raise serializers.ValidationError("Debe enviar al menos un alias")
+        return value
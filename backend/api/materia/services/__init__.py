@@ -1,4 +1,5 @@
 from .materia_service import MateriaService
+from .materia_alias_service import MateriaAliasService
 
-__all__ = ['MateriaService']
+__all__ = ['MateriaService', 'MateriaAliasService']
 
@@ -0,0 +1,101 @@
+import io
+from typing import List, Dict, Any, Tuple
+
+import pandas as pd
+
+from api.materia.repositories.materia_alias_repository import MateriaAliasRepository
+from api.materia.serializers.materia_alias_serializer import MateriaAliasSerializer, MateriaAliasImportSerializer
+
+class MateriaAliasService:
+    """Service para manejar la lógica de negocio de MateriaAlias"""
+    
+    def __init__(self):
+        self.repository = MateriaAliasRepository()
+    
+    def obtener_alias_por_pensum(self, pensum_id: int) -> Tuple[bool, Dict[str, Any]]:
+        """Obtener los alias de las materias de un pensum"""
+        try:
+            if not pensum_id or pensum_id <= 0:
+                return False, {
+                    'error': 'ID de pensum inválido'
+                }
+            
+            alias = self.repository.obtener_por_pensum(pensum_id)
+            serializer = MateriaAliasSerializer(alias, many=True)
+            return True, {
+                'message': f'Alias del pensum {pensum_id} obtenidos exitosamente',
+                'alias': serializer.data,
+                'total': len(alias)
+            }
+        except Exception as e:
+            print(f"[SERVICE] Error al obtener alias del pensum {pensum_id}: {e}")
+            return False, {
+                'error': 'Error interno al obtener alias',
+                'details': str(e)
+            }
+    
+    def importar_alias(self, data: Dict[str, Any]) -> Tuple[bool, Dict[str, Any]]:
+        """
+        Importar alias en bloque para un pensum.
+        Las filas con errores se reportan y no impiden importar las demás.
+        """
+        try:
+            serializer = MateriaAliasImportSerializer(data=data)
+            if not serializer.is_valid():
+                return False, {
+                    'error': 'Datos inválidos',
+                    'details': serializer.errors
+                }
+            
+            datos = serializer.validated_data
+            creados, omitidos, errores = self.repository.importar(
+                datos['pensum_id'], datos['alias'], reemplazar=datos.get('reemplazar', False)
+            )
+            
+            # bulk_create no dispara señales: los pensums compilados se invalidan (en todos los
+            # workers al confirmar)
+            from api.historias.services.pensum_compilado import invalidar_pensums_compilados
+            invalidar_pensums_compilados()
+            
+            respuesta = {
+                'message': f'{creados} alias importados exitosamente',
+                'creados': creados,
+                'omitidos': omitidos,
+                'total_filas': len(datos['alias'])
+            }
+            if errores:
+                respuesta['errores'] = errores
+            return True, respuesta
+        except Exception as e:
+            print(f"[SERVICE] Error al importar alias: {e}")
+            return False, {
+                'error': 'Error interno al importar alias',
+                'details': str(e)
+            }
+    
+    @staticmethod
+    def leer_csv_alias(archivo) -> List[Dict[str, Any]]:
+        """
+        Leer un CSV de alias con columnas alias y materia (nombre) o materia_id.
+        El delimitador y la codificación se detectan igual que en las historias académicas.
+        
+        Raises:
+            ValueError: Si el archivo no tiene las columnas requeridas
+        """
+        from api.historias.tools.lector_historias import HistoriaReader
+        
+        contenido = archivo.read()
+        muestra = contenido[:HistoriaReader.TAMANO_MUESTRA]
+        codificacion = HistoriaReader.detectar_codificacion(muestra)
+        delimitador = HistoriaReader.detectar_delimitador(muestra.decode(codificacion, errors='ignore'))
+        
+        filas = pd.read_csv(io.BytesIO(contenido), sep=delimitador, encoding=codificacion, dtype=str)
+        filas.columns = filas.columns.str.strip().str.lower()
+        if 'alias' not in filas.columns or not ({'materia', 'materia_id'} & set(filas.columns)):
+            raise ValueError('El archivo debe tener la columna "alias" y la columna "materia" o "materia_id"')
+        
+        filas = filas.dropna(subset=['alias'])
+        return [
+            {clave: valor for clave, valor in fila.items() if pd.notna(valor)}
+            for fila in filas.to_dict(orient='records')
+        ]
@@ -18,5 +18,9 @@ urlpatterns = [
     path('semestre/<int:semestre>/', controller_materia.obtener_materias_por_semestre, name='obtener-materias-semestre'),
     path('buscar/', controller_materia.buscar_materias, name='buscar-materias'),
     path('obligatorias/', controller_materia.listar_materias_obligatorias, name='listar-materias-obligatorias'),
+    
+    # Alias de materias (equivalencias de nombres para el comparador de historias)
+    path('alias/pensum/<int:pensum_id>/', controller_materia.listar_alias_por_pensum, name='listar-alias-pensum'),
+    path('alias/importar/', controller_materia.importar_alias_materias, name='importar-alias-materias'),
 ]
 
@@ -0,0 +1,93 @@
+import hmac
+
+from django.conf import settings
+from django.http import HttpResponse
+from rest_framework import status
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.permissions import AllowAny
+from rest_framework.response import Response
+from drf_spectacular.utils import extend_schema, OpenApiResponse
+
+from api.metricas.services.metricas_service import exportar_metricas, metricas_habilitadas
+from api.middleware.rendimiento_middleware import resumen_rendimiento
+
+
+def _respuesta_token_invalido():
+    return Response({
+        'error': 'Token de métricas inválido',
+        'details': 'Envíe Authorization: Bearer <METRICAS_TOKEN> (defina METRICAS_TOKEN en producción)'
+    }, status=status.HTTP_401_UNAUTHORIZED)
+
+
+def _token_valido(request):
+    """
+    El scraper debe enviar METRICAS_TOKEN como 'Authorization: Bearer <token>'. Sin token
+    configurado solo se permite el acceso si METRICAS_PERMITIR_SIN_TOKEN (por defecto, DEBUG).
+    """
+    esperado = getattr(settings, 'METRICAS_TOKEN', '')
+    if not esperado:
+        return getattr(settings, 'METRICAS_PERMITIR_SIN_TOKEN', settings.DEBUG)
+    recibido = request.META.get('HTTP_AUTHORIZATION', '')
+    return hmac.compare_digest(recibido, f'Bearer {esperado}')
+
+
+@extend_schema(
+    tags=['Métricas'],
+    summary="Métricas en formato Prometheus",
+    description="""
+    Contadores e histogramas para Prometheus: requests y latencia por endpoint, duración de
+    las etapas del comparador, estudiantes evaluados, aciertos y fallos de las cachés de
+    pensum, configuración, resultados e historias, tamaño de las historias leídas y errores
+    por tipo.
+
+    Con varios workers de gunicorn defina PROMETHEUS_MULTIPROC_DIR para que cada scrape
+    sume las métricas de todos los procesos. Requiere el paquete prometheus-client y el
+    header 'Authorization: Bearer <METRICAS_TOKEN>' (sin METRICAS_TOKEN solo responde con DEBUG).
+    """,
+    responses={
+        200: OpenApiResponse(description="Métricas en formato de texto de Prometheus"),
+        401: OpenApiResponse(description="Token no enviado o incorrecto, o METRICAS_TOKEN sin definir fuera de DEBUG"),
+        501: OpenApiResponse(description="prometheus-client no está instalado"),
+    }
+)
+@api_view(['GET'])
+@permission_classes([AllowAny])  # Exento del middleware JWT; se protege con METRICAS_TOKEN
+def obtener_metricas(request):
+    """
+    Expone las métricas de la aplicación para Prometheus.
+    """
+    if not _token_valido(request):
+        return _respuesta_token_invalido()
+    if not metricas_habilitadas():
+        return Response({
+            'error': 'Métricas no disponibles',
+            'details': 'Instale prometheus-client para exponer las métricas'
+        }, status=status.HTTP_501_NOT_IMPLEMENTED)
+
+    contenido, content_type = exportar_metricas()
+    return HttpResponse(contenido, content_type=content_type)
+
+
+@extend_schema(
+    tags=['Métricas'],
+    summary="Histograma de latencia reciente por endpoint",
+    description="""
+    Resumen de los últimos RENDIMIENTO_VENTANA requests de cada nombre de URL que midió
+    RendimientoMiddleware en este proceso: percentiles p50/p95/p99 y máximo en ms, consultas
+    SQL y tiempo SQL promedio, y buckets acumulados. No requiere prometheus-client; se protege
+    igual que /api/metrics/.
+    """,
+    responses={
+        200: OpenApiResponse(description="Diccionario nombre de URL -> resumen de rendimiento"),
+        401: OpenApiResponse(description="Token no enviado o incorrecto, o METRICAS_TOKEN sin definir fuera de DEBUG"),
+    }
+)
+@api_view(['GET'])
+@permission_classes([AllowAny])  # Exento del middleware JWT; se protege con METRICAS_TOKEN
+def obtener_resumen_rendimiento(request):
+    """
+    Expone el histograma en memoria de RendimientoMiddleware.
+    """
+    if not _token_valido(request):
+        return _respuesta_token_invalido()
+    return Response(resumen_rendimiento())
@@ -0,0 +1,26 @@
+import os
+
+from api.instrumentacion import prometheus_client
+
+if prometheus_client is not None:
+    from prometheus_client import CollectorRegistry, generate_latest, multiprocess
+
+
+def metricas_habilitadas():
+    return prometheus_client is not None
+
+
+def exportar_metricas():
+    """
+    Métricas en formato de texto de Prometheus. Con PROMETHEUS_MULTIPROC_DIR definido (varios
+    workers de gunicorn) se suman las de todos los procesos desde ese directorio.
+
+    Returns:
+        Tupla (contenido en bytes, content type)
+    """
+    if os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+        registro = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registro)
+    else:
+        registro = prometheus_client.REGISTRY
+    return generate_latest(registro), prometheus_client.CONTENT_TYPE_LATEST
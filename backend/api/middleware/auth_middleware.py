@@ -1,7 +1,8 @@
 from django.http import JsonResponse
 from django.utils.deprecation import MiddlewareMixin
 import jwt
-from django.conf import settings
+
+from api.usuario.services.cache_usuarios import decodificar_token, obtener_usuario_activo
 
 class JWTAuthenticationMiddleware(MiddlewareMixin):
     """
@@ -18,7 +19,8 @@ class JWTAuthenticationMiddleware(MiddlewareMixin):
         '/api/docs/swagger/',
         '/api/schema/',
         '/api/docs/redoc/',
-        '/api/historias/',  # Permitir acceso a endpoints de historias
+        '/api/historias/verificar/',  # Verificación pública de elegibilidad (estudiante y masiva)
+        '/api/metrics/',  # Prometheus y resumen de rendimiento; se protegen con METRICAS_TOKEN
     ]
     
     def process_request(self, request):
@@ -54,12 +56,8 @@ class JWTAuthenticationMiddleware(MiddlewareMixin):
         print(f"[MIDDLEWARE] Token extraído: {token[:20]}...")
         
         try:
-            # Decodificar token para obtener información del usuario
-            decoded_token = jwt.decode(
-                token, 
-                settings.SECRET_KEY, 
-                algorithms=['HS256']
-            )
+            # Decodificar token para obtener información del usuario (cacheado por firma)
+            decoded_token = decodificar_token(token)
             print(f"[MIDDLEWARE] Token decodificado: {decoded_token}")
             
             user_id = decoded_token.get('user_id')
@@ -74,19 +72,15 @@ class JWTAuthenticationMiddleware(MiddlewareMixin):
             
             print(f"[MIDDLEWARE] user_id extraído: {user_id}")
             
-            # Importar aquí para evitar importación circular
-            from api.usuario.models.usuario import Usuario
-            
-            # Obtener usuario de la base de datos
-            try:
-                usuario = Usuario.objects.get(usuario_id=user_id, es_activo=True)
-                print(f"[MIDDLEWARE] Usuario encontrado: {usuario.nombre_usuario}")
-            except Usuario.DoesNotExist:
+            # Obtener usuario (caché en proceso; solo consulta la BD si no está o cambió)
+            usuario = obtener_usuario_activo(user_id)
+            if usuario is None:
                 print(f"[MIDDLEWARE] Usuario no encontrado en BD para user_id: {user_id}")
                 return JsonResponse({
                     'error': 'Usuario no encontrado',
                     'code': 'USER_NOT_FOUND'
                 }, status=401)
+            print(f"[MIDDLEWARE] Usuario encontrado: {usuario.nombre_usuario}")
             
             # Agregar información del usuario al request
             request.user_id = user_id
@@ -0,0 +1,133 @@
+import threading
+import time
+from collections import deque
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connection
+from django.urls import Resolver404, resolve
+
+from api.instrumentacion import MedicionRequest, medir_request, registrar_request
+
+# Límites superiores (ms) de los buckets del histograma; el último bucket es +Inf
+BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+# Duraciones recientes que se conservan por nombre de URL
+VENTANA_HISTOGRAMA = getattr(settings, 'RENDIMIENTO_VENTANA', 1000)
+
+# Nombre de URL -> deque de (ms total, consultas SQL, ms SQL) de los últimos requests
+_histogramas = {}
+_histogramas_lock = threading.Lock()
+
+
+def resumen_rendimiento():
+    """
+    Histograma de los últimos requests por nombre de URL.
+
+    Returns:
+        Diccionario url_name -> {requests, p50_ms, p95_ms, p99_ms, max_ms, consultas_promedio,
+        sql_ms_promedio, buckets}; buckets es una lista de (límite en ms, requests hasta ese
+        límite) acumulada, como un histograma de Prometheus
+    """
+    with _histogramas_lock:
+        copias = {nombre: list(muestras) for nombre, muestras in _histogramas.items()}
+    resumen = {}
+    for nombre, muestras in copias.items():
+        if not muestras:
+            continue
+        duraciones = sorted(total for total, _, _ in muestras)
+        n = len(duraciones)
+
+        def percentil(p):
+            return round(duraciones[min(n - 1, int(p * n))], 3)
+
+        resumen[nombre] = {
+            'requests': n,
+            'p50_ms': percentil(0.50),
+            'p95_ms': percentil(0.95),
+            'p99_ms': percentil(0.99),
+            'max_ms': round(duraciones[-1], 3),
+            'consultas_promedio': round(sum(c for _, c, _ in muestras) / n, 2),
+            'sql_ms_promedio': round(sum(s for _, _, s in muestras) / n, 3),
+            'buckets': [
+                (limite, sum(1 for d in duraciones if d <= limite)) for limite in BUCKETS_MS
+            ] + [('+Inf', n)],
+        }
+    return resumen
+
+
+class RendimientoMiddleware:
+    """
+    Mide cada request: tiempo total, consultas y tiempo SQL (connection.execute_wrapper) y las
+    etapas registradas con etapa_request (lectura de historias y etapas del comparador). Los
+    expone en el header Server-Timing y los acumula en un histograma en memoria por nombre de
+    URL (ver resumen_rendimiento, expuesto en /api/metrics/rendimiento/). También los registra
+    en las métricas de Prometheus. En las respuestas streaming la duración se registra cuando
+    termina el envío del cuerpo.
+
+    Se deshabilita con RENDIMIENTO_MEDICION = False.
+    """
+
+    def __init__(self, get_response):
+        if not getattr(settings, 'RENDIMIENTO_MEDICION', True):
+            raise MiddlewareNotUsed()
+        self.get_response = get_response
+
+    def __call__(self, request):
+        medicion = MedicionRequest()
+        inicio = time.perf_counter()
+        with medir_request(medicion), connection.execute_wrapper(medicion.registrar_sql):
+            response = self.get_response(request)
+        total_ms = (time.perf_counter() - inicio) * 1000
+
+        partes = [f'total;dur={total_ms:.1f}', f'sql;dur={medicion.sql_ms:.1f};desc="{medicion.consultas} consultas"']
+        partes.extend(f'{nombre};dur={ms:.1f}' for nombre, ms in medicion.etapas.items())
+        response['Server-Timing'] = ', '.join(partes)
+
+        resolver = getattr(request, 'resolver_match', None)
+        if resolver is None:
+            # Respondido antes de la vista (p. ej. 401 del middleware JWT): se resuelve aquí
+            try:
+                resolver = resolve(request.path_info)
+            except Resolver404:
+                pass
+        nombre = (resolver.url_name or resolver.view_name) if resolver is not None else 'sin_ruta'
+
+        if response.streaming:
+            # El cuerpo se genera mientras se envía: la duración se registra al cerrar el iterador.
+            # Server-Timing ya salió con los headers y solo cubre hasta retornar la respuesta; las
+            # consultas SQL hechas durante el envío no se cuentan.
+            response.streaming_content = self._medir_envio(
+                response.streaming_content, response.is_async, request, response, nombre, medicion, inicio
+            )
+        else:
+            self._registrar(request, response, nombre, medicion, total_ms)
+        return response
+
+    def _medir_envio(self, contenido, es_async, request, response, nombre, medicion, inicio):
+        def registrar():
+            self._registrar(request, response, nombre, medicion, (time.perf_counter() - inicio) * 1000)
+
+        if es_async:
+            async def iterar_async():
+                try:
+                    async for parte in contenido:
+                        yield parte
+                finally:
+                    registrar()
+            return iterar_async()
+
+        def iterar():
+            try:
+                yield from contenido
+            finally:
+                registrar()
+        return iterar()
+
+    def _registrar(self, request, response, nombre, medicion, total_ms):
+        muestras = _histogramas.get(nombre)
+        if muestras is None:
+            with _histogramas_lock:
+                muestras = _histogramas.setdefault(nombre, deque(maxlen=VENTANA_HISTOGRAMA))
+        muestras.append((total_ms, medicion.consultas, medicion.sql_ms))
+        registrar_request(nombre, request.method, response.status_code, total_ms / 1000, medicion.etapas, response)
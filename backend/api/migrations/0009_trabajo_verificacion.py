@@ -0,0 +1,57 @@
+# Generated by Django 5.1.7 on 2026-10-18 01:33
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0008_remove_configuracionelegibilidad_porcentaje_avance_minimo'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TrabajoVerificacion',
+            fields=[
+                ('trabajo_id', models.AutoField(primary_key=True, serialize=False)),
+                ('estado', models.CharField(choices=[('pendiente', 'Pendiente'), ('en_proceso', 'En proceso'), ('completado', 'Completado'), ('fallido', 'Fallido')], default='pendiente', max_length=20)),
+                ('total_archivos', models.IntegerField(default=0)),
+                ('archivos_procesados', models.IntegerField(default=0)),
+                ('archivos_con_error', models.IntegerField(default=0)),
+                ('elegibles', models.IntegerField(default=0)),
+                ('no_elegibles', models.IntegerField(default=0)),
+                ('error', models.TextField(blank=True, help_text='Error que hizo fallar el trabajo completo', null=True)),
+                ('fecha_creacion', models.DateTimeField(auto_now_add=True)),
+                ('fecha_inicio', models.DateTimeField(blank=True, null=True)),
+                ('fecha_fin', models.DateTimeField(blank=True, null=True)),
+                ('programa_id', models.ForeignKey(db_column='programa_id', help_text='Programa académico contra cuyo pensum se verifican las historias', on_delete=django.db.models.deletion.CASCADE, to='api.programa')),
+            ],
+            options={
+                'db_table': 'trabajo_verificacion',
+            },
+        ),
+        migrations.CreateModel(
+            name='ArchivoTrabajo',
+            fields=[
+                ('archivo_id', models.AutoField(primary_key=True, serialize=False)),
+                ('nombre', models.CharField(max_length=255)),
+                ('contenido', models.BinaryField(help_text='Contenido del archivo; se vacía una vez procesado')),
+                ('estado', models.CharField(choices=[('pendiente', 'Pendiente'), ('procesado', 'Procesado'), ('error', 'Error')], default='pendiente', max_length=20)),
+                ('resultado', models.JSONField(blank=True, null=True)),
+                ('error', models.TextField(blank=True, null=True)),
+                ('trabajo', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='archivos', to='api.trabajoverificacion')),
+            ],
+            options={
+                'db_table': 'archivo_trabajo',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='trabajoverificacion',
+            index=models.Index(fields=['estado'], name='trabajo_ver_estado_f090d9_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='archivotrabajo',
+            index=models.Index(fields=['trabajo', 'estado'], name='archivo_tra_trabajo_650b97_idx'),
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.1.7 on 2026-10-18 01:56
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0009_trabajo_verificacion'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MateriaAlias',
+            fields=[
+                ('alias_id', models.AutoField(primary_key=True, serialize=False)),
+                ('alias', models.CharField(help_text='Nombre alternativo normalizado (mayúsculas, sin tildes)', max_length=150)),
+                ('fecha_creacion', models.DateTimeField(auto_now_add=True)),
+                ('materia_id', models.ForeignKey(db_column='materia_id', help_text='Materia del pensum a la que equivale el alias', on_delete=django.db.models.deletion.CASCADE, related_name='alias', to='api.materia')),
+            ],
+            options={
+                'db_table': 'materia_alias',
+                'indexes': [models.Index(fields=['alias'], name='materia_ali_alias_ef93de_idx')],
+                'constraints': [models.UniqueConstraint(fields=('materia_id', 'alias'), name='materia_alias_unico')],
+            },
+        ),
+    ]
@@ -0,0 +1,57 @@
+# Generated by Django 5.1.7 on 2026-10-18 01:58
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0010_materia_alias'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Estudiante',
+            fields=[
+                ('estudiante_id', models.AutoField(primary_key=True, serialize=False)),
+                ('codigo', models.CharField(help_text='Código del estudiante (tomado del nombre del archivo)', max_length=50)),
+                ('huella_historia', models.CharField(help_text='SHA-256 del archivo de historia ingerido; si no cambia, no se vuelve a ingerir', max_length=64)),
+                ('total_registros', models.IntegerField(default=0)),
+                ('fecha_creacion', models.DateTimeField(auto_now_add=True)),
+                ('fecha_actualizacion', models.DateTimeField(auto_now=True)),
+                ('programa_id', models.ForeignKey(db_column='programa_id', help_text='Programa académico del estudiante', on_delete=django.db.models.deletion.CASCADE, to='api.programa')),
+            ],
+            options={
+                'db_table': 'estudiante',
+            },
+        ),
+        migrations.CreateModel(
+            name='RegistroHistoria',
+            fields=[
+                ('registro_id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('materia', models.CharField(help_text='Nombre de la materia tal como viene en la historia', max_length=200)),
+                ('materia_normalizada', models.CharField(help_text='Nombre normalizado (mayúsculas, sin tildes)', max_length=200)),
+                ('semestre', models.IntegerField(blank=True, null=True)),
+                ('creditos', models.IntegerField(blank=True, null=True)),
+                ('definitiva', models.FloatField(blank=True, null=True)),
+                ('periodo', models.CharField(blank=True, max_length=20, null=True)),
+                ('estudiante', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='registros', to='api.estudiante')),
+            ],
+            options={
+                'db_table': 'registro_historia',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='estudiante',
+            constraint=models.UniqueConstraint(fields=('programa_id', 'codigo'), name='estudiante_programa_codigo_unico'),
+        ),
+        migrations.AddIndex(
+            model_name='registrohistoria',
+            index=models.Index(fields=['estudiante', 'materia_normalizada'], name='registro_hi_estudia_e7d67b_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='registrohistoria',
+            index=models.Index(fields=['estudiante', 'periodo'], name='registro_hi_estudia_cdb2a0_idx'),
+        ),
+    ]
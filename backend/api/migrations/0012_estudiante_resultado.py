@@ -0,0 +1,32 @@
+# Generated by Django 5.1.7 on 2026-10-18 02:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0011_estudiante_registro_historia'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='estudiante',
+            name='estado',
+            field=models.IntegerField(blank=True, help_text='1 elegible, 0 no elegible', null=True),
+        ),
+        migrations.AddField(
+            model_name='estudiante',
+            name='fecha_evaluacion',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='estudiante',
+            name='resultado',
+            field=models.JSONField(blank=True, help_text='Resultado completo del comparador', null=True),
+        ),
+        migrations.AddIndex(
+            model_name='estudiante',
+            index=models.Index(fields=['programa_id', 'estado'], name='estudiante_program_573da8_idx'),
+        ),
+    ]
@@ -0,0 +1,73 @@
+# Generated by Django 5.1.7 on 2026-10-18 02:12
+
+from django.db import migrations, models
+from django.db.models import Count, Sum
+
+
+def calcular_contadores(apps, schema_editor):
+    """Llena los contadores de los pensums existentes desde sus materias activas."""
+    Pensum = apps.get_model('api', 'Pensum')
+    Materia = apps.get_model('api', 'Materia')
+
+    contadores = {}
+    filas = (
+        Materia.objects.filter(es_activa=True)
+        .values_list('pensum_id', 'es_obligatoria', 'semestre')
+        .annotate(materias=Count('pk'), creditos=Sum('creditos'))
+        .order_by('pensum_id', 'semestre')
+    )
+    for pensum_id, es_obligatoria, semestre, materias, creditos in filas:
+        contador = contadores.setdefault(pensum_id, {
+            'contador_creditos_obligatorios': 0,
+            'contador_creditos_por_semestre': {},
+            'contador_materias_obligatorias': 0,
+            'contador_materias_electivas': 0,
+            'contador_creditos_electivas': 0,
+        })
+        creditos = creditos or 0
+        if es_obligatoria:
+            contador['contador_materias_obligatorias'] += materias
+            contador['contador_creditos_obligatorios'] += creditos
+            if creditos:
+                contador['contador_creditos_por_semestre'][str(semestre)] = creditos
+        else:
+            contador['contador_materias_electivas'] += materias
+            contador['contador_creditos_electivas'] += creditos
+    for pensum_id, contador in contadores.items():
+        Pensum.objects.filter(pk=pensum_id).update(**contador)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0012_estudiante_resultado'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='pensum',
+            name='contador_creditos_electivas',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='pensum',
+            name='contador_creditos_obligatorios',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='pensum',
+            name='contador_creditos_por_semestre',
+            field=models.JSONField(default=dict),
+        ),
+        migrations.AddField(
+            model_name='pensum',
+            name='contador_materias_electivas',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='pensum',
+            name='contador_materias_obligatorias',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.RunPython(calcular_contadores, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.1.7 on 2026-10-18 02:31
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0013_pensum_contadores'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='estudiante',
+            name='version_evaluacion',
+            field=models.CharField(blank=True, default='', help_text='Versión del pensum compilado (materias, alias y configuración) del último resultado; vacía si la historia cambió y falta evaluarla', max_length=40),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.1.7 on 2026-10-18 02:34
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0014_estudiante_version_evaluacion'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='trabajoverificacion',
+            name='fecha_actualizacion',
+            field=models.DateTimeField(blank=True, help_text='Último progreso del worker; si se detiene, el trabajo se reclama como abandonado', null=True),
+        ),
+        migrations.AlterField(
+            model_name='archivotrabajo',
+            name='contenido',
+            field=models.BinaryField(help_text='Contenido del archivo; se vacía al procesarlo o si el trabajo falla'),
+        ),
+    ]
@@ -4,7 +4,10 @@ from django.db import models
 from api.electiva.models.electiva import Electiva
 from api.configuracion.models.configuracion_elegibilidad import ConfiguracionElegibilidad
 from api.materia.models.materia import Materia
+from api.materia.models.materia_alias import MateriaAlias
 from api.oferta_electiva.models.oferta_electiva import OfertaElectiva
 from api.pensum.models.pensum import Pensum
 from api.programa.models.programa import Programa
 from api.usuario.models.usuario import Usuario
+from api.historias.models.trabajo_verificacion import TrabajoVerificacion, ArchivoTrabajo
+from api.historias.models.estudiante import Estudiante, RegistroHistoria
@@ -1,64 +1,52 @@
 from django.db import models
-from django.db.models import Sum
 
 class Pensum(models.Model):
     pensum_id = models.AutoField(primary_key=True)
     programa_id = models.ForeignKey('Programa', on_delete=models.CASCADE) # FK a la tabla Programa
     anio_creacion = models.IntegerField(null=True) # Año de creación del pensum, por ejemplo, 2024 y puede ser null, no es obligatoria
     es_activo = models.BooleanField(default=True) # True si el pensum está activo, False si está inactivo
-    # Este campo ya que será calculado automáticamente
-    # creditos_obligatorios_totales = models.IntegerField(null=True) # Total de créditos obligatorios del pensum
-    
+
+    # Contadores de las materias activas, mantenidos por MateriaRepository al crear, actualizar o
+    # eliminar materias (reconstruir con: python manage.py recalcular_contadores_pensum)
+    contador_creditos_obligatorios = models.IntegerField(default=0) # Créditos obligatorios de todos los semestres
+    contador_creditos_por_semestre = models.JSONField(default=dict) # {"semestre": créditos obligatorios}
+    contador_materias_obligatorias = models.IntegerField(default=0)
+    contador_materias_electivas = models.IntegerField(default=0)
+    contador_creditos_electivas = models.IntegerField(default=0)
+
     @property
     def creditos_obligatorios_totales(self):
-        """Calcula automáticamente los créditos obligatorios hasta el semestre límite"""
-        from api.materia.models.materia import Materia
-        from api.configuracion.models.configuracion_elegibilidad import ConfiguracionElegibilidad
+        """Créditos obligatorios hasta el semestre límite de la configuración activa"""
+        if hasattr(self, 'semestre_limite_config'):
+            # Anotado por PensumRepository.with_programa()
+            semestre_limite = self.semestre_limite_config
+        else:
+            from api.configuracion.services.cache_configuracion import obtener_config_activa
 
-        materias = Materia.objects.filter(
-            pensum_id=self,
-            es_obligatoria=True,
-            es_activa=True
+            # Configuración desde la caché en proceso (no consulta la BD si no cambió)
+            config = obtener_config_activa(self.programa_id_id) or {}
+            semestre_limite = config.get('semestre_limite_electivas')
+        if not semestre_limite:
+            return self.contador_creditos_obligatorios
+        return sum(
+            creditos for semestre, creditos in self.contador_creditos_por_semestre.items()
+            if int(semestre) <= semestre_limite
         )
-
-        config = ConfiguracionElegibilidad.get_config_activa(self.programa_id)
-        semestre_limite = getattr(config, 'semestre_limite_electivas', None)
-        if semestre_limite:
-            materias = materias.filter(semestre__lte=semestre_limite)
-
-        total = materias.aggregate(total_creditos=Sum('creditos'))['total_creditos']
-        return total or 0
     
     @property
     def total_materias_obligatorias(self):
-        """Cuenta el total de materias obligatorias activas"""
-        from api.materia.models.materia import Materia
-        return Materia.objects.filter(
-            pensum_id=self,
-            es_obligatoria=True,
-            es_activa=True
-        ).count()
+        """Total de materias obligatorias activas"""
+        return self.contador_materias_obligatorias
     
     @property
     def total_materias_electivas(self):
-        """Cuenta el total de materias electivas activas"""
-        from api.materia.models.materia import Materia
-        return Materia.objects.filter(
-            pensum_id=self,
-            es_obligatoria=False,
-            es_activa=True
-        ).count()
+        """Total de materias electivas activas"""
+        return self.contador_materias_electivas
     
     @property
     def total_creditos_electivas(self):
-        """Cuenta el total de créditos de materias electivas activas"""
-        from api.materia.models.materia import Materia
-        total = Materia.objects.filter(
-            pensum_id=self,
-            es_obligatoria=False,
-            es_activa=True
-        ).aggregate(total_creditos=Sum('creditos'))['total_creditos']
-        return total or 0
+        """Total de créditos de materias electivas activas"""
+        return self.contador_creditos_electivas
     
     def __str__(self):
         return f"Pensum {self.pensum_id} - Programa {self.programa_id} - Año {self.anio_creacion}"
\ No newline at end of file
@@ -2,17 +2,202 @@ from api.pensum.models.pensum import Pensum
 from api.programa.models.programa import Programa
 from django.core.exceptions import ObjectDoesNotExist
 from django.db import transaction
+from django.db.models import Count, F, OuterRef, Q, Subquery, Sum
+from django.db.models.functions import Coalesce
 
 class PensumRepository:
     def get_all(self):
         return Pensum.objects.all()
 
+    def with_programa(self, queryset=None):
+        """
+        Pensums con su programa (select_related) y el semestre límite de la configuración activa
+        anotado en la misma consulta (subconsulta). Los totales de materias y créditos se leen
+        de los contadores del pensum, sin recorrer sus materias.
+        """
+        from api.configuracion.models.configuracion_elegibilidad import ConfiguracionElegibilidad
+
+        if queryset is None:
+            queryset = Pensum.objects.all()
+        semestre_limite = ConfiguracionElegibilidad.objects.filter(
+            programa_id=OuterRef('programa_id'),
+            es_activo=True
+        ).values('semestre_limite_electivas')[:1]
+        return queryset.select_related('programa_id').annotate(semestre_limite_config=Subquery(semestre_limite))
+
+    def get_resumen_materias_por_programa(self, programa_id, semestre_limite=None):
+        """
+        Materias activas y créditos de todos los pensums de un programa en una sola consulta
+        agrupada por pensum y por obligatoriedad.
+
+        Args:
+            programa_id: ID del programa
+            semestre_limite: Si se indica, creditos_hasta_limite solo suma materias hasta ese semestre
+
+        Returns:
+            Diccionario (pensum_id, es_obligatoria) -> {materias, creditos_totales, creditos_hasta_limite}
+        """
+        from api.materia.models.materia import Materia
+
+        hasta_limite = Q(semestre__lte=semestre_limite) if semestre_limite else Q()
+        filas = (
+            Materia.objects
+            .filter(pensum_id__programa_id=programa_id, es_activa=True)
+            .values('pensum_id', 'es_obligatoria')
+            .annotate(
+                materias=Count('pk'),
+                creditos_totales=Coalesce(Sum('creditos'), 0),
+                creditos_hasta_limite=Coalesce(Sum('creditos', filter=hasta_limite), 0),
+            )
+            .order_by()
+        )
+        return {
+            (fila.pop('pensum_id'), fila.pop('es_obligatoria')): fila
+            for fila in filas
+        }
+
+    @staticmethod
+    def _aporte_materia(materia):
+        """(pensum_id, es_obligatoria, creditos, semestre) con que la materia cuenta en los contadores, o None"""
+        if materia is None or not materia.es_activa:
+            return None
+        return (materia.pensum_id_id, materia.es_obligatoria, materia.creditos, materia.semestre)
+
+    def actualizar_contadores(self, anterior=None, actual=None):
+        """
+        Aplica a los contadores de los pensums el cambio de una materia: resta lo que aportaba
+        antes y suma lo que aporta ahora (puede cambiar de pensum). Los contadores numéricos se
+        incrementan con F() en la BD; el vector por semestre, que no se puede incrementar así,
+        se reescribe con la fila del pensum bloqueada. Debe llamarse dentro de la transacción
+        que guarda la materia.
+
+        Args:
+            anterior: Materia como estaba antes del cambio (None si es nueva)
+            actual: Materia como quedó (None si se eliminó)
+        """
+        antes = self._aporte_materia(anterior)
+        despues = self._aporte_materia(actual)
+        if antes == despues:
+            return
+        for aporte, signo in ((antes, -1), (despues, 1)):
+            if aporte is None:
+                continue
+            pensum_id, es_obligatoria, creditos, semestre = aporte
+            if not es_obligatoria:
+                Pensum.objects.filter(pk=pensum_id).update(
+                    contador_materias_electivas=F('contador_materias_electivas') + signo,
+                    contador_creditos_electivas=F('contador_creditos_electivas') + signo * creditos,
+                )
+                continue
+            por_semestre = (
+                Pensum.objects.select_for_update()
+                .values_list('contador_creditos_por_semestre', flat=True)
+                .get(pk=pensum_id)
+            )
+            por_semestre = dict(por_semestre)
+            por_semestre[str(semestre)] = por_semestre.get(str(semestre), 0) + signo * creditos
+            Pensum.objects.filter(pk=pensum_id).update(
+                contador_materias_obligatorias=F('contador_materias_obligatorias') + signo,
+                contador_creditos_obligatorios=F('contador_creditos_obligatorios') + signo * creditos,
+                contador_creditos_por_semestre=self._vector_semestres(por_semestre),
+            )
+
+    @staticmethod
+    def _vector_semestres(por_semestre):
+        """Vector por semestre ordenado y sin semestres en cero"""
+        return {
+            semestre: creditos
+            for semestre, creditos in sorted(por_semestre.items(), key=lambda item: int(item[0]))
+            if creditos
+        }
+
+    def calcular_contadores(self, pensum_ids=None):
+        """
+        Contadores de los pensums calculados desde sus materias, con una sola consulta agrupada
+        por pensum, obligatoriedad y semestre.
+
+        Args:
+            pensum_ids: Pensums a calcular (por defecto todos)
+
+        Returns:
+            Diccionario pensum_id -> {campo del contador: valor}
+        """
+        from api.materia.models.materia import Materia
+
+        pensums = Pensum.objects.all()
+        materias = Materia.objects.filter(es_activa=True)
+        if pensum_ids is not None:
+            pensums = pensums.filter(pk__in=pensum_ids)
+            materias = materias.filter(pensum_id__in=pensum_ids)
+
+        contadores = {
+            pensum_id: {
+                'contador_creditos_obligatorios': 0,
+                'contador_creditos_por_semestre': {},
+                'contador_materias_obligatorias': 0,
+                'contador_materias_electivas': 0,
+                'contador_creditos_electivas': 0,
+            }
+            for pensum_id in pensums.values_list('pk', flat=True)
+        }
+        filas = (
+            materias.values_list('pensum_id', 'es_obligatoria', 'semestre')
+            .annotate(materias=Count('pk'), creditos_totales=Coalesce(Sum('creditos'), 0))
+            .order_by()
+        )
+        for pensum_id, es_obligatoria, semestre, total_materias, creditos in filas:
+            contador = contadores[pensum_id]
+            if es_obligatoria:
+                contador['contador_materias_obligatorias'] += total_materias
+                contador['contador_creditos_obligatorios'] += creditos
+                contador['contador_creditos_por_semestre'][str(semestre)] = creditos
+            else:
+                contador['contador_materias_electivas'] += total_materias
+                contador['contador_creditos_electivas'] += creditos
+        for contador in contadores.values():
+            contador['contador_creditos_por_semestre'] = self._vector_semestres(contador['contador_creditos_por_semestre'])
+        return contadores
+
+    @transaction.atomic
+    def recalcular_contadores(self, pensum_ids=None, guardar=True):
+        """
+        Compara los contadores guardados con los calculados desde las materias y, si guardar es
+        True, corrige los que difieren.
+
+        Returns:
+            Diccionario pensum_id -> {campo: (valor guardado, valor calculado)} de los pensums
+            con contadores distintos
+        """
+        calculados = self.calcular_contadores(pensum_ids)
+        campos = list(next(iter(calculados.values()), {}))
+        guardados = Pensum.objects.filter(pk__in=list(calculados)).select_for_update()
+        diferencias = {}
+        corregidos = []
+        for pensum in guardados.only('pk', *campos):
+            distintos = {
+                campo: (getattr(pensum, campo), valor)
+                for campo, valor in calculados[pensum.pk].items()
+                if getattr(pensum, campo) != valor
+            }
+            if distintos:
+                diferencias[pensum.pk] = distintos
+                for campo, (_, valor) in distintos.items():
+                    setattr(pensum, campo, valor)
+                corregidos.append(pensum)
+        if guardar and corregidos:
+            Pensum.objects.bulk_update(corregidos, campos)
+        return diferencias
+
     def get_by_id(self, pensum_id):
         try:
             return Pensum.objects.get(pk=pensum_id)
         except ObjectDoesNotExist:
             return None
 
+    def get_by_id_with_programa(self, pensum_id):
+        """Pensum por ID con su programa y el semestre límite anotado (ver with_programa)"""
+        return self.with_programa(Pensum.objects.filter(pk=pensum_id)).first()
+
     def get_by_programa(self, programa_id):
         """Obtener pensums por programa"""
         return Pensum.objects.filter(programa_id__pk=programa_id).order_by('-anio_creacion')
@@ -55,13 +240,14 @@ class PensumRepository:
         
         for key, value in fields.items():
             setattr(pensum_obj, key, value)
-        pensum_obj.save()
+        # Los contadores no se guardan desde la instancia: los mantiene actualizar_contadores
+        pensum_obj.save(update_fields=[campo for campo in fields if not campo.startswith('contador_')])
         return pensum_obj
 
     def delete(self, pensum_obj):
         """Desactivación lógica"""
         pensum_obj.es_activo = False
-        pensum_obj.save()
+        pensum_obj.save(update_fields=['es_activo'])
         return True
 
     def get_active(self):
@@ -3,7 +3,8 @@ from api.pensum.models.pensum import Pensum
 from api.programa.models.programa import Programa
 
 class PensumSerializer(serializers.ModelSerializer):
-    programa_id = serializers.PrimaryKeyRelatedField(read_only=True, source='programa_id')
+    programa_id = serializers.PrimaryKeyRelatedField(read_only=True)
+    # Contadores del pensum; con un queryset de PensumRepository.with_programa() no hay consultas extra
     creditos_obligatorios_totales = serializers.ReadOnlyField()
     total_materias_obligatorias = serializers.ReadOnlyField()
     total_materias_electivas = serializers.ReadOnlyField()
@@ -35,6 +36,7 @@ class PensumCreateUpdateSerializer(serializers.Serializer):
 class PensumDetailSerializer(serializers.ModelSerializer):
     """Serializer más detallado para consultas específicas"""
     programa_nombre = serializers.CharField(source='programa_id.nombre_programa', read_only=True)
+    # Contadores del pensum; con un queryset de PensumRepository.with_programa() no hay consultas extra
     creditos_obligatorios_totales = serializers.ReadOnlyField()
     total_materias_obligatorias = serializers.ReadOnlyField()
     total_materias_electivas = serializers.ReadOnlyField()
@@ -20,7 +20,7 @@ class PensumService:
         except Programa.DoesNotExist:
             return False, {'error': 'Programa no encontrado'}
         
-        pensums = self.repo.get_by_programa(programa_id)
+        pensums = self.repo.with_programa(self.repo.get_by_programa(programa_id))
         data = PensumSerializer(pensums, many=True).data
         return True, {
             'programa_id': programa_id,
@@ -42,7 +42,7 @@ class PensumService:
         except Programa.DoesNotExist:
             return False, {'error': 'Programa no encontrado'}
         
-        pensums = self.repo.get_active_by_programa(programa_id)
+        pensums = self.repo.with_programa(self.repo.get_active_by_programa(programa_id))
         data = PensumSerializer(pensums, many=True).data
         return True, {
             'programa_id': programa_id,
@@ -64,7 +64,7 @@ class PensumService:
         except Programa.DoesNotExist:
             return False, {'error': 'Programa no encontrado'}
         
-        pensum_actual = self.repo.get_current_by_programa(programa_id)
+        pensum_actual = self.repo.with_programa(self.repo.get_active_by_programa(programa_id)).first()
         if not pensum_actual:
             return False, {'error': f'No hay pensum activo para el programa {programa.nombre_programa}'}
         
@@ -76,19 +76,19 @@ class PensumService:
 
     def obtener_todos_pensums(self):
         """DEPRECATED: Usar obtener_pensums_por_programa en su lugar"""
-        objs = self.repo.get_all()
+        objs = self.repo.with_programa(self.repo.get_all())
         data = PensumSerializer(objs, many=True).data
         return True, data
 
     def obtener_pensum_por_id(self, pensum_id):
-        obj = self.repo.get_by_id(pensum_id)
+        obj = self.repo.get_by_id_with_programa(pensum_id)
         if not obj:
             return False, {'error': 'Pensum no encontrado'}
         return True, PensumDetailSerializer(obj).data
 
     def obtener_estadisticas_pensum(self, pensum_id):
-        """Obtiene estadísticas detalladas del pensum"""
-        obj = self.repo.get_by_id(pensum_id)
+        """Obtiene estadísticas detalladas del pensum (desde sus contadores, en una sola consulta)"""
+        obj = self.repo.get_by_id_with_programa(pensum_id)
         if not obj:
             return False, {'error': 'Pensum no encontrado'}
         
@@ -173,7 +173,7 @@ class PensumService:
 
     def obtener_pensums_activos(self):
         """DEPRECATED: Usar obtener_pensums_activos_por_programa en su lugar"""
-        objs = self.repo.get_active()
+        objs = self.repo.with_programa(self.repo.get_active())
         data = PensumSerializer(objs, many=True).data
         return True, data
 
@@ -182,7 +182,12 @@ class PensumService:
         return self.obtener_pensums_por_programa(programa_id)
 
     def obtener_resumen_creditos_por_programa(self, programa_id):
-        """Obtiene un resumen de créditos de todos los pensums de un programa"""
+        """
+        Obtiene un resumen de créditos de todos los pensums de un programa.
+        Los totales salen de una sola consulta agrupada sobre las materias del programa.
+        """
+        from api.configuracion.services.cache_configuracion import obtener_config_activa
+
         try:
             int(programa_id)
         except (TypeError, ValueError):
@@ -194,19 +199,26 @@ class PensumService:
         except Programa.DoesNotExist:
             return False, {'error': 'Programa no encontrado'}
             
-        pensums = self.repo.filter_by_programa(programa_id)
-        resumen = []
+        # Semestre límite de la configuración activa (desde la caché de configuraciones)
+        config = obtener_config_activa(programa.programa_id) or {}
+        totales = self.repo.get_resumen_materias_por_programa(
+            programa_id, config.get('semestre_limite_electivas')
+        )
+        vacio = {'materias': 0, 'creditos_totales': 0, 'creditos_hasta_limite': 0}
         
-        for pensum in pensums:
+        resumen = []
+        for pensum in self.repo.filter_by_programa(programa_id).values('pensum_id', 'anio_creacion', 'es_activo'):
+            obligatorias = totales.get((pensum['pensum_id'], True), vacio)
+            electivas = totales.get((pensum['pensum_id'], False), vacio)
             resumen.append({
-                'pensum_id': pensum.pensum_id,
-                'anio_creacion': pensum.anio_creacion,
-                'creditos_obligatorios': pensum.creditos_obligatorios_totales,
-                'creditos_electivas': pensum.total_creditos_electivas,
-                'materias_obligatorias': pensum.total_materias_obligatorias,
-                'materias_electivas': pensum.total_materias_electivas,
-                'total_materias': pensum.total_materias_obligatorias + pensum.total_materias_electivas,
-                'es_activo': pensum.es_activo
+                'pensum_id': pensum['pensum_id'],
+                'anio_creacion': pensum['anio_creacion'],
+                'creditos_obligatorios': obligatorias['creditos_hasta_limite'],
+                'creditos_electivas': electivas['creditos_totales'],
+                'materias_obligatorias': obligatorias['materias'],
+                'materias_electivas': electivas['materias'],
+                'total_materias': obligatorias['materias'] + electivas['materias'],
+                'es_activo': pensum['es_activo']
             })
         
         return True, {
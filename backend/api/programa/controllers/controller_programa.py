@@ -4,7 +4,7 @@ from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.response import Response
 from api.programa.services.programa_service import ProgramaService
 import json
-from drf_spectacular.utils import extend_schema
+from drf_spectacular.utils import extend_schema, OpenApiParameter
 
 class ProgramaController:
     """Controller para manejar las peticiones HTTP relacionadas con Programa"""
@@ -15,7 +15,16 @@ class ProgramaController:
 # Instancia global del controller
 programa_controller = ProgramaController()
 
-@extend_schema(tags=['Programa - Público'], summary="Listar todos los programas")
+def _incluir_estadisticas(request):
+    """?estadisticas=true agrega totales de materias del pensum activo y si hay configuración activa"""
+    return request.GET.get('estadisticas', '').lower() in ('1', 'true')
+
+PARAMETRO_ESTADISTICAS = OpenApiParameter(
+    name='estadisticas', type=bool, required=False,
+    description='Incluir total_materias_obligatorias, total_materias_electivas (pensum activo) y tiene_configuracion_activa'
+)
+
+@extend_schema(tags=['Programa - Público'], summary="Listar todos los programas", parameters=[PARAMETRO_ESTADISTICAS])
 @api_view(['GET'])
 @permission_classes([AllowAny])
 def listar_programas(request):
@@ -24,7 +33,7 @@ def listar_programas(request):
     """
     try:
         # Llamar al servicio para obtener programas
-        success, response = programa_controller.service.obtener_todos_programas()
+        success, response = programa_controller.service.obtener_todos_programas(_incluir_estadisticas(request))
         
         if success:
             return Response(response, status=status.HTTP_200_OK)
@@ -37,7 +46,7 @@ def listar_programas(request):
             'details': str(e)
         }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
-@extend_schema(tags=['Programa - Público'], summary="Obtener programa por ID")
+@extend_schema(tags=['Programa - Público'], summary="Obtener programa por ID", parameters=[PARAMETRO_ESTADISTICAS])
 @api_view(['GET'])
 @permission_classes([AllowAny])
 def obtener_programa(request, programa_id):
@@ -46,7 +55,7 @@ def obtener_programa(request, programa_id):
     """
     try:
         # Llamar al servicio para obtener programa
-        success, response = programa_controller.service.obtener_programa_por_id(programa_id)
+        success, response = programa_controller.service.obtener_programa_por_id(programa_id, _incluir_estadisticas(request))
         
         if success:
             return Response(response, status=status.HTTP_200_OK)
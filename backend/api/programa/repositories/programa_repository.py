@@ -1,22 +1,60 @@
 from django.db import models
+from django.db.models import Count, Exists, IntegerField, OuterRef, Subquery
+from django.db.models.functions import Coalesce
 from api.programa.models.programa import Programa
 from typing import List, Dict, Any, Optional, Tuple
 
 class ProgramaRepository:
     """Repository para manejar el acceso a datos de Programa"""
     
-    def obtener_todos(self) -> List[Programa]:
-        """Obtener todos los programas"""
+    def _anotar(self, queryset, incluir_estadisticas: bool = False):
+        """
+        Anota cada programa con pensum_activo_id (subconsulta) y, si se pide, con el total de
+        materias obligatorias y electivas activas de su pensum activo y si tiene configuración
+        de elegibilidad activa (Exists). Todo se resuelve en la misma consulta de programas.
+        """
+        from api.pensum.models.pensum import Pensum
+        
+        pensum_activo = Pensum.objects.filter(programa_id=OuterRef('pk'), es_activo=True).values('pensum_id')[:1]
+        queryset = queryset.annotate(pensum_activo_id=Subquery(pensum_activo))
+        if not incluir_estadisticas:
+            return queryset
+        
+        from api.configuracion.models.configuracion_elegibilidad import ConfiguracionElegibilidad
+        from api.materia.models.materia import Materia
+        
+        def _total_materias(es_obligatoria):
+            total = (
+                Materia.objects
+                .filter(pensum_id__programa_id=OuterRef('pk'), pensum_id__es_activo=True,
+                        es_activa=True, es_obligatoria=es_obligatoria)
+                .order_by()
+                .values('pensum_id__programa_id')
+                .annotate(total=Count('pk'))
+                .values('total')
+            )
+            return Coalesce(Subquery(total, output_field=IntegerField()), 0)
+        
+        return queryset.annotate(
+            total_materias_obligatorias=_total_materias(True),
+            total_materias_electivas=_total_materias(False),
+            tiene_configuracion_activa=Exists(
+                ConfiguracionElegibilidad.objects.filter(programa_id=OuterRef('pk'), es_activo=True)
+            ),
+        )
+    
+    def obtener_todos(self, incluir_estadisticas: bool = False) -> List[Programa]:
+        """Obtener todos los programas (anotados, ver _anotar)"""
         try:
-            return list(Programa.objects.all())
+            return list(self._anotar(Programa.objects.all(), incluir_estadisticas))
         except Exception as e:
             print(f"[REPOSITORY] Error al obtener programas: {e}")
             return []
     
-    def obtener_por_id(self, programa_id: int) -> Optional[Programa]:
-        """Obtener programa por ID"""
+    def obtener_por_id(self, programa_id: int, incluir_estadisticas: bool = False) -> Optional[Programa]:
+        """Obtener programa por ID (anotado, ver _anotar)"""
         try:
-            return Programa.objects.get(programa_id=programa_id)
+            return self._anotar(Programa.objects.all(), incluir_estadisticas).get(programa_id=programa_id)
         except Programa.DoesNotExist:
             return None
         except Exception as e:
@@ -69,7 +107,7 @@ class ProgramaRepository:
     def obtener_activos(self) -> List[Programa]:
         """Obtener solo programas activos"""
         try:
-            return list(Programa.objects.filter(es_activo=True))
+            return list(self._anotar(Programa.objects.filter(es_activo=True)))
         except Exception as e:
             print(f"[REPOSITORY] Error al obtener programas activos: {e}")
             return []
@@ -77,7 +115,7 @@ class ProgramaRepository:
     def buscar_por_nombre(self, nombre: str) -> List[Programa]:
         """Buscar programas por nombre (búsqueda parcial)"""
         try:
-            return list(Programa.objects.filter(nombre_programa__icontains=nombre))
+            return list(self._anotar(Programa.objects.filter(nombre_programa__icontains=nombre)))
         except Exception as e:
             print(f"[REPOSITORY] Error al buscar programas por nombre '{nombre}': {e}")
             return []
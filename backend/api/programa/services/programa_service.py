@@ -9,10 +9,20 @@ class ProgramaService:
     def __init__(self):
         self.repository = ProgramaRepository()
     
-    def obtener_todos_programas(self) -> Tuple[bool, Dict[str, Any]]:
-        """Obtener todos los programas"""
+    @staticmethod
+    def _serializar(programa: Programa) -> Dict[str, Any]:
+        """Datos del programa con su pensum activo y, si vienen anotadas, sus estadísticas"""
+        data = {**ProgramaSerializer(programa).data, 'pensum_activo_id': programa.pensum_activo_id}
+        if hasattr(programa, 'tiene_configuracion_activa'):
+            data['total_materias_obligatorias'] = programa.total_materias_obligatorias
+            data['total_materias_electivas'] = programa.total_materias_electivas
+            data['tiene_configuracion_activa'] = programa.tiene_configuracion_activa
+        return data
+    
+    def obtener_todos_programas(self, incluir_estadisticas: bool = False) -> Tuple[bool, Dict[str, Any]]:
+        """Obtener todos los programas (una sola consulta, ver ProgramaRepository._anotar)"""
         try:
-            programas = self.repository.obtener_todos()
+            programas = self.repository.obtener_todos(incluir_estadisticas)
             
             if not programas:
                 return True, {
@@ -21,17 +31,8 @@ class ProgramaService:
                     'total': 0
                 }
             
-            # importar Pensum de forma local para evitar posibles ciclos
-            from api.pensum.models.pensum import Pensum
-
-            programas_data = []
-            for p in programas:
-                # buscar pensum activo para el programa (puede ser None)
-                pensum_activo_id = Pensum.objects.filter(programa_id=p, es_activo=True).values_list('pensum_id', flat=True).first()
-                programas_data.append({
-                    **ProgramaSerializer(p).data,
-                    'pensum_activo_id': pensum_activo_id
-                })
+            # pensum_activo_id (puede ser None) viene anotado por el repository
+            programas_data = [self._serializar(p) for p in programas]
 
             return True, {
                 'message': 'Programas obtenidos exitosamente',
@@ -45,7 +46,7 @@ class ProgramaService:
                 'details': str(e)
             }
     
-    def obtener_programa_por_id(self, programa_id: int) -> Tuple[bool, Dict[str, Any]]:
+    def obtener_programa_por_id(self, programa_id: int, incluir_estadisticas: bool = False) -> Tuple[bool, Dict[str, Any]]:
         """Obtener programa por ID"""
         try:
             if not programa_id or programa_id <= 0:
@@ -53,20 +54,14 @@ class ProgramaService:
                     'error': 'ID de programa inválido'
                 }
             
-            programa = self.repository.obtener_por_id(programa_id)
+            programa = self.repository.obtener_por_id(programa_id, incluir_estadisticas)
             
             if not programa:
                 return False, {
                     'error': 'Programa no encontrado'
                 }
             
-            # buscar pensum activo
-            from api.pensum.models.pensum import Pensum
-            pensum_activo_id = Pensum.objects.filter(programa_id=programa, es_activo=True).values_list('pensum_id', flat=True).first()
-
-            serializer = ProgramaSerializer(programa)
-            data = serializer.data
-            data['pensum_activo_id'] = pensum_activo_id
+            data = self._serializar(programa)
             return True, {
                 'message': 'Programa obtenido exitosamente',
                 'programa': data
@@ -199,15 +194,7 @@ class ProgramaService:
                     'total': 0
                 }
             
-            from api.pensum.models.pensum import Pensum
-
-            programas_data = []
-            for p in programas:
-                pensum_activo_id = Pensum.objects.filter(programa_id=p, es_activo=True).values_list('pensum_id', flat=True).first()
-                programas_data.append({
-                    **ProgramaSerializer(p).data,
-                    'pensum_activo_id': pensum_activo_id
-                })
+            programas_data = [self._serializar(p) for p in programas]
 
             return True, {
                 'message': 'Programas activos obtenidos exitosamente',
@@ -238,17 +225,8 @@ class ProgramaService:
                     'total': 0
                 }
             
-            from api.pensum.models.pensum import Pensum
-
-            programas_data = []
-            for p in programas:
-                pensum_activo_id = Pensum.objects.filter(programa_id=p, es_activo=True).values_list('pensum_id', flat=True).first()
-                programas_data.append({
-                    **ProgramaSerializer(p).data,
-                    'pensum_activo_id': pensum_activo_id
-                })
+            programas_data = [self._serializar(p) for p in programas]
 
-            serializer = ProgramaSerializer(programas, many=True)  # kept for compatibility if needed
             return True, {
                 'message': f'Programas encontrados para "{nombre}"',
                 'programas': programas_data,
@@ -1,3 +1,1106 @@
-from django.test import TestCase
+import contextlib
+import io
+import zipfile
+from unittest import skipIf, skipUnless
 
-# Create your tests here.
+import pandas as pd
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+
+from api.historias.services.comparadorService import comparar_estudiante, comparar_lote
+from api.historias.services.diagnostico import Traza, explicar_historia
+from api.historias.services.pensum_compilado import CompiledPensum, invalidar_pensums_compilados
+from api.historias.tools.indice_trigramas import IndiceTrigramas
+from api.historias.tools.lector_comprimidos import ComprimidoInvalido, iterar_historias_comprimidas
+from api.historias.tools.lector_historias import HistoriaReader, extraer_codigo_estudiante
+from api.instrumentacion import prometheus_client
+
+
+CONFIG_PRUEBA = {"nota_aprobatoria": 3.0, "semestre_limite_electivas": 3}
+
+
+def _pensum_prueba():
+    return pd.DataFrame({
+        'materia': ['Cálculo I', 'Física I', 'FISH II', 'Cálculo II', 'FISH 1', 'Programación', 'Redes', 'Ética'],
+        'semestre': [1, 1, 2, 2, 3, 3, 4, 5],
+        'créditos': [4, 3, 2, 4, 2, 3, 4, 2],
+    })
+
+
+def _crear_materia(pensum, nombre_materia, semestre, creditos, **datos):
+    """Crea la materia por el repositorio, como la API, para que se actualicen los contadores del pensum."""
+    from api.materia.repositories.materia_repository import MateriaRepository
+
+    exito, materia, mensaje = MateriaRepository().crear({
+        'pensum_id': pensum.pensum_id, 'nombre_materia': nombre_materia,
+        'semestre': semestre, 'creditos': creditos, **datos
+    })
+    assert exito, mensaje
+    return materia
+
+
+def _zip_entrada_danada():
+    """Zip con una historia cuyo contenido no coincide con su CRC."""
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, 'w', compression=zipfile.ZIP_STORED) as comprimido:
+        comprimido.writestr('Historia-Academica-1.csv', 'Materia;Semestre;Definitiva\nCálculo I;1;4.0\n')
+    datos = bytearray(buffer.getvalue())
+    posicion = datos.index(b'Materia;Semestre')
+    datos[posicion] ^= 0xFF
+    return io.BytesIO(bytes(datos))
+
+
+def _historia(filas):
+    return pd.DataFrame(filas, columns=['Materia', 'Semestre', 'Créditos', 'Definitiva', 'Periodo'])
+
+
+class ComparadorLoteTests(SimpleTestCase):
+    """El comparador por lotes debe producir los mismos resultados que el comparador individual."""
+
+    def setUp(self):
+        self.compilado = CompiledPensum(_pensum_prueba(), CONFIG_PRUEBA)
+        self.historias = [
+            ('1001', _historia([
+                ('Calculo I', 1, 4, 2.0, '2020.1'),
+                ('Cálculo I', 1, 4, 3.5, '2020.2'),
+                ('Física I', 1, 3, 4.0, '2020.1'),
+                ('Cálculo II', 2, 4, 3.0, '2020.2'),
+                ('Electiva Fish - I', None, 2, 4.1, '2020.2'),
+                ('Electiva Fish - II', None, 2, 3.2, '2021.1'),
+                ('Programación', 3, 3, 4.5, '2021.1'),
+                ('Ética', 5, 2, 4.0, '2021.2'),
+            ])),
+            ('1002', _historia([
+                ('Cálculo I', 1, 4, 4.0, '2020.1'),
+                ('Física I', 1, 3, 2.9, '2020.1'),
+                ('Electiva Fish - I', None, 2, 3.0, '2020.2'),
+                ('Redes', 4, 4, 3.0, '2021.1'),
+            ])),
+            ('1003', _historia([])),
+        ]
+
+    def test_resultados_equivalentes(self):
+        resultados_lote = comparar_lote(self.historias, self.compilado, config=CONFIG_PRUEBA)
+
+        salida = io.StringIO()
+        with contextlib.redirect_stdout(salida):
+            for (codigo, historia), resultado_lote in zip(self.historias, resultados_lote):
+                resultado = comparar_estudiante(historia.copy(), self.compilado, config=CONFIG_PRUEBA)
+                self.assertEqual({'estudiante': codigo, **resultado}, resultado_lote)
+        # El comparador no escribe en stdout
+        self.assertEqual(salida.getvalue(), '')
+
+    def test_estado_por_estudiante(self):
+        resultados = comparar_lote(self.historias, self.compilado, config=CONFIG_PRUEBA)
+        self.assertEqual([r['estado'] for r in resultados], [1, 0, 0])
+        self.assertEqual(resultados[1]['materias_faltantes_hasta_semestre_limite'],
+                         ['FISICA I', 'FISH II', 'CALCULO II', 'PROGRAMACION'])
+
+
+class DiagnosticoTests(SimpleTestCase):
+    """Modo explain: diagnóstico de la comparación y tiempos por etapa."""
+
+    def test_explicar_historia(self):
+        compilado = CompiledPensum(_pensum_prueba(), CONFIG_PRUEBA)
+        historia = _historia([
+            ('Cálculo I', 1, 4, 4.0, '2020.1'),
+            ('Fisica 1', 1, 3, 4.0, '2020.1'),
+            ('Electiva Fish - I', None, 2, 3.0, '2020.2'),
+        ])
+        diagnostico = explicar_historia(historia, compilado, CONFIG_PRUEBA)
+
+        self.assertIn({'original': 'Cálculo I', 'normalizada': 'CALCULO I'}, diagnostico['materias_normalizadas'])
+        self.assertEqual(diagnostico['fish']['asignacion'],
+                         [{'electiva': 'ELECTIVA FISH - I', 'fish_pensum': 'FISH 1'}])
+        cercanas = {c['materia']: c['candidatas'] for c in diagnostico['coincidencias_cercanas']}
+        self.assertEqual([c['materia'] for c in cercanas['FISICA I']], ['FISICA 1'])
+        self.assertEqual(cercanas['CALCULO II'], [])
+        # La historia no se modifica
+        self.assertEqual(historia['Materia'].iloc[0], 'Cálculo I')
+
+    def test_indice_trigramas(self):
+        indice = IndiceTrigramas(['FISICA I', 'FISICA II', 'CALCULO II', 'PROGRAMACION'])
+        self.assertEqual(indice.buscar('FISICA 1', k=1), [('FISICA I', 0.636)])
+        self.assertEqual([n for n, _ in indice.buscar('PROGRAMACION I')], ['PROGRAMACION'])
+        coincidencias = indice.coincidencias(['CALCULO 2', 'ALGEBRA'], ['CALCULO II', 'FISICA I'])
+        self.assertEqual([n for n, _ in coincidencias['CALCULO II']], ['CALCULO 2'])
+        self.assertEqual(coincidencias['FISICA I'], [])
+
+    def test_traza_por_etapa(self):
+        traza = Traza()
+        comparar_lote([('1001', _historia([('Cálculo I', 1, 4, 4.0, '2020.1')]))],
+                      CompiledPensum(_pensum_prueba(), CONFIG_PRUEBA), config=CONFIG_PRUEBA, traza=traza)
+        self.assertEqual(list(traza.como_dict()),
+                         ['union', 'normalizacion', 'aprobadas', 'creditos', 'resultados'])
+
+
+@override_settings(AUTH_CACHE_TTL=60)
+class CacheTokensTests(SimpleTestCase):
+    """Los tokens validados se reutilizan sin volver a verificarlos, salvo si expiraron o cambiaron."""
+
+    def test_token_reutilizado_hasta_expirar(self):
+        import time
+        import jwt
+        from django.conf import settings
+        from api.usuario.services import cache_usuarios
+
+        token = jwt.encode({'user_id': 7, 'exp': int(time.time()) + 3600}, settings.SECRET_KEY, algorithm='HS256')
+        self.assertEqual(cache_usuarios.decodificar_token(token)['user_id'], 7)
+        self.assertIn(token.rpartition('.')[2], cache_usuarios._tokens)
+        self.assertEqual(cache_usuarios.decodificar_token(token)['user_id'], 7)
+
+        # Mismo sufijo de firma con otro payload: no se acepta desde la caché
+        cabecera, _, firma = token.split('.')
+        otro = jwt.encode({'user_id': 8}, 'otra-clave', algorithm='HS256').split('.')[1]
+        with self.assertRaises(jwt.InvalidTokenError):
+            cache_usuarios.decodificar_token(f'{cabecera}.{otro}.{firma}')
+
+        expirado = jwt.encode({'user_id': 7, 'exp': int(time.time()) - 1}, settings.SECRET_KEY, algorithm='HS256')
+        with self.assertRaises(jwt.ExpiredSignatureError):
+            cache_usuarios.decodificar_token(expirado)
+
+    def test_usuario_invalidado_una_vez_por_escritura(self):
+        import time
+        from django.core.cache import cache
+        from django.db.models.signals import post_save
+        from api.usuario.models.usuario import Usuario
+        from api.usuario.services import cache_usuarios
+
+        usuarios = cache_usuarios._usuarios
+        version = usuarios.version()
+        usuarios._entradas[7] = (version, time.monotonic() + 60, Usuario(usuario_id=7))
+
+        # Fuera de una transacción on_commit se ejecuta de inmediato: la versión sube una sola vez
+        post_save.send(Usuario, instance=Usuario(usuario_id=7), created=False)
+        self.assertNotIn(7, usuarios._entradas)
+        self.assertEqual(cache.get('usuarios:version'), version + 1)
+
+
+class LectorComprimidosTests(SimpleTestCase):
+    """Las historias de un .zip se extraen una a una, ignorando entradas que no son historias."""
+
+    def test_iterar_zip(self):
+        buffer = io.BytesIO()
+        with zipfile.ZipFile(buffer, 'w') as comprimido:
+            comprimido.writestr('export/', '')
+            comprimido.writestr('__MACOSX/export/._Historia-Academica-1.csv', 'x')
+            comprimido.writestr('export/LEEME.txt', 'x')
+            comprimido.writestr('export/Historia-Academica-1046.csv', 'materia;semestre;definitiva')
+            comprimido.writestr('Historia-Academica_2077.xls', b'xls')
+        buffer.seek(0)
+
+        entradas = list(iterar_historias_comprimidas(buffer, 'historias.zip'))
+
+        self.assertEqual([nombre for nombre, _ in entradas],
+                         ['export/Historia-Academica-1046.csv', 'Historia-Academica_2077.xls'])
+        self.assertEqual([extraer_codigo_estudiante(nombre) for nombre, _ in entradas], ['1046', '2077'])
+        self.assertEqual(entradas[0][1], b'materia;semestre;definitiva')
+
+    def test_zip_invalido(self):
+        with self.assertRaises(ComprimidoInvalido):
+            list(iterar_historias_comprimidas(io.BytesIO(b'no es zip'), 'historias.zip'))
+
+    def test_entrada_danada(self):
+        with self.assertRaises(ComprimidoInvalido):
+            list(iterar_historias_comprimidas(_zip_entrada_danada(), 'historias.zip'))
+
+    def test_max_entradas(self):
+        buffer = io.BytesIO()
+        with zipfile.ZipFile(buffer, 'w') as comprimido:
+            for codigo in range(4):
+                comprimido.writestr(f'Historia-Academica-{codigo}.csv', 'materia;semestre;definitiva')
+        buffer.seek(0)
+
+        extraidas = []
+        with self.assertRaises(ComprimidoInvalido):
+            for nombre, _ in iterar_historias_comprimidas(buffer, 'historias.zip', max_entradas=3):
+                extraidas.append(nombre)
+        # La extracción se detiene en la entrada que supera el límite
+        self.assertEqual(len(extraidas), 3)
+
+
+@override_settings(HISTORIAS_CACHE_PARQUET_DIR='', HISTORIAS_CACHE_RESULTADOS=False)
+class ComparadorParaleloTests(SimpleTestCase):
+    """El pool de procesos del worker produce la misma salida que la evaluación en serie."""
+
+    def test_procesos_igual_que_serie(self):
+        from api.historias.services.ejecucion_paralela import ComparadorParalelo, TAMANO_MINIMO_FRAGMENTO, _obtener_pool
+
+        filas = ['Cálculo I;1;4;{}\nFísica I;1;3;3.5\nFISH II;2;2;3.2\nCálculo II;2;4;{}\n',
+                 'Cálculo I;1;4;{}\nProgramación;3;3;{}\n']
+        archivos = [
+            (f'Historia-Academica-{i}.csv',
+             ('Materia;Semestre;Créditos;Definitiva\n' + filas[i % 2].format(2.0 + i % 30 / 10, 3.0 + i % 7 / 10)).encode('utf-8'))
+            for i in range(3 * TAMANO_MINIMO_FRAGMENTO)
+        ]
+        archivos[7] = ('otro.txt', b'sin formato')
+        compilado = CompiledPensum(_pensum_prueba(), CONFIG_PRUEBA)
+
+        with ComparadorParalelo(compilado, CONFIG_PRUEBA, num_procesos=1) as comparador:
+            serie = comparador.comparar(archivos)
+        with ComparadorParalelo(compilado, CONFIG_PRUEBA, num_procesos=2) as comparador:
+            paralelo = comparador.comparar(archivos)
+            por_bloques = [(resultado, error) for _, resultado, error in comparador.iterar(archivos)]
+
+        self.assertEqual(paralelo, serie)
+        self.assertEqual(por_bloques, serie)
+        self.assertIsNotNone(serie[7][1])
+        # El pool sobrevive al comparador y se reutiliza en la siguiente petición
+        self.assertIs(_obtener_pool(2), _obtener_pool(2))
+
+
+@override_settings(HISTORIAS_CACHE_PARQUET_DIR='', HISTORIAS_CACHE_RESULTADOS=True)
+class CacheResultadosTests(SimpleTestCase):
+    """La caché de resultados acierta con el mismo contenido, pensum y configuración, y falla si cambia alguno."""
+
+    def setUp(self):
+        from django.core.cache import cache
+        cache.clear()
+
+    def _comparar(self, pensum, config, archivos):
+        from api.historias.services.ejecucion_paralela import ComparadorParalelo
+
+        with ComparadorParalelo(pensum, config, num_procesos=1) as comparador:
+            salida = comparador.comparar(archivos)
+        return salida, (comparador.aciertos, comparador.fallos)
+
+    def test_aciertos_y_fallos(self):
+        from api.historias.services.cache_resultados import clave_resultado
+
+        contenido = 'Materia;Semestre;Créditos;Definitiva\nCálculo I;1;4;3.1\nFísica I;1;3;2.5\n'.encode('utf-8')
+        pensum = CompiledPensum(_pensum_prueba(), CONFIG_PRUEBA)
+        primera, consultas = self._comparar(pensum, CONFIG_PRUEBA, [('Historia-Academica-1.csv', contenido)])
+        self.assertEqual(consultas, (0, 1))
+
+        # Mismo contenido con otro nombre, pensum de la misma versión y misma configuración: acierta
+        # y el código del estudiante se toma del nombre del archivo
+        pensum_igual = CompiledPensum(_pensum_prueba(), dict(CONFIG_PRUEBA))
+        segunda, consultas = self._comparar(pensum_igual, CONFIG_PRUEBA, [('Historia-Academica-2.csv', contenido)])
+        self.assertEqual(consultas, (1, 0))
+        self.assertEqual(segunda[0][0], {**primera[0][0], 'estudiante': '2'})
+
+        # Otra configuración: falla
+        config = {**CONFIG_PRUEBA, 'nota_aprobatoria': 3.2}
+        _, consultas = self._comparar(CompiledPensum(_pensum_prueba(), config), config, [('Historia-Academica-1.csv', contenido)])
+        self.assertEqual(consultas, (0, 1))
+
+        # Otra versión del pensum compilado (una materia más): falla
+        materias = pd.concat([_pensum_prueba(), pd.DataFrame({'materia': ['Cálculo III'], 'semestre': [3], 'créditos': [4]})])
+        pensum_nuevo = CompiledPensum(materias, CONFIG_PRUEBA)
+        self.assertNotEqual(pensum_nuevo.version, pensum.version)
+        self.assertNotEqual(clave_resultado(contenido, pensum_nuevo), clave_resultado(contenido, pensum))
+        _, consultas = self._comparar(pensum_nuevo, CONFIG_PRUEBA, [('Historia-Academica-1.csv', contenido)])
+        self.assertEqual(consultas, (0, 1))
+
+    @override_settings(HISTORIAS_CACHE_RESULTADOS=False)
+    def test_deshabilitada(self):
+        contenido = 'Materia;Semestre;Definitiva\nCálculo I;1;4.0\n'.encode('utf-8')
+        pensum = CompiledPensum(_pensum_prueba(), CONFIG_PRUEBA)
+        self._comparar(pensum, CONFIG_PRUEBA, [('Historia-Academica-1.csv', contenido)])
+        _, consultas = self._comparar(pensum, CONFIG_PRUEBA, [('Historia-Academica-1.csv', contenido)])
+        self.assertEqual(consultas, (0, 0))
+
+
+class CacheHistoriasTests(SimpleTestCase):
+    """La caché en disco de historias acierta por contenido y versión del lector, se recupera de archivos dañados y respeta sus límites."""
+
+    CONTENIDO = 'Materia;Semestre;Créditos;Definitiva\nCálculo I;1;4;3.1\nFísica I;1;3;2.5\n'.encode('utf-8')
+
+    def setUp(self):
+        import tempfile
+        from api.historias.tools import cache_historias
+
+        if cache_historias.pyarrow is None:
+            self.skipTest('pyarrow no está instalado')
+        directorio = tempfile.TemporaryDirectory()
+        self.addCleanup(directorio.cleanup)
+        self.directorio = directorio.name
+        ajustes = override_settings(HISTORIAS_CACHE_PARQUET_DIR=self.directorio)
+        ajustes.enable()
+        self.addCleanup(ajustes.disable)
+
+    def _leer(self):
+        from unittest import mock
+        from api.historias.tools import cache_historias
+
+        with mock.patch.object(cache_historias, 'leer_archivo_historia', wraps=cache_historias.leer_archivo_historia) as lector:
+            historia = cache_historias.leer_historia_cacheada(self.CONTENIDO, 'Historia-Academica-1.csv')
+        return historia, lector.call_count
+
+    def test_acierto_fallo_y_archivo_danado(self):
+        import hashlib
+        from unittest import mock
+        from api.historias.tools import cache_historias
+
+        esperada = HistoriaReader().leer(io.BytesIO(self.CONTENIDO), 'Historia-Academica-1.csv')
+        historia, lecturas = self._leer()
+        self.assertEqual(lecturas, 1)
+        historia, lecturas = self._leer()
+        self.assertEqual(lecturas, 0)
+        pd.testing.assert_frame_equal(historia, esperada)
+
+        # Archivo dañado: se lee el original y se reemplaza la entrada
+        ruta = cache_historias._ruta_historia(hashlib.sha256(self.CONTENIDO).hexdigest())
+        with open(ruta, 'wb') as archivo:
+            archivo.write(b'no es parquet')
+        historia, lecturas = self._leer()
+        self.assertEqual(lecturas, 1)
+        pd.testing.assert_frame_equal(historia, esperada)
+        self.assertEqual(self._leer()[1], 0)
+
+        # Otra versión del lector no reutiliza lo guardado
+        with mock.patch.object(cache_historias, 'VERSION_LECTOR', cache_historias.VERSION_LECTOR + 1):
+            self.assertEqual(self._leer()[1], 1)
+
+    def test_purga_por_version_antiguedad_y_tamano(self):
+        import os
+        import time
+        from api.historias.tools import cache_historias
+
+        antigua = os.path.join(self.directorio, 'v0', 'ab')
+        os.makedirs(antigua)
+        open(os.path.join(antigua, 'ab.parquet'), 'wb').close()
+        rutas = []
+        for posicion in range(3):
+            ruta = cache_historias._ruta_historia(f'{posicion:02d}' + 'f' * 62)
+            os.makedirs(os.path.dirname(ruta), exist_ok=True)
+            with open(ruta, 'wb') as archivo:
+                archivo.write(b'x' * 600 * 1024)
+            # La primera sin usar hace 60 días; las demás por orden de uso
+            hace = 60 * 24 * 60 * 60 if posicion == 0 else 10 - posicion
+            os.utime(ruta, (time.time() - hace, time.time() - hace))
+            rutas.append(ruta)
+
+        with override_settings(HISTORIAS_CACHE_PARQUET_MAX_DIAS=30, HISTORIAS_CACHE_PARQUET_MAX_MB=1):
+            self.assertEqual(cache_historias.purgar_cache_historias(), 2)
+        self.assertFalse(os.path.exists(os.path.join(self.directorio, 'v0')))
+        self.assertEqual([os.path.exists(ruta) for ruta in rutas], [False, False, True])
+
+
+class HistoriaReaderTests(SimpleTestCase):
+    """El lector detecta delimitador y codificación y proyecta las columnas del comparador."""
+
+    def test_csv_coma_utf8(self):
+        contenido = 'Materia,Semestre,Nota,Definitiva,Periodo\nÉtica,1,2.0,3.1,2020.1\n'.encode('utf-8')
+        historia = HistoriaReader(motor_csv='c').leer(io.BytesIO(contenido), 'historia.csv')
+
+        self.assertEqual(list(historia.columns), ['materia', 'semestre', 'definitiva', 'periodo'])
+        self.assertEqual(historia.loc[0, 'materia'], 'Ética')
+        self.assertEqual(str(historia['definitiva'].dtype), 'float32')
+
+    def test_csv_punto_y_coma_latin1(self):
+        contenido = 'Materia;Semestre;Definitiva\nCálculo I;1;3,5\n'.encode('latin-1')
+        historia = HistoriaReader(motor_csv='c').leer(io.BytesIO(contenido), 'historia.csv')
+
+        self.assertEqual(historia.loc[0, 'materia'], 'Cálculo I')
+        self.assertAlmostEqual(float(historia.loc[0, 'definitiva']), 3.5)
+
+    def test_nota_float32_alcanza_nota_aprobatoria(self):
+        contenido = 'Materia;Semestre;Definitiva\nCálculo I;1;3.1\n'.encode('latin-1')
+        historia = HistoriaReader(motor_csv='c').leer(io.BytesIO(contenido), 'Historia-Academica-9.csv')
+        config = {"nota_aprobatoria": 3.1, "semestre_limite_electivas": 1}
+        compilado = CompiledPensum(_pensum_prueba(), config)
+
+        resultado = comparar_lote([('9', historia)], compilado, config=config)[0]
+
+        self.assertEqual(resultado['materias_faltantes_hasta_semestre_limite'], ['FISICA I'])
+
+
+@override_settings(HISTORIAS_CACHE_PARQUET_DIR='', HISTORIAS_CACHE_RESULTADOS=False)
+class ProgramaPruebaTestCase(TestCase):
+    """
+    Base de las pruebas con BD: un programa con el pensum de prueba activo y su configuración,
+    y un cliente autenticado con JWT.
+    """
+
+    def setUp(self):
+        import time
+        import jwt
+        from unittest import mock
+        from django.conf import settings
+        from api.configuracion.models.configuracion_elegibilidad import ConfiguracionElegibilidad
+        from api.pensum.models.pensum import Pensum
+        from api.programa.models.programa import Programa
+        from api.usuario.models.usuario import Usuario
+
+        token = jwt.encode({'user_id': 1, 'exp': int(time.time()) + 3600}, settings.SECRET_KEY, algorithm='HS256')
+        self.client.defaults['HTTP_AUTHORIZATION'] = f'Bearer {token}'
+        # Las migraciones no crean todas las columnas de la tabla usuario: el usuario del token no se lee de la BD
+        usuario = mock.patch('api.middleware.auth_middleware.obtener_usuario_activo',
+                             return_value=Usuario(usuario_id=1, nombre_usuario='prueba'))
+        usuario.start()
+        self.addCleanup(usuario.stop)
+
+        self.programa = Programa.objects.create(nombre_programa='Ingeniería de Sistemas')
+        self.pensum = pensum = Pensum.objects.create(programa_id=self.programa, anio_creacion=2020)
+        for _, fila in _pensum_prueba().iterrows():
+            _crear_materia(pensum, fila['materia'], int(fila['semestre']), int(fila['créditos']))
+        ConfiguracionElegibilidad.objects.create(programa_id=self.programa, **CONFIG_PRUEBA)
+
+
+class AutenticacionHistoriasTests(ProgramaPruebaTestCase):
+    """Solo la verificación de elegibilidad es pública; el resto de /api/historias/ requiere JWT."""
+
+    def test_anonimo_recibe_401(self):
+        from django.test import Client
+
+        def datos():
+            historia = SimpleUploadedFile('Historia-Academica-1.csv', 'Materia;Semestre;Definitiva\nCálculo I;1;4.0\n'.encode('utf-8'))
+            return {'programa_id': self.programa.programa_id, 'historias': [historia]}
+
+        anonimo = Client()
+        rutas = [
+            ('get', '/api/historias/estudiantes/', {'programa_id': self.programa.programa_id}),
+            ('post', '/api/historias/estudiantes/ingestar/', datos()),
+            ('post', '/api/historias/jobs/', datos()),
+            ('get', '/api/historias/jobs/1/', {}),
+            ('post', '/api/historias/simular/', datos()),
+            ('get', '/api/historias/cache/', {}),
+        ]
+        for metodo, ruta, parametros in rutas:
+            respuesta = getattr(anonimo, metodo)(ruta, parametros)
+            self.assertEqual(respuesta.status_code, 401, ruta)
+            self.assertEqual(respuesta.json()['code'], 'AUTHENTICATION_REQUIRED')
+
+        self.assertEqual(anonimo.post('/api/historias/verificar/masiva/', datos()).status_code, 200)
+        self.assertEqual(self.client.get('/api/historias/estudiantes/', {'programa_id': self.programa.programa_id}).status_code, 200)
+
+
+class ContextoEvaluacionTests(ProgramaPruebaTestCase):
+    """La verificación masiva resuelve programa, pensum y configuración una vez por petición."""
+
+    def _consultas_verificacion_masiva(self, cantidad):
+        from api.configuracion.services.cache_configuracion import invalidar_configuraciones
+
+        invalidar_pensums_compilados()
+        invalidar_configuraciones()
+        historias = [
+            SimpleUploadedFile(f'Historia-Academica-{i}.csv',
+                               f'Materia;Semestre;Definitiva\nCálculo I;1;{3 + i % 2}.0\n'.encode('utf-8'))
+            for i in range(cantidad)
+        ]
+        with CaptureQueriesContext(connection) as consultas:
+            respuesta = self.client.post('/api/historias/verificar/masiva/', {
+                'programa_id': self.programa.programa_id,
+                'historias': historias,
+            })
+        self.assertEqual(respuesta.status_code, 200)
+        self.assertEqual(respuesta.json()['total_estudiantes'], cantidad)
+        return len(consultas)
+
+    def test_consultas_constantes_por_cantidad_de_archivos(self):
+        self.assertEqual(self._consultas_verificacion_masiva(1), self._consultas_verificacion_masiva(20))
+
+
+class VerificacionStreamingTests(ProgramaPruebaTestCase):
+    """La verificación masiva en streaming responde NDJSON: una línea por estudiante y el resumen al final."""
+
+    def test_respuesta_ndjson(self):
+        import json
+
+        encabezado = 'Materia;Semestre;Créditos;Definitiva\n'
+        historias = [
+            SimpleUploadedFile('Historia-Academica-1.csv', (encabezado + 'Cálculo I;1;4;4.0\nFísica I;1;3;3.5\nFISH II;2;2;3.2\n'
+                                                            'Cálculo II;2;4;3.5\nFISH 1;3;2;4.0\nProgramación;3;3;4.0\n').encode('utf-8')),
+            SimpleUploadedFile('otro.txt', b'sin formato'),
+            SimpleUploadedFile('Historia-Academica-2.csv', (encabezado + 'Cálculo I;1;4;2.0\n').encode('utf-8')),
+        ]
+        respuesta = self.client.post('/api/historias/verificar/masiva/?stream=1', {
+            'programa_id': self.programa.programa_id,
+            'historias': historias,
+        })
+        self.assertEqual(respuesta.status_code, 200)
+        self.assertTrue(respuesta.streaming)
+        self.assertEqual(respuesta['Content-Type'], 'application/x-ndjson')
+
+        contenido = b''.join(respuesta.streaming_content).decode('utf-8')
+        self.assertTrue(contenido.endswith('\n'))
+        lineas = [json.loads(linea) for linea in contenido.splitlines()]
+        self.assertEqual([(l['estudiante'], l['estado']) for l in lineas[:-1]], [('1', 1), ('2', 0)])
+
+        resumen = lineas[-1]['resumen']
+        self.assertEqual((resumen['total_estudiantes'], resumen['elegibles'], resumen['no_elegibles']), (2, 1, 1))
+        self.assertEqual([e['archivo'] for e in resumen['archivos_con_error']], ['otro.txt'])
+        self.assertIn('warning', resumen)
+
+        # También se activa con Accept: application/x-ndjson
+        historias = [SimpleUploadedFile('Historia-Academica-2.csv', (encabezado + 'Cálculo I;1;4;2.0\n').encode('utf-8'))]
+        respuesta = self.client.post('/api/historias/verificar/masiva/', {
+            'programa_id': self.programa.programa_id, 'historias': historias,
+        }, HTTP_ACCEPT='application/x-ndjson')
+        lineas = b''.join(respuesta.streaming_content).decode('utf-8').splitlines()
+        self.assertEqual(json.loads(lineas[-1])['resumen']['total_estudiantes'], 1)
+
+
+class VerificacionComprimidoTests(ProgramaPruebaTestCase):
+    """La verificación masiva con comprimido aplica el límite de archivos y solo reporta como inválido al comprimido."""
+
+    def _zip(self, cantidad):
+        buffer = io.BytesIO()
+        with zipfile.ZipFile(buffer, 'w') as comprimido:
+            for codigo in range(cantidad):
+                comprimido.writestr(f'Historia-Academica-{codigo}.csv', 'Materia;Semestre;Definitiva\nCálculo I;1;4.0\n')
+        return SimpleUploadedFile('historias.zip', buffer.getvalue())
+
+    def _verificar(self, comprimido):
+        return self.client.post('/api/historias/verificar/masiva/', {
+            'programa_id': self.programa.programa_id, 'comprimido': comprimido,
+        })
+
+    def test_limite_de_entradas(self):
+        from api.historias.controllers.comparadorController import MAX_FILES_MASIVA
+
+        self.assertEqual(self._verificar(self._zip(MAX_FILES_MASIVA)).json()['total_estudiantes'], MAX_FILES_MASIVA)
+        respuesta = self._verificar(self._zip(MAX_FILES_MASIVA + 1))
+        self.assertEqual(respuesta.status_code, 400)
+        self.assertEqual(respuesta.json()['error'], 'Archivo comprimido inválido')
+        self.assertEqual(self._verificar(SimpleUploadedFile('historias.zip', b'no es zip')).status_code, 400)
+
+    def test_entrada_danada(self):
+        respuesta = self._verificar(SimpleUploadedFile('historias.zip', _zip_entrada_danada().getvalue()))
+        self.assertEqual(respuesta.status_code, 400)
+        self.assertEqual(respuesta.json()['error'], 'Archivo comprimido inválido')
+
+    def test_error_de_comparacion_no_es_comprimido_invalido(self):
+        from unittest import mock
+
+        with mock.patch('api.historias.services.ejecucion_paralela.comparar_lote', side_effect=ValueError('fallo')):
+            respuesta = self._verificar(self._zip(2))
+        self.assertEqual(respuesta.status_code, 500)
+        self.assertEqual(respuesta.json()['error'], 'Error al procesar la solicitud masiva')
+
+
+class PensumCompiladoCacheTests(ProgramaPruebaTestCase):
+    """Los pensums compilados en caché se descartan cuando otro worker incrementa la versión o expiran."""
+
+    def test_version_incrementada_por_otro_proceso(self):
+        import time
+        from unittest import mock
+        from django.core.cache import cache
+        from api.historias.services.contexto_evaluacion import EvaluationContext
+        from api.materia.models.materia import Materia
+
+        programa_id = self.programa.programa_id
+        invalidar_pensums_compilados()
+        compilado = EvaluationContext.resolver(programa_id).compilado
+        self.assertIs(EvaluationContext.resolver(programa_id).compilado, compilado)
+
+        # La versión compartida se incrementa al confirmar, no dentro de la transacción
+        version = cache.get('pensum_compilado:version')
+        materia = Materia.objects.get(pensum_id=self.pensum, nombre_materia='Redes')
+        materia.creditos = 5
+        with self.captureOnCommitCallbacks() as callbacks:
+            materia.save()
+        self.assertEqual(cache.get('pensum_compilado:version'), version)
+        for callback in callbacks:
+            callback()
+        self.assertGreater(cache.get('pensum_compilado:version'), version)
+
+        # Otro worker edita el pensum: en este proceso solo cambia la versión compartida
+        compilado = EvaluationContext.resolver(programa_id).compilado
+        Materia.objects.filter(pk=materia.pk).update(semestre=2)
+        cache.incr('pensum_compilado:version')
+        recompilado = EvaluationContext.resolver(programa_id).compilado
+        self.assertIsNot(recompilado, compilado)
+        self.assertNotEqual(recompilado.version, compilado.version)
+        self.assertIn('REDES', recompilado.materias_requeridas)
+
+        # Sin cambio de versión, la entrada expira por TTL
+        expirado = time.monotonic() + 3600
+        with mock.patch('api.cache_versionada.time.monotonic', return_value=expirado):
+            self.assertIsNot(EvaluationContext.resolver(programa_id).compilado, recompilado)
+
+
+class MateriaAliasTests(ProgramaPruebaTestCase):
+    """Los alias de materias importados se aplican en el comparador."""
+
+    def test_alias_importados_se_aplican(self):
+        from api.historias.services.contexto_evaluacion import EvaluationContext
+        from api.materia.services.materia_alias_service import MateriaAliasService
+
+        invalidar_pensums_compilados()
+        version_anterior = EvaluationContext.resolver(self.programa.programa_id).compilado.version
+        with self.captureOnCommitCallbacks(execute=True):
+            exito, respuesta = MateriaAliasService().importar_alias({
+                'pensum_id': self.pensum.pensum_id,
+                'alias': [
+                    {'materia': 'Física I', 'alias': 'Física Mecánica'},
+                    {'materia': 'fisica i', 'alias': 'FISICA MECANICA'},
+                    {'materia': 'Química', 'alias': 'Química General'},
+                ],
+            })
+        self.assertTrue(exito)
+        self.assertEqual((respuesta['creados'], respuesta['omitidos'], len(respuesta['errores'])), (1, 1, 1))
+
+        contexto = EvaluationContext.resolver(self.programa.programa_id)
+        self.assertNotEqual(contexto.compilado.version, version_anterior)
+        historia = _historia([
+            ('Cálculo I', 1, 4, 4.0, '2020.1'),
+            ('Fisica Mecanica', 1, 3, 4.0, '2020.1'),
+        ])
+        resultado_lote = comparar_lote([('1', historia)], contexto)[0]
+        resultado = comparar_estudiante(historia.copy(), contexto)
+        self.assertNotIn('FISICA I', resultado_lote['materias_faltantes_hasta_semestre_limite'])
+        self.assertEqual({'estudiante': '1', **resultado}, resultado_lote)
+
+
+class IngestaHistoriasTests(ProgramaPruebaTestCase):
+    """Ingesta de historias de estudiantes: inserta, actualiza y omite las que no cambiaron."""
+
+    def test_ingesta_historias(self):
+        from api.historias.models.estudiante import Estudiante, RegistroHistoria
+
+        def _subir(contenidos):
+            archivos = [SimpleUploadedFile(f'Historia-Academica-{codigo}.csv', contenido.encode('utf-8'))
+                        for codigo, contenido in contenidos.items()]
+            respuesta = self.client.post('/api/historias/estudiantes/ingestar/', {
+                'programa_id': self.programa.programa_id,
+                'historias': archivos,
+            })
+            self.assertEqual(respuesta.status_code, 200)
+            return respuesta.json()
+
+        encabezado = 'Materia;Semestre;Créditos;Definitiva;Periodo\n'
+        resumen = _subir({
+            '1': encabezado + 'Cálculo I;1;4;3.1;2020.1\nFísica I;1;3;2.5;2020.1\n',
+            '2': encabezado + 'Cálculo I;1;4;4.0;2020.1\n',
+        })
+        self.assertEqual((resumen['estudiantes_creados'], resumen['registros_creados']), (2, 3))
+
+        resumen = _subir({
+            '1': encabezado + 'Cálculo I;1;4;3.1;2020.1\nFísica I;1;3;2.5;2020.1\n',
+            '2': encabezado + 'Cálculo I;1;4;4.0;2020.1\nFísica I;1;3;3.5;2020.2\n',
+        })
+        self.assertEqual((resumen['estudiantes_sin_cambios'], resumen['estudiantes_actualizados'],
+                          resumen['registros_creados']), (1, 1, 2))
+
+        estudiante = Estudiante.objects.get(programa_id=self.programa, codigo='1')
+        registro = RegistroHistoria.objects.get(estudiante=estudiante, materia_normalizada='CALCULO I')
+        self.assertEqual((registro.materia, registro.definitiva, registro.periodo), ('Cálculo I', 3.1, '2020.1'))
+        self.assertEqual(RegistroHistoria.objects.count(), 4)
+
+    def test_periodo_largo_se_trunca(self):
+        from api.historias.models.estudiante import RegistroHistoria
+        from api.historias.services.ingesta_historias import ingerir_historias
+
+        contenido = 'Materia;Semestre;Créditos;Definitiva;Periodo\nCálculo I;1;4;3.1;' + 'P' * 30 + '\n'
+        resumen = ingerir_historias(self.programa.programa_id, [('Historia-Academica-1.csv', contenido.encode('utf-8'))])
+        self.assertEqual(resumen['registros_creados'], 1)
+        self.assertEqual(RegistroHistoria.objects.get().periodo, 'P' * 20)
+
+    def test_codigo_largo_rechazado(self):
+        from api.historias.models.estudiante import Estudiante
+        from api.historias.services.ingesta_historias import ingerir_historias
+
+        contenido = 'Materia;Semestre;Créditos;Definitiva;Periodo\nCálculo I;1;4;3.1;2020.1\n'.encode('utf-8')
+        nombre_largo = f'Historia-Academica-{"9" * 51}.csv'
+        resumen = ingerir_historias(self.programa.programa_id, [
+            (nombre_largo, contenido),
+            ('Historia-Academica-1.csv', contenido),
+        ])
+        self.assertEqual(resumen['estudiantes_creados'], 1)
+        self.assertEqual([error['archivo'] for error in resumen['archivos_con_error']], [nombre_largo])
+        self.assertEqual(list(Estudiante.objects.values_list('codigo', flat=True)), ['1'])
+
+
+class ReevaluacionTests(ProgramaPruebaTestCase):
+    """Los estudiantes guardados se reevalúan cuando cambia la configuración."""
+
+    def test_reevaluacion_estudiantes_guardados(self):
+        from api.configuracion.models.configuracion_elegibilidad import ConfiguracionElegibilidad
+        from api.historias.models.estudiante import Estudiante
+        from api.historias.services.ingesta_historias import ingerir_historias
+        from api.historias.services.contexto_evaluacion import EvaluationContext
+        from api.historias.services.reevaluacion_service import reevaluar_programa, reevaluar_programas_pendientes
+
+        encabezado = 'Materia;Semestre;Créditos;Definitiva;Periodo\n'
+        ingerir_historias(self.programa.programa_id, [
+            ('Historia-Academica-1.csv', (encabezado + 'Cálculo I;1;4;3.1;2020.1\nFísica I;1;3;2.5;2020.1\n').encode('utf-8')),
+            ('Historia-Academica-2.csv', (encabezado + 'Cálculo I;1;4;4.0;2020.1\nFísica I;1;3;3.5;2020.2\n').encode('utf-8')),
+        ])
+        self.assertEqual(reevaluar_programas_pendientes(),
+                         {self.programa.programa_id: {'estudiantes_evaluados': 2, 'estudiantes_actualizados': 2}})
+        # Ya evaluados con la versión actual: no se vuelven a comparar
+        self.assertEqual(reevaluar_programas_pendientes(), {})
+
+        # Con la caché de pensums compilados caliente, un update() (sin señales ni invalidación)
+        # que sube la nota aprobatoria se detecta igual y solo cambia el estudiante con 3.1 en Cálculo I
+        EvaluationContext.resolver(self.programa.programa_id)
+        ConfiguracionElegibilidad.objects.filter(programa_id=self.programa, es_activo=True).update(nota_aprobatoria=3.2)
+        self.assertEqual(reevaluar_programa(self.programa.programa_id, tamano_lote=1),
+                         {'estudiantes_evaluados': 2, 'estudiantes_actualizados': 1})
+        self.assertEqual(reevaluar_programa(self.programa.programa_id)['estudiantes_evaluados'], 0)
+
+        estudiante = Estudiante.objects.get(programa_id=self.programa, codigo='1')
+        self.assertIn('CALCULO I', estudiante.resultado['materias_faltantes_hasta_semestre_limite'])
+        historia = _historia([('Cálculo I', 1, 4, 3.1, '2020.1'), ('Física I', 1, 3, 2.5, '2020.1')])
+        contexto = EvaluationContext.resolver(self.programa.programa_id, usar_cache=False)
+        self.assertEqual(estudiante.resultado, comparar_lote([('1', historia)], contexto)[0])
+        self.assertEqual(estudiante.version_evaluacion, contexto.compilado.version)
+
+        respuesta = self.client.get('/api/historias/estudiantes/',
+                                    {'programa_id': self.programa.programa_id, 'estado': 0})
+        self.assertEqual(respuesta.status_code, 200)
+        self.assertEqual([e['codigo'] for e in respuesta.json()['estudiantes']], ['1', '2'])
+
+
+class SimulacionTests(ProgramaPruebaTestCase):
+    """La simulación de configuraciones coincide con el comparador."""
+
+    def test_simulacion_coincide_con_comparador(self):
+        from api.historias.services.contexto_evaluacion import EvaluationContext
+
+        contenidos = {
+            '1': 'Cálculo I;1;4;3.1\nFísica I;1;3;2.5\nElectiva FISH A;2;2;4.0\nCálculo II;2;4;3.5\n',
+            '2': 'Cálculo I;1;4;4.0\nFísica I;1;3;3.5\nFISH II;2;2;3.2\nCálculo II;2;4;3.0\n',
+            '3': 'Cálculo I;1;4;2.0\n',
+        }
+        archivos = [SimpleUploadedFile(f'Historia-Academica-{codigo}.csv',
+                                       ('Materia;Semestre;Créditos;Definitiva\n' + contenido).encode('utf-8'))
+                    for codigo, contenido in contenidos.items()]
+        respuesta = self.client.post('/api/historias/simular/', {
+            'programa_id': self.programa.programa_id,
+            'historias': archivos,
+            'semestres_limite': '1,2,3',
+            'notas_aprobatorias': ['3.0', '3.2'],
+        })
+        self.assertEqual(respuesta.status_code, 200)
+        simulacion = respuesta.json()
+        self.assertEqual(len(simulacion['puntos']), 6)
+
+        contexto = EvaluationContext.resolver(self.programa.programa_id)
+        historias = [(codigo, HistoriaReader().leer(io.BytesIO(archivo.open().read()), archivo.name))
+                     for codigo, archivo in zip(contenidos, archivos)]
+        for posicion, punto in enumerate(simulacion['puntos']):
+            config = {'nota_aprobatoria': punto['nota_aprobatoria'],
+                      'semestre_limite_electivas': punto['semestre_limite_electivas']}
+            estados = [r['estado'] for r in comparar_lote(historias, CompiledPensum(contexto.compilado.pensum, config), config=config)]
+            self.assertEqual([e['estados'][posicion] for e in simulacion['estudiantes']], estados)
+            self.assertEqual(punto['elegibles'], sum(estados))
+
+
+class TrabajosVerificacionTests(ProgramaPruebaTestCase):
+    """Los trabajos de verificación se crean pendientes y los procesa el worker de trabajos."""
+
+    def _crear_trabajo(self):
+        encabezado = 'Materia;Semestre;Créditos;Definitiva\n'
+        archivos = [
+            SimpleUploadedFile('Historia-Academica-1.csv', (encabezado + 'Cálculo I;1;4;4.0\nFísica I;1;3;3.5\nFISH II;2;2;3.2\n'
+                                                               'Cálculo II;2;4;3.5\nFISH 1;3;2;4.0\nProgramación;3;3;4.0\n').encode('utf-8')),
+            SimpleUploadedFile('Historia-Academica-2.csv', (encabezado + 'Cálculo I;1;4;2.0\n').encode('utf-8')),
+            SimpleUploadedFile('otro.txt', b'sin formato'),
+        ]
+        respuesta = self.client.post('/api/historias/jobs/', {
+            'programa_id': self.programa.programa_id, 'historias': archivos,
+        })
+        self.assertEqual(respuesta.status_code, 202)
+        return respuesta.json()['trabajo_id']
+
+    def test_trabajo_creado_procesado_y_consultado(self):
+        from api.historias.models.trabajo_verificacion import ArchivoTrabajo
+        from api.historias.services.trabajos_service import procesar_trabajos_pendientes
+
+        trabajo_id = self._crear_trabajo()
+        # Crear el trabajo no lo procesa en el servidor web
+        estado = self.client.get(f'/api/historias/jobs/{trabajo_id}/').json()
+        self.assertEqual((estado['estado'], estado['total_archivos'], estado['archivos_procesados']), ('pendiente', 3, 0))
+        self.assertEqual(estado['resultados'], [])
+
+        self.assertEqual(procesar_trabajos_pendientes(), 1)
+        estado = self.client.get(f'/api/historias/jobs/{trabajo_id}/').json()
+        self.assertEqual(estado['estado'], 'completado')
+        self.assertEqual((estado['archivos_procesados'], estado['porcentaje_progreso']), (3, 100.0))
+        self.assertEqual([r['estado'] for r in estado['resultados']], [1, 0])
+        self.assertEqual((estado['elegibles'], estado['no_elegibles']), (1, 1))
+        self.assertEqual([e['archivo'] for e in estado['archivos_con_error']], ['otro.txt'])
+        self.assertFalse(ArchivoTrabajo.objects.filter(trabajo_id=trabajo_id).exclude(contenido=b'').exists())
+
+        # Sondeo incremental: solo los archivos procesados después de los ya recibidos
+        self.assertEqual(len(self.client.get(f'/api/historias/jobs/{trabajo_id}/', {'desde': 1}).json()['resultados']), 1)
+        self.assertEqual(self.client.get('/api/historias/jobs/999999/').status_code, 404)
+
+    def test_trabajo_abandonado_reclamado_y_terminados_purgados(self):
+        from datetime import timedelta
+        from django.utils import timezone
+        from api.historias.models.trabajo_verificacion import ArchivoTrabajo, TrabajoVerificacion
+        from api.historias.services.trabajos_service import procesar_trabajos_pendientes, TIMEOUT_TRABAJO
+
+        trabajo_id = self._crear_trabajo()
+        trabajos = TrabajoVerificacion.objects.filter(trabajo_id=trabajo_id)
+        # Tomado por un worker que sigue vivo: no se reclama
+        trabajos.update(estado='en_proceso', fecha_actualizacion=timezone.now())
+        self.assertEqual(procesar_trabajos_pendientes(), 0)
+        # Sin progreso durante más del timeout: otro worker lo reclama y lo termina
+        trabajos.update(fecha_actualizacion=timezone.now() - timedelta(seconds=TIMEOUT_TRABAJO + 1))
+        self.assertEqual(procesar_trabajos_pendientes(), 1)
+        self.assertEqual(trabajos.get().estado, 'completado')
+
+        trabajos.update(fecha_fin=timezone.now() - timedelta(days=30))
+        procesar_trabajos_pendientes()
+        self.assertFalse(trabajos.exists())
+        self.assertFalse(ArchivoTrabajo.objects.filter(trabajo_id=trabajo_id).exists())
+
+    def test_trabajo_fallido_vacia_archivos(self):
+        from api.configuracion.models.configuracion_elegibilidad import ConfiguracionElegibilidad
+        from api.historias.models.trabajo_verificacion import ArchivoTrabajo
+        from api.historias.services.trabajos_service import procesar_trabajos_pendientes
+
+        trabajo_id = self._crear_trabajo()
+        ConfiguracionElegibilidad.objects.filter(programa_id=self.programa).delete()
+        self.assertEqual(procesar_trabajos_pendientes(), 1)
+        estado = self.client.get(f'/api/historias/jobs/{trabajo_id}/').json()
+        self.assertEqual(estado['estado'], 'fallido')
+        self.assertIn('error', estado)
+        self.assertFalse(ArchivoTrabajo.objects.filter(trabajo_id=trabajo_id).exclude(contenido=b'').exists())
+
+
+class CacheConfiguracionTests(ProgramaPruebaTestCase):
+    """La configuración activa se cachea y se invalida por versión."""
+
+    def test_configuracion_cacheada_por_version(self):
+        from django.core.cache import cache
+        from api.configuracion.controllers.configuracionController import obtener_configuracion
+        from api.configuracion.models.configuracion_elegibilidad import ConfiguracionElegibilidad
+
+        programa_id = self.programa.programa_id
+        self.assertEqual(obtener_configuracion(programa_id), CONFIG_PRUEBA)
+        with self.assertNumQueries(0):
+            self.assertEqual(obtener_configuracion(programa_id), CONFIG_PRUEBA)
+
+        # La versión compartida se incrementa al confirmar; este proceso ve el cambio de inmediato
+        version = cache.get('configuracion:version')
+        config = ConfiguracionElegibilidad.objects.get(programa_id=self.programa, es_activo=True)
+        config.semestre_limite_electivas = 4
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            config.save()
+            self.assertEqual(cache.get('configuracion:version'), version)
+            self.assertEqual(obtener_configuracion(programa_id)['semestre_limite_electivas'], 4)
+        self.assertTrue(callbacks)
+        self.assertGreater(cache.get('configuracion:version'), version)
+
+        # Un cambio hecho por otro worker se observa cuando este incrementa la versión
+        obtener_configuracion(programa_id)
+        ConfiguracionElegibilidad.objects.filter(pk=config.pk).update(semestre_limite_electivas=5)
+        self.assertEqual(obtener_configuracion(programa_id)['semestre_limite_electivas'], 4)
+        cache.incr('configuracion:version')
+        self.assertEqual(obtener_configuracion(programa_id)['semestre_limite_electivas'], 5)
+
+        config.es_activo = False
+        config.save()
+        with self.assertRaises(ValueError):
+            obtener_configuracion(programa_id)
+
+
+class EstadisticasPensumTests(ProgramaPruebaTestCase):
+    """Las estadísticas de los pensums se obtienen con consultas constantes."""
+
+    def test_estadisticas_pensum_desde_contadores(self):
+        from api.pensum.models.pensum import Pensum
+        from api.pensum.services.services_pensum import PensumService
+
+        anterior = Pensum.objects.create(programa_id=self.programa, anio_creacion=2015, es_activo=False)
+        _crear_materia(anterior, 'Electiva I', 6, 3, es_obligatoria=False)
+        _crear_materia(anterior, 'Redes', 4, 4, es_activa=False)
+
+        with self.assertNumQueries(2):
+            exito, respuesta = PensumService().obtener_pensums_por_programa(self.programa.programa_id)
+        self.assertTrue(exito)
+        for dato in respuesta['pensums']:
+            pensum = Pensum.objects.get(pk=dato['pensum_id'])
+            self.assertEqual(
+                (dato['creditos_obligatorios_totales'], dato['total_materias_obligatorias'], dato['total_materias_electivas']),
+                (pensum.creditos_obligatorios_totales, pensum.total_materias_obligatorias, pensum.total_materias_electivas)
+            )
+        actual = next(d for d in respuesta['pensums'] if d['pensum_id'] == self.pensum.pensum_id)
+        # Semestre límite 3: Cálculo I, Física I, FISH II, Cálculo II, FISH 1 y Programación
+        self.assertEqual((actual['creditos_obligatorios_totales'], actual['total_materias_obligatorias']), (18, 8))
+
+        with self.assertNumQueries(1):
+            exito, estadisticas = PensumService().obtener_estadisticas_pensum(anterior.pensum_id)
+        self.assertEqual((estadisticas['total_materias'], estadisticas['total_creditos_electivas']), (1, 3))
+
+        # Los totales salen de los contadores del pensum, no de recorrer sus materias
+        Pensum.objects.filter(pk=anterior.pensum_id).update(contador_materias_electivas=5)
+        exito, estadisticas = PensumService().obtener_estadisticas_pensum(anterior.pensum_id)
+        self.assertEqual(estadisticas['total_materias'], 5)
+
+    def test_resumen_creditos_una_consulta_agrupada(self):
+        from api.configuracion.services.cache_configuracion import obtener_config_activa
+        from api.pensum.models.pensum import Pensum
+        from api.pensum.services.services_pensum import PensumService
+
+        for anio in (2010, 2015):
+            anterior = Pensum.objects.create(programa_id=self.programa, anio_creacion=anio, es_activo=False)
+            _crear_materia(anterior, 'Electiva I', 6, 3, es_obligatoria=False)
+            _crear_materia(anterior, 'Cálculo I', 1, 4)
+        Pensum.objects.create(programa_id=self.programa, anio_creacion=2005, es_activo=False)
+
+        obtener_config_activa(self.programa.programa_id)
+        with self.assertNumQueries(3):
+            exito, respuesta = PensumService().obtener_resumen_creditos_por_programa(self.programa.programa_id)
+        self.assertTrue(exito)
+        self.assertEqual(respuesta['total_pensums'], 4)
+        for fila in respuesta['resumen_pensums']:
+            pensum = Pensum.objects.get(pk=fila['pensum_id'])
+            self.assertEqual(fila, {
+                'pensum_id': pensum.pensum_id,
+                'anio_creacion': pensum.anio_creacion,
+                'creditos_obligatorios': pensum.creditos_obligatorios_totales,
+                'creditos_electivas': pensum.total_creditos_electivas,
+                'materias_obligatorias': pensum.total_materias_obligatorias,
+                'materias_electivas': pensum.total_materias_electivas,
+                'total_materias': pensum.total_materias_obligatorias + pensum.total_materias_electivas,
+                'es_activo': pensum.es_activo
+            })
+
+
+class ListadoProgramasTests(ProgramaPruebaTestCase):
+    """El listado de programas con su pensum activo se obtiene en una consulta."""
+
+    def test_listado_programas_una_consulta(self):
+        from api.programa.models.programa import Programa
+        from api.programa.services.programa_service import ProgramaService
+
+        for i in range(5):
+            Programa.objects.create(nombre_programa=f'Programa {i}')
+
+        with self.assertNumQueries(1):
+            exito, respuesta = ProgramaService().obtener_todos_programas()
+        self.assertTrue(exito)
+        self.assertEqual(len(respuesta['programas']), 6)
+
+        with self.assertNumQueries(1):
+            exito, respuesta = ProgramaService().obtener_todos_programas(incluir_estadisticas=True)
+        programas = {p['programa_id']: p for p in respuesta['programas']}
+        self.assertEqual(programas[self.programa.programa_id], {
+            'programa_id': self.programa.programa_id,
+            'nombre_programa': 'Ingeniería de Sistemas',
+            'es_activo': True,
+            'pensum_activo_id': self.pensum.pensum_id,
+            'total_materias_obligatorias': 8,
+            'total_materias_electivas': 0,
+            'tiene_configuracion_activa': True,
+        })
+        otro = next(p for p in programas.values() if p['programa_id'] != self.programa.programa_id)
+        self.assertEqual((otro['pensum_activo_id'], otro['total_materias_obligatorias'], otro['tiene_configuracion_activa']),
+                         (None, 0, False))
+
+
+class ContadoresPensumTests(ProgramaPruebaTestCase):
+    """Los contadores de materias y créditos del pensum se mantienen al editar materias."""
+
+    def test_contadores_pensum(self):
+        from django.core.management import call_command
+        from django.core.management.base import CommandError
+        from api.configuracion.services.cache_configuracion import obtener_config_activa
+        from api.materia.repositories.materia_repository import MateriaRepository
+        from api.pensum.models.pensum import Pensum
+        from api.pensum.repositories.repository_pensum import PensumRepository
+
+        repositorio = MateriaRepository()
+        anterior = Pensum.objects.create(programa_id=self.programa, anio_creacion=2015, es_activo=False)
+        electiva = _crear_materia(self.pensum, 'Electiva I', 6, 3, es_obligatoria=False)
+        redes = self.pensum.materia_set.get(nombre_materia='Redes')
+        repositorio.actualizar(redes.materia_id, {'pensum_id': anterior.pensum_id, 'semestre': 2})
+        repositorio.actualizar(electiva.materia_id, {'es_obligatoria': True, 'creditos': 5})
+        repositorio.eliminar(self.pensum.materia_set.get(nombre_materia='Física I').materia_id)
+
+        pensum = Pensum.objects.get(pk=self.pensum.pensum_id)
+        obtener_config_activa(self.programa.programa_id)
+        with self.assertNumQueries(0):
+            # Semestre límite 3: Cálculo I, FISH II, Cálculo II, FISH 1 y Programación
+            self.assertEqual(
+                (pensum.creditos_obligatorios_totales, pensum.total_materias_obligatorias,
+                 pensum.total_materias_electivas, pensum.total_creditos_electivas),
+                (15, 7, 0, 0)
+            )
+        self.assertEqual(pensum.contador_creditos_por_semestre, {'1': 4, '2': 6, '3': 5, '5': 2, '6': 5})
+        self.assertEqual(Pensum.objects.get(pk=anterior.pensum_id).contador_creditos_por_semestre, {'2': 4})
+
+        # Los contadores mantenidos coinciden con los recalculados desde las materias
+        self.assertEqual(PensumRepository().recalcular_contadores(guardar=False), {})
+        Pensum.objects.filter(pk=anterior.pensum_id).update(contador_materias_obligatorias=7)
+        with self.assertRaises(CommandError):
+            call_command('recalcular_contadores_pensum', '--verificar', stdout=io.StringIO())
+        call_command('recalcular_contadores_pensum', stdout=io.StringIO())
+        self.assertEqual(Pensum.objects.get(pk=anterior.pensum_id).contador_materias_obligatorias, 1)
+
+
+class RendimientoTests(ProgramaPruebaTestCase):
+    """Medición por request: header Server-Timing e histograma por URL."""
+
+    def test_server_timing_por_etapa(self):
+        from api.middleware.rendimiento_middleware import resumen_rendimiento
+
+        respuesta = self.client.post('/api/historias/verificar/masiva/', {
+            'programa_id': self.programa.programa_id,
+            'historias': [SimpleUploadedFile('Historia-Academica-1.csv', 'Materia;Semestre;Definitiva\nCálculo I;1;4.0\n'.encode('utf-8'))],
+        })
+        self.assertEqual(respuesta.status_code, 200)
+        etapas = [parte.split(';')[0] for parte in respuesta['Server-Timing'].split(', ')]
+        self.assertEqual(etapas[:2], ['total', 'sql'])
+        self.assertTrue({'lectura', 'normalizacion', 'resultados'} <= set(etapas))
+        self.assertGreaterEqual(resumen_rendimiento()['verificar_elegibilidad_masiva']['requests'], 1)
+
+    @override_settings(METRICAS_TOKEN='secreto')
+    def test_resumen_expuesto_con_token(self):
+        self.client.get('/api/programa/')
+        self.assertEqual(self.client.get('/api/metrics/rendimiento/').status_code, 401)
+        respuesta = self.client.get('/api/metrics/rendimiento/', HTTP_AUTHORIZATION='Bearer secreto')
+        self.assertEqual(respuesta.status_code, 200)
+        self.assertIn('p95_ms', next(iter(respuesta.json().values())))
+
+    def test_streaming_se_registra_al_cerrar(self):
+        from django.http import StreamingHttpResponse
+        from django.test import RequestFactory
+        from api.middleware.rendimiento_middleware import RendimientoMiddleware, resumen_rendimiento
+
+        def _requests():
+            return resumen_rendimiento().get('metricas_rendimiento', {}).get('requests', 0)
+
+        middleware = RendimientoMiddleware(lambda request: StreamingHttpResponse(iter([b'a', b'b'])))
+        antes = _requests()
+        response = middleware(RequestFactory().get('/api/metrics/rendimiento/'))
+        self.assertEqual(_requests(), antes)
+        self.assertEqual(b''.join(response.streaming_content), b'ab')
+        self.assertEqual(_requests(), antes + 1)
+
+
+class MetricasTests(ProgramaPruebaTestCase):
+    """Endpoint de métricas de Prometheus."""
+
+    @skipUnless(prometheus_client, 'prometheus-client no está instalado')
+    @override_settings(METRICAS_TOKEN='secreto')
+    def test_exposicion_con_token(self):
+        self.client.get('/api/configuracion/programa/999999/')
+        self.assertEqual(self.client.get('/api/metrics/', HTTP_AUTHORIZATION='Bearer otro').status_code, 401)
+        respuesta = self.client.get('/api/metrics/', HTTP_AUTHORIZATION='Bearer secreto')
+        self.assertEqual(respuesta.status_code, 200)
+        self.assertTrue(respuesta['Content-Type'].startswith('text/plain'))
+        self.assertIn(b'agora_requests_total', respuesta.content)
+        self.assertIn(b'agora_errores_total', respuesta.content)
+
+    @skipIf(prometheus_client, 'prometheus-client está instalado')
+    @override_settings(METRICAS_TOKEN='secreto')
+    def test_sin_prometheus_client(self):
+        self.assertEqual(self.client.get('/api/metrics/', HTTP_AUTHORIZATION='Bearer secreto').status_code, 501)
+
+    @override_settings(METRICAS_TOKEN='', METRICAS_PERMITIR_SIN_TOKEN=False)
+    def test_token_requerido_sin_configurar(self):
+        self.assertEqual(self.client.get('/api/metrics/').status_code, 401)
+
+    def test_tipo_error(self):
+        from api.instrumentacion import _tipo_error
+        from rest_framework.response import Response
+
+        from rest_framework.exceptions import ErrorDetail
+
+        # El tipo sale de un conjunto cerrado: nunca del texto del mensaje
+        self.assertEqual(_tipo_error(Response({'error': 'Error al crear materia: columna nula'}, status=500)), '5xx')
+        self.assertEqual(_tipo_error(Response({'error': 'Programa 42 no encontrado'}, status=404)), '4xx')
+        self.assertEqual(_tipo_error(Response({'code': 'TOKEN_EXPIRED'}, status=401)), 'TOKEN_EXPIRED')
+        self.assertEqual(_tipo_error(Response({'code': 'OTRO_CODIGO'}, status=400)), '4xx')
+        detalle = ErrorDetail('Método "PUT" no permitido.', code='method_not_allowed')
+        self.assertEqual(_tipo_error(Response({'detail': detalle}, status=405)), 'method_not_allowed')
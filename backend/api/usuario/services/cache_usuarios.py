@@ -0,0 +1,90 @@
+import copy
+import threading
+import time
+
+import jwt
+from django.conf import settings
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from api.cache_versionada import CacheVersionada, ttl_cache_proceso
+from api.usuario.models.usuario import Usuario
+
+# Entradas máximas por caché en proceso; al llenarse se vacía
+MAX_ENTRADAS_CACHE = 10000
+
+# Tokens ya validados: firma -> (token, payload, expira en segundos epoch)
+_tokens = {}
+_lock = threading.Lock()
+
+
+def _ttl():
+    return getattr(settings, 'AUTH_CACHE_TTL', 60)
+
+
+def _ttl_usuarios():
+    # Sin caché compartida, el TTL corto de las cachés en proceso limita cuánto tarda otro
+    # worker en dejar de aceptar a un usuario desactivado
+    return min(_ttl(), ttl_cache_proceso())
+
+
+# Usuarios activos: usuario_id -> Usuario o None, invalidados en todos los workers por la
+# versión 'usuarios:version' (ver CacheVersionada)
+_usuarios = CacheVersionada('usuarios', ttl=_ttl_usuarios, max_entradas=MAX_ENTRADAS_CACHE)
+
+
+def invalidar_usuario(usuario_id):
+    """
+    Descarta el usuario cacheado en este proceso y, al confirmar la transacción, en todos los
+    workers. Lo llama el receptor de post_save/post_delete de Usuario.
+    """
+    _usuarios.invalidar(usuario_id)
+
+
+def decodificar_token(token):
+    """
+    Payload de un JWT de acceso. Un token ya validado se reutiliza durante AUTH_CACHE_TTL
+    segundos sin volver a verificar la firma, pero nunca después de su 'exp'.
+
+    Raises:
+        jwt.ExpiredSignatureError: Si el token expiró
+        jwt.InvalidTokenError: Si el token no es válido
+    """
+    firma = token.rpartition('.')[2]
+    ahora = time.time()
+    entrada = _tokens.get(firma)
+    # Se compara el token completo: la firma sola no garantiza el mismo payload
+    if entrada is not None and entrada[0] == token and ahora < entrada[2]:
+        return dict(entrada[1])
+
+    payload = jwt.decode(token, settings.SECRET_KEY, algorithms=['HS256'])
+    ttl = _ttl()
+    if ttl > 0:
+        expira = ahora + ttl
+        if 'exp' in payload:
+            expira = min(expira, float(payload['exp']))
+        with _lock:
+            if len(_tokens) >= MAX_ENTRADAS_CACHE:
+                _tokens.clear()
+            _tokens[firma] = (token, payload, expira)
+    return dict(payload)
+
+
+def obtener_usuario_activo(usuario_id):
+    """
+    Usuario activo por ID desde la caché en proceso. Solo consulta la BD si el usuario no está
+    en caché, su entrada expiró (AUTH_CACHE_TTL) o la versión cambió.
+
+    Returns:
+        Copia del Usuario, o None si no existe o está inactivo
+    """
+    usuario, _ = _usuarios.obtener(
+        usuario_id, lambda: Usuario.objects.filter(usuario_id=usuario_id, es_activo=True).first()
+    )
+    # Cada request recibe su propia instancia
+    return copy.copy(usuario) if usuario is not None else None
+
+
+@receiver([post_save, post_delete], sender=Usuario)
+def _invalidar_por_cambio(sender, instance, **kwargs):
+    invalidar_usuario(instance.usuario_id)
@@ -0,0 +1,230 @@
+"""
+Benchmark reproducible del comparador con pensums e historias sintéticas (ver
+generador_historias.py). Mide:
+
+- latencia de un estudiante (comparar_estudiante): p50, p95 y promedio,
+- throughput del lote (comparar_lote) con 10, 100 y 1.000 estudiantes,
+- tiempo de lectura por archivo en cada formato (HistoriaReader), incluidas las muestras .xls
+  reales de historias_excel/,
+- memoria pico (tracemalloc) al comparar el lote más grande,
+
+y escribe los resultados en JSON para comparar entre commits. No usa la base de datos, pero
+sí carga Django (DJANGO_SETTINGS_MODULE, por defecto agora_backend.settings).
+
+Uso (desde backend/):
+    python benchmarks/bench_comparador.py --salida benchmarks/resultados/base.json
+    python benchmarks/bench_comparador.py --salida nuevo.json --comparar benchmarks/resultados/base.json
+"""
+import argparse
+import glob
+import io
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+BACKEND_DIR = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, BACKEND_DIR)
+sys.path.insert(0, BENCH_DIR)
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'agora_backend.settings')
+
+import django  # noqa: E402
+
+django.setup()
+
+import numpy as np  # noqa: E402
+import pandas as pd  # noqa: E402
+
+from api.historias.services.comparadorService import comparar_estudiante, comparar_lote  # noqa: E402
+from api.historias.services.pensum_compilado import CompiledPensum  # noqa: E402
+from api.historias.tools.lector_historias import HistoriaReader  # noqa: E402
+from generador_historias import generar_pensum, generar_historias, historia_a_bytes  # noqa: E402
+
+CONFIG_BENCHMARK = {'nota_aprobatoria': 3.0, 'semestre_limite_electivas': 7}
+
+# Diferencia relativa a partir de la cual --comparar marca una métrica como regresión
+UMBRAL_REGRESION = 0.10
+
+
+def _mejor_de(repeticiones, funcion):
+    """Menor tiempo (s) de varias ejecuciones: la medida menos afectada por el ruido del sistema."""
+    tiempos = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        funcion()
+        tiempos.append(time.perf_counter() - inicio)
+    return min(tiempos)
+
+
+def medir_latencia_estudiante(historias, compilado, repeticiones):
+    # Copias fuera de la medición: comparar_estudiante normaliza las columnas de la historia
+    copias = [historias[i % len(historias)][1].copy() for i in range(repeticiones)]
+    comparar_estudiante(copias[0].copy(), compilado, CONFIG_BENCHMARK)  # Calentamiento
+    tiempos = []
+    for historia in copias:
+        inicio = time.perf_counter()
+        comparar_estudiante(historia, compilado, CONFIG_BENCHMARK)
+        tiempos.append((time.perf_counter() - inicio) * 1000)
+    tiempos.sort()
+    return {
+        'latencia_estudiante_p50_ms': round(statistics.median(tiempos), 3),
+        'latencia_estudiante_p95_ms': round(tiempos[int(0.95 * (len(tiempos) - 1))], 3),
+        'latencia_estudiante_promedio_ms': round(statistics.fmean(tiempos), 3),
+    }
+
+
+def medir_lotes(historias, compilado, tamanos, repeticiones):
+    resultados = {}
+    comparar_lote(historias[:10], compilado, CONFIG_BENCHMARK)  # Calentamiento
+    for tamano in tamanos:
+        lote = historias[:tamano]
+        segundos = _mejor_de(repeticiones, lambda: comparar_lote(lote, compilado, CONFIG_BENCHMARK))
+        resultados[f'lote_{tamano}_ms'] = round(segundos * 1000, 3)
+        resultados[f'lote_{tamano}_estudiantes_por_s'] = round(tamano / segundos, 1)
+    return resultados
+
+
+def medir_lectura(historias, formatos, repeticiones):
+    resultados = {}
+    lector = HistoriaReader()
+    for formato in formatos:
+        try:
+            contenidos = [historia_a_bytes(historia, formato) for _, historia in historias]
+        except ImportError as e:
+            print(f'  lectura {formato}: omitida ({e})')
+            continue
+        extension = 'xlsx' if formato == 'xlsx' else 'csv'
+        nombre = f'Historia-Academica-1.{extension}'
+        lector.leer(io.BytesIO(contenidos[0]), nombre)  # Calentamiento
+        segundos = _mejor_de(repeticiones, lambda: [lector.leer(io.BytesIO(c), nombre) for c in contenidos])
+        resultados[f'lectura_{formato}_ms'] = round(segundos * 1000 / len(contenidos), 3)
+        resultados[f'lectura_{formato}_kb'] = round(statistics.fmean(len(c) for c in contenidos) / 1024, 1)
+
+    # El .xls del sistema académico no se puede generar con pandas: se leen las muestras reales
+    muestras = sorted(glob.glob(os.path.join(BACKEND_DIR, 'historias_excel', 'Historia-Academica-*.xls')))
+    if muestras:
+        contenidos = []
+        for ruta in muestras:
+            with open(ruta, 'rb') as f:
+                contenidos.append((f.read(), os.path.basename(ruta)))
+        try:
+            segundos = _mejor_de(repeticiones, lambda: [lector.leer(io.BytesIO(c), n) for c, n in contenidos])
+        except ImportError as e:
+            print(f'  lectura xls: omitida ({e})')
+        else:
+            resultados['lectura_xls_ms'] = round(segundos * 1000 / len(contenidos), 3)
+            resultados['lectura_xls_kb'] = round(statistics.fmean(len(c) for c, _ in contenidos) / 1024, 1)
+    return resultados
+
+
+def medir_memoria(historias, compilado):
+    tracemalloc.start()
+    try:
+        comparar_lote(historias, compilado, CONFIG_BENCHMARK)
+        _, pico = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {f'memoria_pico_lote_{len(historias)}_mb': round(pico / 1024 / 1024, 2)}
+
+
+def _commit_actual():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=BACKEND_DIR,
+            capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def comparar_resultados(actuales, anteriores):
+    """
+    Imprime la variación de cada métrica frente a un JSON anterior. Las métricas *_por_s son
+    mejores si suben; el resto (tiempos y memoria), si bajan.
+
+    Returns:
+        Lista de métricas con una regresión mayor a UMBRAL_REGRESION
+    """
+    regresiones = []
+    print(f"\n{'métrica':<42}{'anterior':>12}{'actual':>12}{'cambio':>10}")
+    for metrica, valor in actuales.items():
+        anterior = anteriores.get(metrica)
+        if not anterior or metrica.endswith('_kb'):
+            continue
+        cambio = (valor - anterior) / anterior
+        empeora = -cambio if metrica.endswith('_por_s') else cambio
+        marca = '  <- regresión' if empeora > UMBRAL_REGRESION else ''
+        if marca:
+            regresiones.append(metrica)
+        print(f'{metrica:<42}{anterior:>12}{valor:>12}{cambio:>+9.1%}{marca}')
+    return regresiones
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--semilla', type=int, default=42)
+    parser.add_argument('--materias', type=int, default=None, help='Materias del pensum (por defecto 50 a 80 según la semilla)')
+    parser.add_argument('--lotes', type=int, nargs='+', default=[10, 100, 1000])
+    parser.add_argument('--formatos', nargs='+', default=['csv', 'csv-latin1', 'xlsx'])
+    parser.add_argument('--repeticiones', type=int, default=5)
+    parser.add_argument('--latencias', type=int, default=200, help='Mediciones de latencia de un estudiante')
+    parser.add_argument('--salida', help='Archivo JSON donde escribir los resultados')
+    parser.add_argument('--comparar', help='JSON de una ejecución anterior para comparar')
+    args = parser.parse_args()
+
+    pensum, electivas = generar_pensum(args.semilla, args.materias)
+    compilado = CompiledPensum(pensum, CONFIG_BENCHMARK)
+    generadas = generar_historias(pensum, electivas, max(args.lotes), args.semilla)
+    # El comparador recibe lo que entrega HistoriaReader (columnas proyectadas y tipos compactos)
+    lector = HistoriaReader()
+    historias = [
+        (codigo, lector.leer(io.BytesIO(historia_a_bytes(historia, 'csv')), f'Historia-Academica-{codigo}.csv'))
+        for codigo, historia in generadas
+    ]
+    print(f'Pensum: {len(pensum)} materias; {len(historias)} historias '
+          f'({statistics.fmean(len(h) for _, h in historias):.0f} registros en promedio)')
+
+    resultados = {}
+    resultados.update(medir_latencia_estudiante(historias, compilado, args.latencias))
+    resultados.update(medir_lotes(historias, compilado, args.lotes, args.repeticiones))
+    resultados.update(medir_lectura(generadas[:50], args.formatos, args.repeticiones))
+    resultados.update(medir_memoria(historias[:max(args.lotes)], compilado))
+
+    for metrica, valor in resultados.items():
+        print(f'  {metrica:<42}{valor:>12}')
+
+    if args.salida:
+        salida = {
+            'meta': {
+                'commit': _commit_actual(),
+                'fecha': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+                'python': platform.python_version(),
+                'pandas': pd.__version__,
+                'numpy': np.__version__,
+                'maquina': platform.machine(),
+                'parametros': vars(args),
+                'materias_pensum': len(pensum),
+            },
+            'resultados': resultados,
+        }
+        os.makedirs(os.path.dirname(os.path.abspath(args.salida)), exist_ok=True)
+        with open(args.salida, 'w', encoding='utf-8') as f:
+            json.dump(salida, f, indent=2, ensure_ascii=False)
+        print(f'Resultados escritos en {args.salida}')
+
+    if args.comparar:
+        with open(args.comparar, encoding='utf-8') as f:
+            anteriores = json.load(f)['resultados']
+        regresiones = comparar_resultados(resultados, anteriores)
+        if regresiones:
+            sys.exit(f'{len(regresiones)} métrica(s) con regresión mayor a {UMBRAL_REGRESION:.0%}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,92 @@
+"""
+Benchmark de lectura de historias académicas: lectura anterior de los controladores
+(pd.read_csv con inferencia de tipos en todas las columnas / read_excel completo)
+frente a HistoriaReader (proyección de columnas, tipos explícitos, motor pyarrow).
+
+Uso (desde backend/):
+    python benchmarks/bench_lector_historias.py [--filas 60 600 6000] [--repeticiones 20]
+"""
+import argparse
+import glob
+import io
+import os
+import random
+import sys
+import time
+
+import pandas as pd
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+from api.historias.tools.lector_historias import HistoriaReader, pyarrow  # noqa: E402
+
+MATERIAS = [
+    'Cálculo I', 'Cálculo II', 'Álgebra Lineal', 'Física I', 'Programación Orientada a Objetos',
+    'Estructuras de Datos', 'Bases de Datos', 'Sistemas Operativos', 'Redes', 'Ingeniería de Software',
+    'Electiva FISH II', 'Ética', 'Lectura y Escritura', 'Compiladores', 'Arquitectura de Software',
+]
+
+
+def generar_csv(filas, semilla=42):
+    """CSV con las columnas del reporte de historia académica (incluye columnas que no se usan)."""
+    aleatorio = random.Random(semilla)
+    lineas = ['Periodo;Materia;Créditos;Semestre;Nota;Habilitación;Definitiva;Tipo']
+    for i in range(filas):
+        nota = round(aleatorio.uniform(0, 5), 1)
+        lineas.append(';'.join([
+            f'{2015 + i // 12}.{1 + (i // 6) % 2}',
+            aleatorio.choice(MATERIAS),
+            str(aleatorio.randint(1, 4)),
+            str(aleatorio.randint(1, 10)),
+            str(nota), '', str(nota), 'Normal',
+        ]))
+    return ('\n'.join(lineas) + '\n').encode('utf-8')
+
+
+def lectura_anterior(contenido, nombre):
+    if nombre.endswith('.xls'):
+        historia = pd.read_excel(io.BytesIO(contenido), engine='xlrd')
+    else:
+        historia = pd.read_csv(io.BytesIO(contenido), delimiter=';', encoding='latin-1')
+    historia.columns = historia.columns.str.strip().str.lower()
+    return historia
+
+
+def medir(funcion, contenido, nombre, repeticiones):
+    funcion(contenido, nombre)  # Calentamiento
+    inicio = time.perf_counter()
+    for _ in range(repeticiones):
+        funcion(contenido, nombre)
+    return (time.perf_counter() - inicio) * 1000 / repeticiones
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--filas', type=int, nargs='+', default=[60, 600, 6000])
+    parser.add_argument('--repeticiones', type=int, default=20)
+    args = parser.parse_args()
+
+    lectores = [('anterior', lectura_anterior),
+                ('reader[c]', lambda c, n: HistoriaReader(motor_csv='c').leer(io.BytesIO(c), n))]
+    if pyarrow is not None:
+        lectores.append(('reader[pyarrow]', lambda c, n: HistoriaReader(motor_csv='pyarrow').leer(io.BytesIO(c), n)))
+    # Selección automática del motor según el tamaño del archivo (lo que usan los endpoints)
+    lectores.append(('reader[auto]', lambda c, n: HistoriaReader().leer(io.BytesIO(c), n)))
+
+    casos = [(f'csv {filas} filas', generar_csv(filas), 'historia.csv') for filas in args.filas]
+    for ruta in sorted(glob.glob(os.path.join(BACKEND_DIR, 'historias_excel', 'Historia-*.xls')))[:1]:
+        with open(ruta, 'rb') as f:
+            casos.append((f'xls {os.path.basename(ruta)}', f.read(), ruta))
+
+    print(f"{'caso':<45}" + ''.join(f'{nombre:>18}' for nombre, _ in lectores)
+          + f"{'mejora auto':>13}{'memoria ant.':>15}{'memoria auto':>15}")
+    for titulo, contenido, nombre in casos:
+        tiempos = [medir(funcion, contenido, nombre, args.repeticiones) for _, funcion in lectores]
+        memoria = [lectores[i][1](contenido, nombre).memory_usage(deep=True).sum() / 1024 for i in (0, -1)]
+        print(f'{titulo:<45}' + ''.join(f'{t:>15.2f} ms' for t in tiempos)
+              + f'{tiempos[0] / tiempos[-1]:>12.2f}x' + ''.join(f'{m:>12.0f} KB' for m in memoria))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,170 @@
+"""
+Generador reproducible (con semilla) de pensums e historias académicas sintéticas para los
+benchmarks del comparador.
+
+- Pensum: 50 a 80 materias obligatorias en 10 semestres, con cupos FISH (FISH I, FISH II, ...).
+- Electivas: profesionales (no están en el pensum) y Electivas FISH, que cubren los cupos FISH.
+- Historias: avance variable, materias perdidas y repetidas en periodos posteriores, notas
+  vacías y materias pendientes, con las columnas del reporte de historia académica.
+
+Uso:
+    pensum, electivas = generar_pensum(semilla=42)
+    historia = generar_historia(pensum, electivas, semilla=7)
+    contenido = historia_a_bytes(historia, 'csv')
+"""
+import io
+import random
+
+import pandas as pd
+
+SEMESTRES = 10
+CREDITOS = (2, 3, 3, 4, 4)
+COLUMNAS_REPORTE = ['Periodo', 'Materia', 'Créditos', 'Semestre', 'Nota', 'Habilitación', 'Definitiva', 'Tipo']
+
+# Nombres base con tildes y mayúsculas mezcladas, para ejercitar la normalización
+ASIGNATURAS = [
+    'Cálculo', 'Física', 'Álgebra Lineal', 'Programación', 'Estructuras de Datos', 'Bases de Datos',
+    'Sistemas Operativos', 'Redes', 'Ingeniería de Software', 'Arquitectura de Computadores',
+    'Compiladores', 'Estadística', 'Probabilidad', 'Teoría de la Computación', 'Ética Profesional',
+    'Lectura y Escritura', 'Inglés', 'Matemáticas Discretas', 'Análisis Numérico', 'Gestión de Proyectos',
+    'Inteligencia Artificial', 'Computación Gráfica', 'Seguridad Informática', 'Sistemas Distribuidos',
+    'Investigación de Operaciones', 'Electrónica', 'Economía', 'Emprendimiento', 'Trabajo de Grado',
+    'Laboratorio de Software',
+]
+NIVELES = ['I', 'II', 'III']
+TEMAS_FISH = ['Arte y Cultura', 'Deporte Formativo', 'Filosofía', 'Historia Regional', 'Música', 'Medio Ambiente']
+TEMAS_PROFESIONALES = ['Ciencia de Datos', 'Desarrollo Móvil', 'Computación en la Nube', 'Robótica',
+                       'Bioinformática', 'Videojuegos', 'Blockchain', 'Visión por Computador']
+
+
+def generar_pensum(semilla=42, materias=None):
+    """
+    Pensum sintético de materias obligatorias.
+
+    Args:
+        semilla: Semilla del generador
+        materias: Cantidad de materias (por defecto aleatoria entre 50 y 80)
+
+    Returns:
+        Tupla (DataFrame con columnas materia, semestre, créditos; diccionario con las listas
+        'fish' y 'profesionales' de nombres de electivas)
+    """
+    aleatorio = random.Random(semilla)
+    total = materias or aleatorio.randint(50, 80)
+    cupos_fish = max(2, total // 15)
+
+    nombres = [f'{base} {nivel}' for nivel in NIVELES for base in ASIGNATURAS]
+    aleatorio.shuffle(nombres)
+    nombres = nombres[:total - cupos_fish]
+
+    filas = [
+        {'materia': nombre, 'semestre': 1 + i * SEMESTRES // len(nombres), 'créditos': aleatorio.choice(CREDITOS)}
+        for i, nombre in enumerate(nombres)
+    ]
+    # Cupos FISH repartidos entre los semestres 2 y 9
+    for k in range(cupos_fish):
+        numero = _romano(k + 1) if aleatorio.random() < 0.5 else str(k + 1)
+        filas.append({'materia': f'FISH {numero}', 'semestre': 2 + k * 8 // cupos_fish, 'créditos': 2})
+
+    electivas = {
+        'fish': [f'Electiva FISH {tema}' for tema in TEMAS_FISH],
+        'profesionales': [f'Electiva {tema}' for tema in TEMAS_PROFESIONALES],
+    }
+    pensum = pd.DataFrame(filas).sort_values(['semestre', 'materia'], kind='stable').reset_index(drop=True)
+    return pensum, electivas
+
+
+def generar_historia(pensum, electivas, semilla, prob_perdida=0.15, prob_pendiente=0.03):
+    """
+    Historia académica sintética de un estudiante.
+
+    Cada materia hasta el semestre actual se cursa en su periodo; si se pierde (nota menor a
+    3.0) se repite en periodos siguientes, hasta tres intentos. Algunas quedan pendientes y
+    otras con la nota vacía. Los cupos FISH se cubren con Electivas FISH.
+
+    Args:
+        pensum: DataFrame de generar_pensum
+        electivas: Diccionario de electivas de generar_pensum
+        semilla: Semilla del generador (una por estudiante)
+        prob_perdida: Probabilidad de perder una materia en cada intento
+        prob_pendiente: Probabilidad de no haber cursado una materia de un semestre ya cursado
+
+    Returns:
+        DataFrame con las columnas del reporte (Periodo, Materia, Créditos, Semestre, Nota,
+        Habilitación, Definitiva, Tipo)
+    """
+    aleatorio = random.Random(semilla)
+    semestre_actual = aleatorio.randint(3, SEMESTRES)
+    anio_inicio = aleatorio.randint(2012, 2020)
+
+    def periodo(indice):
+        return f'{anio_inicio + indice // 2}.{1 + indice % 2}'
+
+    filas = []
+
+    def cursar(materia, creditos, semestre, indice):
+        for intento in range(3):
+            if aleatorio.random() < prob_perdida:
+                nota = round(aleatorio.uniform(0.5, 2.9), 1)
+            else:
+                nota = round(aleatorio.uniform(3.0, 5.0), 1)
+            definitiva = '' if aleatorio.random() < 0.01 else nota
+            filas.append([periodo(indice + intento), materia, creditos, semestre, nota, '', definitiva, 'Normal'])
+            if definitiva != '' and nota >= 3.0:
+                return
+
+    fish_cubiertas = 0
+    for materia, semestre, creditos in pensum[['materia', 'semestre', 'créditos']].itertuples(index=False):
+        if semestre > semestre_actual or aleatorio.random() < prob_pendiente:
+            continue
+        if materia.startswith('FISH'):
+            # El cupo se cubre con una Electiva FISH (no con la materia FISH del pensum)
+            tema = electivas['fish'][fish_cubiertas % len(electivas['fish'])]
+            cursar(tema, int(creditos), int(semestre), int(semestre) - 1)
+            fish_cubiertas += 1
+            continue
+        cursar(materia, int(creditos), int(semestre), int(semestre) - 1)
+
+    for tema in aleatorio.sample(electivas['profesionales'], k=aleatorio.randint(0, 4)):
+        semestre = aleatorio.randint(6, SEMESTRES)
+        if semestre <= semestre_actual:
+            cursar(tema, 3, semestre, semestre - 1)
+
+    filas.sort(key=lambda fila: fila[0])
+    return pd.DataFrame(filas, columns=COLUMNAS_REPORTE)
+
+
+def generar_historias(pensum, electivas, cantidad, semilla=42):
+    """Lista de (código de estudiante, historia) con semillas derivadas de la semilla base."""
+    return [
+        (f'{104600000000 + i}', generar_historia(pensum, electivas, semilla * 100003 + i))
+        for i in range(cantidad)
+    ]
+
+
+def historia_a_bytes(historia, formato):
+    """
+    Serializa una historia como la exporta el sistema académico.
+
+    Args:
+        formato: 'csv' (punto y coma, UTF-8), 'csv-latin1' (coma, Latin-1) o 'xlsx' (requiere openpyxl)
+    """
+    if formato == 'csv':
+        return historia.to_csv(sep=';', index=False).encode('utf-8')
+    if formato == 'csv-latin1':
+        return historia.to_csv(sep=',', index=False).encode('latin-1', errors='replace')
+    if formato == 'xlsx':
+        salida = io.BytesIO()
+        historia.to_excel(salida, index=False, engine='openpyxl')
+        return salida.getvalue()
+    raise ValueError(f'Formato no soportado: {formato}')
+
+
+def _romano(numero):
+    valores = [(10, 'X'), (9, 'IX'), (5, 'V'), (4, 'IV'), (1, 'I')]
+    romano = ''
+    for valor, simbolo in valores:
+        while numero >= valor:
+            romano += simbolo
+            numero -= valor
+    return romano
@@ -0,0 +1,20 @@
+"""
+Configuración de gunicorn para servir Agora con varios workers.
+
+Con PROMETHEUS_MULTIPROC_DIR definido, cada worker escribe sus métricas en ese directorio y
+/api/metrics/ las suma. Al terminar un worker se marcan sus métricas como muertas para que
+no se sigan contando.
+
+Uso:
+    PROMETHEUS_MULTIPROC_DIR=/tmp/agora_metricas gunicorn agora_backend.wsgi -c gunicorn.conf.py
+"""
+import os
+
+bind = os.getenv('GUNICORN_BIND', '0.0.0.0:8000')
+workers = int(os.getenv('GUNICORN_WORKERS', '4'))
+
+
+def child_exit(server, worker):
+    if os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+        from prometheus_client import multiprocess
+        multiprocess.mark_process_dead(worker.pid)